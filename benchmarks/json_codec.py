@@ -0,0 +1,61 @@
+"""
+Benchmark decoding websocket messages with the standard library compared to the JSON library picked by the package.
+
+Run it from the root of the repository with: python benchmarks/json_codec.py
+"""
+from __future__ import annotations
+
+import json
+import timeit
+from pathlib import Path
+from typing import Any
+
+from devolo_home_control_api.helper import JSON_LIBRARY, json_loads
+
+FIXTURES = Path(__file__).parent.parent / "tests" / "fixtures"
+SEQUENCE_NUMBER = "com.prosyst.mbs.services.remote.event.sequence.number"
+
+
+def websocket_messages() -> list[str]:
+    """Collect all websocket messages found in the test fixtures."""
+    messages: list[str] = []
+
+    def collect(data: Any) -> None:
+        if isinstance(data, dict):
+            if SEQUENCE_NUMBER in data.get("properties", {}):
+                messages.append(json.dumps(data))
+                return
+            for value in data.values():
+                collect(value)
+        elif isinstance(data, list):
+            for value in data:
+                collect(value)
+
+    for fixture in sorted(FIXTURES.glob("homecontrol_*.json")):
+        collect(json.loads(fixture.read_text(encoding="utf-8")))
+    return messages
+
+
+def main() -> None:
+    """Print the time needed to decode one message."""
+    messages = websocket_messages()
+    rounds = 2000
+
+    def decode_stdlib() -> None:
+        for message in messages:
+            json.loads(message)
+
+    def decode_package() -> None:
+        for message in messages:
+            json_loads(message)
+
+    stdlib = min(timeit.repeat(decode_stdlib, number=rounds, repeat=5)) / rounds / len(messages)
+    package = min(timeit.repeat(decode_package, number=rounds, repeat=5)) / rounds / len(messages)
+    print(f"Decoding {len(messages)} different websocket messages")
+    print(f"json: {stdlib * 1e6:.2f} µs per message")
+    print(f"{JSON_LIBRARY}: {package * 1e6:.2f} µs per message")
+    print(f"Saving: {(stdlib - package) * 1e6:.2f} µs per message ({1 - package / stdlib:.0%})")
+
+
+if __name__ == "__main__":
+    main()
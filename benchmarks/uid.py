@@ -0,0 +1,77 @@
+"""
+Benchmark splitting UIDs with the single helpers compared to parsing them in one pass.
+
+Run it from the root of the repository with: python benchmarks/uid.py
+"""
+from __future__ import annotations
+
+import json
+import re
+import timeit
+from pathlib import Path
+from typing import Any
+
+from devolo_home_control_api.helper import (
+    get_device_type_from_element_uid,
+    get_device_uid_from_element_uid,
+    get_device_uid_from_setting_uid,
+    parse_uid,
+)
+
+FIXTURES = Path(__file__).parent.parent / "tests" / "fixtures"
+DEVICE_UID = re.compile(r"[^:#]+:[^:#]+:[^:#/]+/\d{1,3}")
+
+
+def uids() -> list[str]:
+    """Collect all UIDs belonging to a device found in the test fixtures."""
+    found: set[str] = set()
+
+    def collect(data: Any) -> None:
+        if isinstance(data, dict):
+            for key, value in data.items():
+                if key in ("uid", "UID") and isinstance(value, str) and DEVICE_UID.search(value):
+                    found.add(value)
+                else:
+                    collect(value)
+        elif isinstance(data, list):
+            for value in data:
+                collect(value)
+
+    for fixture in sorted(FIXTURES.glob("homecontrol_*.json")):
+        collect(json.loads(fixture.read_text(encoding="utf-8")))
+    return sorted(found)
+
+
+def main() -> None:
+    """Print the time needed to get type and device UID of one UID."""
+    all_uids = uids()
+    rounds = 2000
+
+    def split_helpers() -> None:
+        for uid in all_uids:
+            get_device_type_from_element_uid(uid)
+            try:
+                get_device_uid_from_element_uid(uid)
+            except ValueError:
+                get_device_uid_from_setting_uid(uid)
+
+    def parse_uncached() -> None:
+        for uid in all_uids:
+            parse_uid.__wrapped__(uid)
+
+    def parse_cached() -> None:
+        for uid in all_uids:
+            parse_uid(uid)
+
+    for name, function in (
+        ("Single helpers", split_helpers),
+        ("parse_uid without cache", parse_uncached),
+        ("parse_uid with cache", parse_cached),
+    ):
+        duration = min(timeit.repeat(function, number=rounds, repeat=5)) / rounds / len(all_uids)
+        print(f"{name}: {duration * 1e9:.0f} ns per UID")
+    print(f"Parsed {len(all_uids)} different UIDs, cache: {parse_uid.cache_info()}")
+
+
+if __name__ == "__main__":
+    main()
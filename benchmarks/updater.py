@@ -0,0 +1,125 @@
+"""
+Benchmark replaying websocket messages through the updater.
+
+Run it from the root of the repository with: python benchmarks/updater.py
+"""
+from __future__ import annotations
+
+import json
+import logging
+import timeit
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any
+
+from devolo_home_control_api.backend import PropertyChangedEvent
+from devolo_home_control_api.devices import Gateway
+from devolo_home_control_api.homecontrol import BaseHomeControl
+from devolo_home_control_api.mydevolo import Mydevolo
+
+FIXTURES = Path(__file__).parent.parent / "tests" / "fixtures"
+SEQUENCE_NUMBER = "com.prosyst.mbs.services.remote.event.sequence.number"
+
+
+def load_fixture(name: str) -> Any:
+    """Load a fixture."""
+    return json.loads((FIXTURES / f"{name}.json").read_text(encoding="utf-8"))
+
+
+class FixtureMydevolo(Mydevolo):
+    """Answer like my devolo does using the test fixtures."""
+
+    def _call(self, url: str) -> dict[str, Any]:
+        """Answer a call to my devolo."""
+        for suffix, fixture in (
+            ("/uuid", "mydevolo_uuid"),
+            ("/fullURL", "mydevolo_gateway_fullurl"),
+            ("/location", "mydevolo_gateway_location"),
+            ("/standardTimezone", "mydevolo_standard_timezone"),
+        ):
+            if url.endswith(suffix):
+                return load_fixture(fixture)
+        return load_fixture("mydevolo_gateway_details")
+
+
+class ReplayHomeControl(BaseHomeControl):
+    """Devices and properties of the test fixtures without a gateway to talk to."""
+
+    def __init__(self) -> None:
+        """Create devices and properties from the test fixtures."""
+        self._logger = logging.getLogger(self.__class__.__name__)
+        self._mydevolo = FixtureMydevolo()
+        self._items = {}
+        self._zwave_products = {}
+        self._lazy_zwave_info = True
+        self._streaming = False
+        self._keep_items = True
+        self.enrichment = Future()
+        self.devices = {}
+        self.gateway = Gateway(load_fixture("mydevolo_gateway_details")["gatewayId"], self._mydevolo)
+        zones = load_fixture("homecontrol_zones")["result"]["items"][0]["properties"]["zones"]
+        self.gateway.zones = {zone["id"]: zone["name"] for zone in zones}
+        self._add_devices(load_fixture("homecontrol_devices")["result"]["items"])
+        self._add_properties(load_fixture("homecontrol_device_details")["result"]["items"])
+        self._setup_publisher()
+
+    def device_change(self, device_uids: list[str]) -> tuple[str, str]:
+        """Ignore new devices or removed devices."""
+        return (device_uids[0], "add")
+
+    def set_binary_switch(self, *_: Any) -> bool:
+        """Pretend to switch a binary switch."""
+        return True
+
+    def set_multi_level_switch(self, *_: Any) -> bool:
+        """Pretend to set a multi level switch."""
+        return True
+
+    def set_remote_control(self, *_: Any) -> bool:
+        """Pretend to press a key of a remote control."""
+        return True
+
+    def set_setting(self, *_: Any) -> bool:
+        """Pretend to change a setting."""
+        return True
+
+
+def websocket_messages() -> list[dict[str, Any]]:
+    """Collect all websocket messages of functional items found in the test fixtures, that do not add or remove devices."""
+    messages: list[dict[str, Any]] = []
+
+    def collect(data: Any) -> None:
+        if isinstance(data, dict):
+            if SEQUENCE_NUMBER in data.get("properties", {}):
+                if data["properties"].get("uid", "devolo.DevicesPage") != "devolo.DevicesPage":
+                    messages.append(data)
+                return
+            for value in data.values():
+                collect(value)
+        elif isinstance(data, list):
+            for value in data:
+                collect(value)
+
+    for fixture in sorted(FIXTURES.glob("homecontrol_*.json")):
+        collect(json.loads(fixture.read_text(encoding="utf-8")))
+    return messages
+
+
+def main() -> None:
+    """Print the time needed to process one message."""
+    updater = ReplayHomeControl().updater
+    messages = websocket_messages()
+    events = [PropertyChangedEvent.from_message(message) for message in messages]
+    rounds = 1000
+
+    def replay() -> None:
+        for event in events:
+            updater.update(event)
+
+    duration = min(timeit.repeat(replay, number=rounds, repeat=5)) / rounds / len(events)
+    print(f"Replaying {len(events)} different websocket messages")
+    print(f"Updater.update: {duration * 1e6:.2f} µs per message")
+
+
+if __name__ == "__main__":
+    main()
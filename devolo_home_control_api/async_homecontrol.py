@@ -0,0 +1,188 @@
+"""devolo Home Control using asyncio."""
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from types import TracebackType
+from typing import Any, Callable
+
+from aiohttp import ClientSession, CookieJar
+from zeroconf.asyncio import AsyncZeroconf
+
+from . import __version__
+from .backend import PropertyChangedEvent
+from .backend.async_mprm import AsyncMprm
+from .backend.discovery_cache import DiscoveryCache
+from .devices import Gateway, Zwave
+from .homecontrol import BaseHomeControl
+from .mydevolo import Mydevolo
+
+try:
+    from typing import Self  # type: ignore[attr-defined,misc]
+except ImportError:
+    from typing_extensions import Self
+
+
+class AsyncHomeControl(BaseHomeControl, AsyncMprm):
+    """
+    Representing object for your Home Control setup using asyncio. It offers the same devices and properties like HomeControl,
+    but all communication with the gateway happens on the event loop, so many gateways can share one event loop. Setters of
+    properties block until the gateway answered. Inside of the event loop, please use the async_set_* methods instead.
+
+    :param gateway_id: Gateway ID (aka serial number), typically found on the label of the device
+    :param mydevolo_instance: Mydevolo instance for talking to the devolo Cloud
+    :param zeroconf_instance: AsyncZeroconf instance to be potentially reused
+    :param session: ClientSession instance to be potentially reused. It needs to accept cookies from IP addresses.
+    :param discovery_cache: DiscoveryCache instance to remember the gateway's local IP
+    :param enrichment_workers: Maximum number of devices to get Z-Wave product information for at the same time
+    :param on_enrichment_complete: Callback called with the time taken in seconds, as soon as Z-Wave product information of
+                                   all devices is known. It is called from a worker thread.
+    :param lazy_zwave_info: Get Z-Wave product information of a device not before it is read for the first time or
+                            AsyncHomeControl.prefetch_zwave_info is called
+    :param chunk_size: Maximum number of functional items to ask the gateway for in one call. Up to four calls are made in
+                       parallel.
+    :param streaming: Handle functional items one after another, while the gateway's answer is still arriving. Calls are
+                      made one after another in this mode.
+    :param keep_items: Keep functional items of properties in streaming mode, so AsyncHomeControl.snapshot can be taken.
+                       Without streaming, they are always kept.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        gateway_id: str,
+        mydevolo_instance: Mydevolo,
+        zeroconf_instance: AsyncZeroconf | None = None,
+        session: ClientSession | None = None,
+        discovery_cache: DiscoveryCache | None = None,
+        *,
+        enrichment_workers: int = 4,
+        on_enrichment_complete: Callable[[float], None] | None = None,
+        lazy_zwave_info: bool = False,
+        chunk_size: int = 250,
+        streaming: bool = False,
+        keep_items: bool = False,
+    ) -> None:
+        """Initialize communication with your Home Control setup."""
+        self._gateway_id = gateway_id
+        self._mydevolo = mydevolo_instance
+        self._zeroconf = zeroconf_instance
+        self._session_instance = session
+        self._discovery_cache = discovery_cache
+        self._added_device = ""
+
+        super().__init__()
+        self._chunk_size = chunk_size
+        self._streaming = streaming
+        self._keep_items = keep_items or not streaming
+        self._items = {}
+        self._zwave_products = {}
+        self._enrichment_callback = on_enrichment_complete
+        self._enrichment_lock = threading.Lock()
+        self._enrichment_pending = set()
+        self._enrichment_start = time.monotonic()
+        self._enrichment_workers = enrichment_workers
+        self._lazy_zwave_info = lazy_zwave_info
+
+        self.devices: dict[str, Zwave] = {}
+        self.enrichment = Future()
+
+    async def __aenter__(self) -> Self:
+        """Connect to the gateway."""
+        await self.async_connect()
+        return self
+
+    async def __aexit__(
+        self,
+        exception_type: type[BaseException] | None,
+        exception_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Disconnect from the gateway."""
+        await self.async_disconnect()
+
+    async def async_connect(self) -> None:
+        """Connect to the gateway, inspect all devices and listen to changes."""
+        self._loop = asyncio.get_running_loop()
+        self._session = self._session_instance or ClientSession(
+            cookie_jar=CookieJar(unsafe=True), headers={"User-Agent": f"devolo_home_control_api/{__version__}"}
+        )
+        self._enrichment_executor = ThreadPoolExecutor(
+            max_workers=self._enrichment_workers, thread_name_prefix=f"{self.__class__.__name__}.enrichment"
+        )
+        try:
+            self.gateway = await self._loop.run_in_executor(None, Gateway, self._gateway_id, self._mydevolo)
+
+            await self.async_detect_gateway_in_lan()
+            await self.async_create_connection()
+            self.gateway.zones = await self.async_get_all_zones()
+
+            # Create the initial device dict
+            await self._async_inspect_devices(await self.async_get_all_devices())
+            self._setup_publisher()
+
+            await self.async_websocket_connect()
+        except BaseException:
+            self._enrichment_executor.shutdown(wait=False, cancel_futures=True)
+            if not self._session_instance:
+                await self._session.close()
+            raise
+
+    async def async_disconnect(self) -> None:
+        """Disconnect from the gateway and clean up."""
+        await self.async_websocket_disconnect()
+        for task in [*self._background_tasks]:
+            task.cancel()
+        self._enrichment_executor.shutdown(wait=False, cancel_futures=True)
+        if not self._session_instance:
+            await self._session.close()
+
+    async def async_on_update(self, message: dict[str, Any] | PropertyChangedEvent) -> None:
+        """
+        Initialize steps needed to update properties on a new message. New devices are inspected before the message is
+        passed to the updater, so subscribers are informed about fully initialized devices.
+
+        :param message: Message or its decoded event because of which we need to update properties
+        """
+        event = message if isinstance(message, PropertyChangedEvent) else PropertyChangedEvent.from_message(message)
+        if event.uid == "devolo.DevicesPage" and isinstance(event.value, list) and len(event.value) > len(self.devices):
+            self._added_device = next(device for device in event.value if device not in self.devices)
+            await self._async_inspect_devices([self._added_device])
+        self.on_update(event)
+
+    def device_change(self, device_uids: list[str]) -> tuple[str, str]:
+        """
+        React on new devices or removed devices. New devices were already inspected, when the message arrived. If the number
+        of devices decreases, a device was removed.
+
+        :param device_uids: List of UIDs known by the backend
+        """
+        if self._added_device:
+            device, self._added_device = self._added_device, ""
+            mode = "add"
+            self._logger.debug("Device %s added.", device)
+        else:
+            device = next(device for device in self.devices if device not in device_uids)
+            mode = "del"
+            self.devices.pop(device)
+            self._logger.debug("Device %s removed.", device)
+        self.updater.devices = self.devices
+        self.updater.clear_routes()
+        return (device, mode)
+
+    async def _async_inspect_devices(self, devices: list[str]) -> None:
+        """Inspect device properties of given list of devices."""
+        devices_properties = await self.async_get_data_from_uid_list(devices)
+        uid_list = self._add_devices(devices_properties)
+        if not self._lazy_zwave_info:
+            self._enrich_devices(devices_properties)
+
+        last_activities: list[dict[str, Any]] = []
+        if self._streaming:
+            async for uid_info in self.async_stream_data_from_uid_list(uid_list):
+                self._add_properties([uid_info], last_activities)
+        else:
+            async for device_properties_list in self.async_iter_data_from_uid_list(uid_list):
+                self._add_properties(device_properties_list, last_activities)
+        self._add_properties(last_activities)
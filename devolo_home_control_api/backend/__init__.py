@@ -1,6 +1,15 @@
 """Backends to communicate with."""
+from .event import PropertyChangedEvent
 from .mprm import Mprm
+from .mprm_websocket import ConnectionState
 
+DEVICE_STATES = {
+    # Property of a device's functional item: Attribute of the device object it is stored in
+    "batteryLevel": "battery_level",
+    "batteryLow": "battery_low",
+    "pendingOperations": "pending_operations",
+    "status": "status",
+}
 MESSAGE_TYPES = {
     "devolo.BinarySensor": "_binary_sensor",
     "devolo.BinarySwitch": "_binary_switch",
@@ -38,4 +47,4 @@ MESSAGE_TYPES = {
     "vfs.hdm": "_led",
 }
 
-__all__ = ["MESSAGE_TYPES", "Mprm"]
+__all__ = ["DEVICE_STATES", "MESSAGE_TYPES", "ConnectionState", "Mprm", "PropertyChangedEvent"]
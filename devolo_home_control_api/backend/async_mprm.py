@@ -0,0 +1,166 @@
+"""mPRM communication using asyncio."""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import socket
+import sys
+from abc import ABC
+from base64 import b64encode
+from http import HTTPStatus
+
+from aiohttp import ClientConnectionError, ClientTimeout
+from zeroconf import ServiceStateChange, Zeroconf
+from zeroconf.asyncio import AsyncServiceBrowser, AsyncServiceInfo, AsyncZeroconf
+
+from devolo_home_control_api.exceptions import GatewayOfflineError
+
+from .async_mprm_websocket import AsyncMprmWebsocket
+from .discovery_cache import DiscoveryCache
+
+
+class AsyncMprm(AsyncMprmWebsocket, ABC):
+    """
+    The abstract AsyncMprm object handles the connection to the devolo Cloud (remote) or the gateway in your LAN (local) using
+    asyncio. Either way is chosen, depending on detecting the gateway via mDNS.
+    """
+
+    def __init__(self) -> None:
+        """Initialize communication."""
+        self._discovery_cache: DiscoveryCache | None
+        self._zeroconf: AsyncZeroconf | None
+
+        super().__init__()
+        self._background_tasks: set[asyncio.Future] = set()
+        self._gateway_found: asyncio.Event
+
+    async def async_create_connection(self) -> None:
+        """
+        Create session, either locally or remotely via cloud. The remote case has two conditions, that both need to be
+        fulfilled: Remote access must be allowed and my devolo must not be in maintenance mode.
+        """
+        if self._local_ip:
+            self.gateway.local_connection = True
+            await self.async_get_local_session()
+        elif self.gateway.external_access and not await self._loop.run_in_executor(None, self._mydevolo.maintenance):
+            await self.async_get_remote_session()
+        else:
+            self._logger.error("Cannot connect to gateway. No gateway found in LAN and external access is not possible.")
+            raise ConnectionError("Cannot connect to gateway.")  # noqa: TRY003
+
+    async def async_detect_gateway_in_lan(self) -> str:
+        """
+        Detect a gateway in local network via mDNS and check if it is the desired one. Unfortunately, the only way to tell is
+        to try a connection with the known credentials. The search ends as soon as the gateway answered. If the gateway is
+        not found within 3 seconds, it is assumed that a remote connection is needed. If a discovery cache is used, the last
+        known local IP is tried first and the search is skipped, if it still belongs to the gateway.
+
+        :return: Local IP of the gateway, if found
+        """
+        # The gateway might have got a new IP address since it was detected last time.
+        self._gateway_found = asyncio.Event()
+        self._local_ip = ""
+        cached_ip = ""
+        if self._discovery_cache:
+            cached_ip = await self._loop.run_in_executor(None, self._discovery_cache.get, self.gateway.id)
+        if cached_ip:
+            self._logger.info("Trying cached local IP %s.", cached_ip)
+            await self._async_try_local_address(cached_ip)
+
+        if not self._gateway_found.is_set():
+            zeroconf = self._zeroconf or AsyncZeroconf()
+            browser = AsyncServiceBrowser(
+                zeroconf.zeroconf, "_dvl-deviceapi._tcp.local.", handlers=[self._on_service_state_change]
+            )
+            self._logger.info("Searching for gateway in LAN.")
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._gateway_found.wait(), timeout=3)
+
+            await browser.async_cancel()
+            if not self._zeroconf:
+                await zeroconf.async_close()
+
+        if self._discovery_cache:
+            await self._loop.run_in_executor(None, self._discovery_cache.update, self.gateway.id, self._local_ip)
+        return self._local_ip
+
+    async def async_get_local_session(self) -> bool:
+        """
+        Connect to the gateway locally. Calling a special portal URL on the gateway returns a second URL with a token. Calling
+        that URL establishes the connection.
+        """
+        self._logger.info("Connecting to gateway locally.")
+        self._url = f"http://{self._local_ip}"
+        self._logger.debug("Session URL set to '%s'", self._url)
+        try:
+            async with self._session.get(
+                f"{self._url}/dhlp/portal/full",
+                headers=self._local_authorization(),
+                timeout=ClientTimeout(total=5),
+            ) as connection:
+                # After a reboot we can connect to the gateway but it answers with a 503 if not fully started.
+                if not connection.ok:
+                    self._logger.error("Could not connect to the gateway locally.")
+                    self._logger.debug("Gateway start-up is not finished, yet.")
+                    raise GatewayOfflineError from None
+                token_url = (await connection.json(content_type=None))["link"]
+
+        except (ClientConnectionError, asyncio.TimeoutError):
+            self._logger.error("Could not connect to the gateway locally.")
+            self._logger.debug(sys.exc_info())
+            raise GatewayOfflineError from None
+
+        self._logger.debug("Got a token URL: %s", token_url)
+
+        async with self._session.get(token_url):
+            pass
+        return True
+
+    async def async_get_remote_session(self) -> bool:
+        """Connect to the gateway remotely. Calling the known portal URL is enough in this case."""
+        self._logger.info("Connecting to gateway via cloud.")
+        if not self.gateway.full_url:
+            self._logger.error("Could not connect to the gateway remotely.")
+            raise GatewayOfflineError
+        async with self._session.get(self.gateway.full_url, timeout=ClientTimeout(total=15)) as connection:
+            self._url = str(connection.url.origin())
+        self._logger.debug("Session URL set to '%s'", self._url)
+        return True
+
+    def _local_authorization(self) -> dict[str, str]:
+        """Get the header needed for basic authentication against the gateway."""
+        credentials = b64encode(f"{self.gateway.local_user}:{self.gateway.local_passkey}".encode()).decode()
+        return {"Authorization": f"Basic {credentials}"}
+
+    def _on_service_state_change(
+        self, zeroconf: Zeroconf, service_type: str, name: str, state_change: ServiceStateChange
+    ) -> None:
+        """Service handler for Zeroconf state changes."""
+        if state_change is ServiceStateChange.Added:
+            task = asyncio.create_task(self._async_on_service_added(zeroconf, service_type, name))
+            self._background_tasks.add(task)
+            task.add_done_callback(self._background_tasks.discard)
+
+    async def _async_on_service_added(self, zeroconf: Zeroconf, service_type: str, name: str) -> None:
+        """Check, if an added service is the gateway we are looking for."""
+        service_info = AsyncServiceInfo(service_type, name)
+        await service_info.async_request(zeroconf, 3000)
+        if service_info.server and service_info.server.startswith("devolo-homecontrol"):
+            await self._async_try_local_connection(service_info.addresses)
+
+    async def _async_try_local_connection(self, addresses: list[bytes]) -> None:
+        """Try to connect to the addresses of an mDNS hostname in parallel. If a connection was successful, save its IP."""
+        await asyncio.gather(*(self._async_try_local_address(socket.inet_ntoa(address)) for address in addresses))
+
+    async def _async_try_local_address(self, ip: str) -> None:
+        """Try to connect to an IP address. If connection was successful, save it as local IP address."""
+        with contextlib.suppress(ClientConnectionError, asyncio.TimeoutError):
+            async with self._session.get(
+                f"http://{ip}/dhlp/port/full",
+                headers=self._local_authorization(),
+                timeout=ClientTimeout(total=0.5),
+            ) as response:
+                if response.status == HTTPStatus.OK and not self._gateway_found.is_set():
+                    self._logger.debug("Got successful answer from ip %s. Setting this as local gateway", ip)
+                    self._local_ip = ip
+                    self._gateway_found.set()
@@ -0,0 +1,323 @@
+"""mPRM communication via REST using asyncio."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import sys
+from abc import ABC
+from collections.abc import AsyncIterator, Coroutine
+from contextlib import asynccontextmanager
+from typing import Any, TypeVar
+
+from aiohttp import ClientConnectionError, ClientSession, ClientTimeout
+
+from devolo_home_control_api.devices import Gateway
+from devolo_home_control_api.exceptions import GatewayOfflineError
+from devolo_home_control_api.helper import json_dumps, json_loads
+from devolo_home_control_api.mydevolo import Mydevolo
+
+from .items_parser import ItemsParser
+from .mprm_rest import RestBatch, RestResponseStatus
+
+_T = TypeVar("_T")
+
+
+class AsyncMprmRest(ABC):
+    """
+    The abstract AsyncMprmRest object handles calls to the so called mPRM using asyncio. It does not cover all API calls, just
+    those requested up to now. All calls are done in a gateway context, so you have to create a derived class, that provides a
+    Gateway object and a ClientSession object.
+    """
+
+    def __init__(self) -> None:
+        """Initialize REST communication."""
+        self._logger = logging.getLogger(self.__class__.__name__)
+        self._chunk_size = 250
+        self._chunks_in_flight = 4
+        self._data_id = 0
+        self._local_ip = ""
+        self._url = ""
+
+        self._loop: asyncio.AbstractEventLoop
+        self._mydevolo: Mydevolo
+        self._session: ClientSession
+        self.gateway: Gateway
+
+    @asynccontextmanager
+    async def async_batch(self) -> AsyncIterator[RestBatch]:
+        """
+        Collect calls and send them to the gateway in one request, when leaving the context. Each call returns a future, that
+        is resolved with the same value the direct call would have returned. Properties are updated as soon as the gateway
+        reports the changes.
+
+        :return: Batch to collect calls in
+        """
+        batch = RestBatch(self._evaluate_response)
+        try:
+            yield batch
+        except BaseException:
+            batch.cancel()
+            raise
+        if batch:
+            await self._async_post_batch(batch)
+
+    async def async_get_all_devices(self) -> list[str]:
+        """
+        Get all devices.
+
+        :return: All devices and their properties.
+        """
+        self._logger.info("Inspecting devices")
+        data = {"method": "FIM/getFunctionalItems", "params": [["devolo.DevicesPage"], 0]}
+        response = await self._async_post(data)
+        self._logger.debug("Response of 'get_all_devices':\n%s", response)
+        return response["result"]["items"][0]["properties"]["deviceUIDs"]
+
+    async def async_get_all_zones(self) -> dict[str, str]:
+        """
+        Get all zones, also called rooms.
+
+        :return: All zone IDs and their name.
+        """
+        self._logger.debug("Inspecting zones")
+        data = {"method": "FIM/getFunctionalItems", "params": [["devolo.Grouping"], 0]}
+        response = (await self._async_post(data))["result"]["items"][0]["properties"]["zones"]
+        self._logger.debug("Response of 'get_all_zones':\n%s", response)
+        return {key["id"]: key["name"] for key in response}
+
+    async def async_get_data_from_uid_list(self, uids: list[str]) -> list[dict[str, Any]]:
+        """
+        Return data from an element UID list using an RPC call.
+
+        :param uids: Element UIDs, something like [devolo.MultiLevelSensor:hdm:ZWave:CBC56091/24#2,
+                     devolo.MultiLevelSensor:hdm:ZWave:CBC56091/24#1]
+        :return: Data connected to the element UIDs, payload so to say
+        """
+        data = {"method": "FIM/getFunctionalItems", "params": [uids, 0]}
+        response = await self._async_post(data)
+        self._logger.debug("Response of 'get_data_from_uid_list':\n%s", response)
+        return response["result"]["items"]
+
+    async def async_iter_data_from_uid_list(self, uids: list[str]) -> AsyncIterator[list[dict[str, Any]]]:
+        """
+        Return data from an element UID list using multiple RPC calls in parallel. Each call asks for a chunk of the element
+        UIDs. The data is yielded as soon as a call is answered, so the order may differ from the element UIDs.
+
+        :param uids: Element UIDs, something like [devolo.MultiLevelSensor:hdm:ZWave:CBC56091/24#2,
+                     devolo.MultiLevelSensor:hdm:ZWave:CBC56091/24#1]
+        :return: Data connected to a chunk of element UIDs
+        """
+        semaphore = asyncio.Semaphore(self._chunks_in_flight)
+
+        async def get_chunk(chunk: list[str]) -> list[dict[str, Any]]:
+            async with semaphore:
+                return await self.async_get_data_from_uid_list(chunk)
+
+        tasks = [
+            asyncio.ensure_future(get_chunk(uids[i : i + self._chunk_size])) for i in range(0, len(uids), self._chunk_size)
+        ]
+        try:
+            for task in asyncio.as_completed(tasks):
+                yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def async_stream_data_from_uid_list(self, uids: list[str]) -> AsyncIterator[dict[str, Any]]:
+        """
+        Return data from an element UID list item by item, while the response is still arriving. Like with
+        async_iter_data_from_uid_list, element UIDs are requested in chunks, but one chunk after another.
+
+        :param uids: Element UIDs, something like [devolo.MultiLevelSensor:hdm:ZWave:CBC56091/24#2,
+                     devolo.MultiLevelSensor:hdm:ZWave:CBC56091/24#1]
+        :return: Data connected to an element UID
+        """
+        for i in range(0, len(uids), self._chunk_size):
+            data = {"method": "FIM/getFunctionalItems", "params": [uids[i : i + self._chunk_size], 0]}
+            async for item in self._async_post_streamed(data):
+                yield item
+
+    async def async_refresh_session(self) -> None:
+        """Refresh currently running session. Without this call from time to time especially websockets will terminate."""
+        self._logger.debug("Refreshing session.")
+        data = {
+            "method": "FIM/invokeOperation",
+            "params": [f"devolo.UserPrefs.{self._mydevolo.uuid()}", "resetSessionTimeout", []],
+        }
+        await self._async_post(data)
+
+    async def async_set_binary_switch(self, uid: str, state: bool) -> bool:
+        """
+        Set a binary switch state of a device.
+
+        :param uid: Element UID, something like devolo.BinarySwitch:hdm:ZWave:CBC56091/24
+        :param state: True if switching on, False if switching off
+        :return: True if successfully switched, false otherwise
+        """
+        data: dict[str, str | list] = {"method": "FIM/invokeOperation", "params": [uid, "turnOn" if state else "turnOff", []]}
+        response = await self._async_post(data)
+        return self._evaluate_response(uid=uid, value=state, response=response)
+
+    async def async_set_multi_level_switch(self, uid: str, value: float) -> bool:
+        """
+        Set a multi level switch value of a device.
+
+        :param uid: Element UID, something like devolo.Dimmer:hdm:ZWave:CBC56091/24
+        :param value: Value the multi level switch shall have
+        :return: True if successfully switched, false otherwise
+        """
+        data = {"method": "FIM/invokeOperation", "params": [uid, "sendValue", [value]]}
+        response = await self._async_post(data)
+        return self._evaluate_response(uid=uid, value=value, response=response)
+
+    async def async_set_remote_control(self, uid: str, key_pressed: int) -> bool:
+        """
+        Press the button of a remote control virtually.
+
+        :param uid: Element UID, something like devolo.RemoteControl:hdm:ZWave:CBC56091/24
+        :param key_pressed: Number of the button pressed
+        :return: True if successfully switched, false otherwise
+        """
+        data = {"method": "FIM/invokeOperation", "params": [uid, "pressKey", [key_pressed]]}
+        response = await self._async_post(data)
+        return self._evaluate_response(uid=uid, value=key_pressed, response=response)
+
+    async def async_set_setting(self, uid: str, setting: list[Any]) -> bool:
+        """
+        Set a setting of a device.
+
+        :param uid: Element UID, something like acs.hdm:ZWave:CBC56091/24
+        :param setting: Settings to set
+        :return: True if successfully switched, false otherwise
+        """
+        data = {"method": "FIM/invokeOperation", "params": [uid, "save", setting]}
+        response = await self._async_post(data)
+        return self._evaluate_response(uid=uid, value=setting, response=response)
+
+    def set_binary_switch(self, uid: str, state: bool) -> bool:
+        """Set a binary switch state of a device from outside of the event loop. See async_set_binary_switch."""
+        return self._run_threadsafe(self.async_set_binary_switch(uid, state))
+
+    def set_multi_level_switch(self, uid: str, value: float) -> bool:
+        """Set a multi level switch value of a device from outside of the event loop. See async_set_multi_level_switch."""
+        return self._run_threadsafe(self.async_set_multi_level_switch(uid, value))
+
+    def set_remote_control(self, uid: str, key_pressed: int) -> bool:
+        """Press the button of a remote control from outside of the event loop. See async_set_remote_control."""
+        return self._run_threadsafe(self.async_set_remote_control(uid, key_pressed))
+
+    def set_setting(self, uid: str, setting: list[Any]) -> bool:
+        """Set a setting of a device from outside of the event loop. See async_set_setting."""
+        return self._run_threadsafe(self.async_set_setting(uid, setting))
+
+    def _evaluate_response(self, uid: str, value: bool | float | list[Any], response: dict[str, Any]) -> bool:
+        """Evaluate the response of setting a device to a value."""
+        if response["result"].get("status") == RestResponseStatus.VALID:
+            return True
+        if response["result"].get("status") == RestResponseStatus.INVALID:
+            self._logger.debug("Value of %s is already %s.", uid, value)
+        else:
+            self._logger.error("Something went wrong setting %s.", uid)
+            self._logger.debug("Response to set command:\n%s", response)
+        return False
+
+    async def _async_post(self, data: dict[str, Any]) -> dict[str, Any]:
+        """
+        Communicate with the RPC interface. If the call times out, it is assumed that the gateway is offline and the state is
+        changed accordingly.
+
+        :param data: Data to be send
+        :return: Response to the data
+        """
+        self._data_id += 1
+        data["jsonrpc"] = "2.0"
+        data["id"] = self._data_id
+        response = await self._async_send(data)
+        if response["id"] != data["id"]:
+            self._logger.error("Got an unexpected response after posting data.")
+            self._logger.debug("Message had ID %s, response had ID %s.", data["id"], response["id"])
+            raise ValueError("Got an unexpected response after posting data.")  # noqa: TRY003
+        return response
+
+    async def _async_post_batch(self, batch: RestBatch) -> None:
+        """
+        Communicate with the RPC interface using a JSON-RPC 2.0 batch request. Responses are matched to the calls by their ID.
+
+        :param batch: Batch of calls to be send
+        """
+        self._data_id = batch.prepare(self._data_id)
+        try:
+            response = await self._async_send(batch.requests)
+        except GatewayOfflineError as exception:
+            batch.fail(exception)
+            raise
+        batch.resolve(response)
+
+    async def _async_post_streamed(self, data: dict[str, Any]) -> AsyncIterator[dict[str, Any]]:
+        """
+        Communicate with the RPC interface and parse the response incrementally. If the call times out, it is assumed that
+        the gateway is offline and the state is changed accordingly.
+
+        :param data: Data to be send
+        :return: Items of the response as soon as they arrived
+        """
+        self._data_id += 1
+        data["jsonrpc"] = "2.0"
+        data["id"] = self._data_id
+        parser = ItemsParser()
+        try:
+            async with self._session.post(
+                f"{self._url}/remote/json-rpc",
+                data=json_dumps(data),
+                headers={"content-type": "application/json"},
+                timeout=ClientTimeout(total=30),
+            ) as request:
+                async for chunk in request.content.iter_chunked(65536):
+                    for item in parser.feed(chunk):
+                        yield item
+        except (ClientConnectionError, asyncio.TimeoutError):
+            self._set_offline()
+            raise GatewayOfflineError from None
+        response = parser.close()
+        if response["id"] != data["id"]:
+            self._logger.error("Got an unexpected response after posting data.")
+            self._logger.debug("Message had ID %s, response had ID %s.", data["id"], response["id"])
+            raise ValueError("Got an unexpected response after posting data.")  # noqa: TRY003
+        if "result" not in response:
+            self._logger.error("Got an error response after posting data.")
+            self._logger.debug("Response had error %s.", response.get("error"))
+            raise ValueError("Got an error response after posting data.")  # noqa: TRY003
+
+    async def _async_send(self, data: dict[str, Any] | list[dict[str, Any]]) -> Any:
+        """Send data to the RPC interface. If the call times out, the gateway's state is changed to offline."""
+        try:
+            async with self._session.post(
+                f"{self._url}/remote/json-rpc",
+                data=json_dumps(data),
+                headers={"content-type": "application/json"},
+                timeout=ClientTimeout(total=30),
+            ) as request:
+                return await request.json(loads=json_loads, content_type=None)
+        except (ClientConnectionError, asyncio.TimeoutError):
+            self._set_offline()
+            raise GatewayOfflineError from None
+
+    def _set_offline(self) -> None:
+        """Change the gateway's state to offline."""
+        self._logger.error("Gateway is offline.")
+        self._logger.debug(sys.exc_info())
+        self.gateway.update_state(online=False)
+
+    def _run_threadsafe(self, coro: Coroutine[Any, Any, _T]) -> _T:
+        """
+        Run a coroutine on the event loop of this object and wait for its result. This is needed, as properties expect
+        blocking setters. Inside of the event loop, please use the async_set_* methods instead.
+        """
+        try:
+            running_loop: asyncio.AbstractEventLoop | None = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        if running_loop is self._loop:
+            coro.close()
+            raise RuntimeError("Blocking setters cannot be used inside the event loop.")  # noqa: TRY003
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
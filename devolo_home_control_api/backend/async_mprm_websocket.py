@@ -0,0 +1,186 @@
+"""mPRM communication via websocket using asyncio."""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+from abc import ABC, abstractmethod
+from types import TracebackType
+
+from aiohttp import ClientConnectionError, ClientWebSocketResponse, WSMsgType
+
+from devolo_home_control_api.exceptions import GatewayOfflineError
+from devolo_home_control_api.helper import json_loads
+
+from .async_mprm_rest import AsyncMprmRest
+from .event import PropertyChangedEvent
+
+try:
+    from typing import Self  # type: ignore[attr-defined,misc]
+except ImportError:
+    from typing_extensions import Self
+
+
+class AsyncMprmWebsocket(AsyncMprmRest, ABC):
+    """
+    The abstract AsyncMprmWebsocket object handles calls to the mPRM via websockets using asyncio. It does not cover all API
+    calls, just those requested up to now. All calls are done in a gateway context, so you have to create a derived class, that
+    provides a Gateway object and a ClientSession object. Further, the derived class needs to implement methods to connect to
+    the websocket, either local or remote. Last but not least, the derived class needs to implement a coroutine that is called
+    on new messages.
+
+    The websocket connection itself runs in a task on the event loop. Using an async with-statement is recommended.
+    """
+
+    def __init__(self) -> None:
+        """Initialize websocket communication."""
+        super().__init__()
+        self._ws: ClientWebSocketResponse | None = None
+        self._ws_task: asyncio.Task | None = None
+        self._keep_alive_task: asyncio.Task | None = None
+        self._connected = False  # This attribute saves, if the websocket is fully established
+        self._reachable = True  # This attribute saves, if the a new session can be established
+        self._closing = False  # This attribute saves, if the websocket is closed on purpose
+        self._event_sequence = 0
+
+    async def __aenter__(self) -> Self:
+        """Connect to the websocket."""
+        return self
+
+    async def __aexit__(
+        self,
+        exception_type: type[BaseException] | None,
+        exception_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Disconnect from the websocket."""
+        await self.async_websocket_disconnect()
+
+    @abstractmethod
+    async def async_detect_gateway_in_lan(self) -> str:
+        """Detect a gateway in the local network."""
+
+    @abstractmethod
+    async def async_get_local_session(self) -> bool:
+        """Connect to the gateway locally."""
+
+    @abstractmethod
+    async def async_get_remote_session(self) -> bool:
+        """Connect to the gateway remotely."""
+
+    @abstractmethod
+    async def async_on_update(self, message: PropertyChangedEvent) -> None:
+        """Initialize steps needed to update properties on a new message."""
+
+    async def async_websocket_connect(self) -> None:
+        """
+        Set up the websocket connection. The protocol type of the known session URL is exchanged depending on whether TLS is
+        used or not. After establishing the websocket, a ping is sent every 30 seconds to keep the connection alive. If there
+        is no response in time, the connection is terminated with error state.
+        """
+        ws_url = self._url.replace("https://", "wss://").replace("http://", "ws://")
+        ws_url = (
+            f"{ws_url}/remote/events/?topics=com/prosyst/mbs/services/fim/FunctionalItemEvent/PROPERTY_CHANGED,"
+            f"com/prosyst/mbs/services/fim/FunctionalItemEvent/UNREGISTERED"
+            f"&filter=(|(GW_ID={self.gateway.id})(!(GW_ID=*)))"
+        )
+        self._logger.debug("Connecting to %s", ws_url)
+        self._closing = False
+        self._ws = await self._session.ws_connect(ws_url, heartbeat=30)
+        self._logger.info("Starting web socket connection.")
+        self._connected = True
+        self._ws_task = asyncio.create_task(self._async_receive(self._ws))
+        self._keep_alive_task = asyncio.create_task(self._async_keep_alive())
+
+    async def async_websocket_disconnect(self, event: str = "") -> None:
+        """Close the websocket connection."""
+        if not self._ws:
+            self._logger.info("Not connected to the web socket.")
+            return
+
+        self._logger.info("Closing web socket connection.")
+        if event:
+            self._logger.info("Reason: %s", event)
+        self._closing = True
+        if self._keep_alive_task:
+            self._keep_alive_task.cancel()
+        if self._ws_task and not self._connected:
+            # We are waiting for the gateway to come back, so there is no need to wait any longer.
+            self._ws_task.cancel()
+        await self._ws.close()
+        if self._ws_task:
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._ws_task
+
+    async def _async_keep_alive(self) -> None:
+        """Keep the session valid."""
+        while True:
+            await asyncio.sleep(30)
+            try:
+                await self.async_refresh_session()
+            except GatewayOfflineError:
+                self._logger.debug("Refreshing the session failed.")
+
+    async def _async_on_error(self) -> None:
+        """React on errors. We will try reconnecting with prolonging intervals."""
+        self._connected = False
+        self._reachable = False
+        self._event_sequence = 0
+
+        sleep_interval = 16
+        while not self._reachable:
+            await self._async_try_reconnect(sleep_interval)
+            sleep_interval = min(sleep_interval * 2, 3600)
+
+        await self.async_websocket_connect()
+
+    async def _async_on_message(self, message: str) -> None:
+        """React on a message."""
+        msg = json_loads(message)
+        self._logger.debug("Got message from websocket:\n%s", msg)
+        event = PropertyChangedEvent.from_message(msg)
+        event_sequence = event.sequence_number
+        if event_sequence == self._event_sequence:
+            self._event_sequence += 1
+        elif event_sequence is not None:
+            self._logger.warning(
+                "We missed a websocket message. Internal event_sequence is at %s. Event sequence by websocket is at %s",
+                self._event_sequence,
+                event_sequence,
+            )
+            self._event_sequence = event_sequence + 1
+            self._logger.debug("self._event_sequence is set to %s", self._event_sequence)
+
+        await self.async_on_update(event)
+
+    async def _async_receive(self, ws: ClientWebSocketResponse) -> None:
+        """Receive messages until the websocket is closed."""
+        async for message in ws:
+            if message.type == WSMsgType.TEXT:
+                await self._async_on_message(message.data)
+            elif message.type == WSMsgType.ERROR:
+                self._logger.error(ws.exception())
+                break
+
+        self._connected = False
+        if self._keep_alive_task:
+            self._keep_alive_task.cancel()
+        if self._closing:
+            self._logger.info("Closed websocket connection.")
+            return
+
+        self._logger.error("Websocket connection terminated unexpectedly.")
+        await ws.close()
+        await self._async_on_error()
+
+    async def _async_try_reconnect(self, sleep_interval: int) -> None:
+        """Try to reconnect to the websocket."""
+        try:
+            self._logger.info("Trying to reconnect to the websocket.")
+            self._reachable = await self.async_get_local_session() if self._local_ip else await self.async_get_remote_session()
+        except GatewayOfflineError:
+            self._logger.info("Sleeping for %s seconds.", sleep_interval)
+            await asyncio.sleep(sleep_interval)
+        except (ClientConnectionError, asyncio.TimeoutError):
+            self._logger.info("Sleeping for %s seconds.", sleep_interval)
+            await asyncio.sleep(sleep_interval - 3)  # mDNS browsing will take up tp 3 seconds by itself
+            await self.async_detect_gateway_in_lan()
@@ -0,0 +1,66 @@
+"""Cache of local IP addresses of gateways."""
+from __future__ import annotations
+
+import json
+import logging
+import os
+from pathlib import Path
+from threading import Lock
+
+
+class DiscoveryCache:
+    """
+    The DiscoveryCache object remembers the last verified local IP address of each gateway in a JSON file. That address is
+    tried first on the next start, so searching for the gateway via mDNS can be skipped, if the address did not change. One
+    object can be shared by multiple HomeControl objects.
+
+    :param path: Path of the JSON file
+    """
+
+    def __init__(self, path: str | os.PathLike[str]) -> None:
+        """Initialize the cache."""
+        self._logger = logging.getLogger(self.__class__.__name__)
+        self._lock = Lock()
+        self._path = Path(path)
+
+    def get(self, gateway_id: str) -> str:
+        """
+        Get the last verified local IP address of a gateway.
+
+        :param gateway_id: Gateway ID (aka serial number)
+        :return: Local IP address, empty if unknown
+        """
+        with self._lock:
+            return self._load().get(gateway_id, "")
+
+    def update(self, gateway_id: str, local_ip: str) -> None:
+        """
+        Remember the local IP address of a gateway. Failures in writing the file are logged, but do not disturb the setup.
+
+        :param gateway_id: Gateway ID (aka serial number)
+        :param local_ip: Verified local IP address, empty to forget the gateway
+        """
+        with self._lock:
+            local_ips = self._load()
+            if local_ips.get(gateway_id, "") == local_ip:
+                return
+            if local_ip:
+                local_ips[gateway_id] = local_ip
+            else:
+                local_ips.pop(gateway_id, None)
+            temp_path = self._path.with_name(f"{self._path.name}.tmp")
+            try:
+                temp_path.write_text(json.dumps(local_ips), encoding="utf-8")
+                temp_path.replace(self._path)
+            except OSError:
+                self._logger.warning("Could not write discovery cache to %s.", self._path)
+
+    def _load(self) -> dict[str, str]:
+        """Load the cached IP addresses. A missing or broken file is treated like an empty cache."""
+        try:
+            return json.loads(self._path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError):
+            self._logger.warning("Could not read discovery cache from %s.", self._path)
+            return {}
@@ -0,0 +1,54 @@
+"""Events received via websocket."""
+from __future__ import annotations
+
+from typing import Any
+
+SEQUENCE_NUMBER = "com.prosyst.mbs.services.remote.event.sequence.number"
+
+
+class PropertyChangedEvent:
+    """
+    The PropertyChangedEvent object holds the parts of a websocket message needed to update properties. Messages are decoded
+    once when they arrive, so handlers use attribute access instead of looking up the same keys of nested dictionaries again
+    and again.
+
+    :param topic: Topic of the message, e.g. com/prosyst/mbs/services/fim/FunctionalItemEvent/PROPERTY_CHANGED
+    :param properties: Properties of the message as sent by the gateway
+    """
+
+    __slots__ = ("item_id", "properties", "property_name", "sequence_number", "topic", "uid", "value")
+
+    def __init__(self, topic: str, properties: dict[str, Any]) -> None:
+        """Initialize the event."""
+        self.topic = topic
+        self.properties = properties
+        self.uid: str = properties.get("uid", "")
+        self.property_name: str = properties.get("property.name", "")
+        self.value: Any = properties.get("property.value.new")
+        self.item_id: str | None = properties.get("itemId")
+        self.sequence_number: int | None = properties.get(SEQUENCE_NUMBER)
+
+    def __repr__(self) -> str:
+        """Represent the event in a readable way."""
+        return (
+            f"{self.__class__.__name__}(uid={self.uid!r}, property_name={self.property_name!r}, value={self.value!r}, "
+            f"sequence_number={self.sequence_number!r})"
+        )
+
+    @classmethod
+    def from_message(cls, message: dict[str, Any]) -> PropertyChangedEvent:
+        """
+        Decode a websocket message.
+
+        :param message: Message as received from the websocket
+        :return: Event of the message
+        """
+        return cls(message.get("topic", ""), message.get("properties", {}))
+
+    def to_message(self) -> dict[str, Any]:
+        """
+        Encode the event as websocket message again.
+
+        :return: Message as received from the websocket
+        """
+        return {"topic": self.topic, "properties": self.properties}
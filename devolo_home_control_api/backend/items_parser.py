@@ -0,0 +1,74 @@
+"""Incremental parsing of functional items."""
+from __future__ import annotations
+
+import codecs
+import json
+import re
+from typing import Any
+
+_ITEMS_START = re.compile(r'"items"\s*:\s*\[')
+_SEPARATOR = re.compile(r"[\s,]*")
+
+
+class ItemsParser:
+    """
+    The ItemsParser object parses a JSON-RPC response, while it is still arriving. Entries of result.items are handed out one
+    after another as soon as they are complete, so the whole response never needs to be kept in memory. Everything else of
+    the response is kept and available after the last item arrived.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the parser."""
+        self._decoder = json.JSONDecoder()
+        self._text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._envelope = ""
+        self._in_items = False
+
+    def feed(self, data: bytes) -> list[dict[str, Any]]:
+        """
+        Feed the next part of the response.
+
+        :param data: Part of the response as received
+        :return: Items completed by this part
+        """
+        self._buffer += self._text_decoder.decode(data)
+        if not self._envelope:
+            match = _ITEMS_START.search(self._buffer)
+            if not match:
+                return []
+            self._envelope, self._buffer = self._buffer[: match.end()], self._buffer[match.end() :]
+            self._in_items = True
+
+        items: list[dict[str, Any]] = []
+        position = 0
+        while self._in_items:
+            separator = _SEPARATOR.match(self._buffer, position)
+            position = separator.end() if separator else position
+            if position == len(self._buffer):
+                break
+            if self._buffer[position] == "]":
+                self._in_items = False
+                break
+            try:
+                item, position = self._decoder.raw_decode(self._buffer, position)
+            except json.JSONDecodeError:
+                # The item is not complete yet.
+                break
+            items.append(item)
+        self._buffer = self._buffer[position:]
+        return items
+
+    def close(self) -> dict[str, Any]:
+        """
+        Finish parsing.
+
+        :return: Response without the items already handed out
+        :raises: ValueError: The response is not valid JSON or ended within the items
+        """
+        self._buffer += self._text_decoder.decode(b"", final=True)
+        if not self._envelope:
+            return json.loads(self._buffer)
+        if self._in_items:
+            raise ValueError("Response ended before all items arrived.")  # noqa: TRY003
+        return json.loads(self._envelope + self._buffer)
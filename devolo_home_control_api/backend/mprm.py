@@ -4,20 +4,129 @@ from __future__ import annotations
 import contextlib
 import socket
 import sys
-import time
 from abc import ABC
+from concurrent.futures import ThreadPoolExecutor
 from http import HTTPStatus
 from json import JSONDecodeError
-from threading import Thread
+from threading import Event, RLock, Thread
+from typing import Callable, ClassVar
 from urllib.parse import urlsplit
 
 import requests
-from zeroconf import ServiceBrowser, ServiceStateChange, Zeroconf
+from zeroconf import ServiceBrowser, ServiceInfo, ServiceStateChange, Zeroconf
 
 from devolo_home_control_api.exceptions import GatewayOfflineError
 
+from .discovery_cache import DiscoveryCache
 from .mprm_websocket import MprmWebsocket
 
+AddressHandler = Callable[[list[bytes]], None]
+
+
+class GatewayBrowser:
+    """
+    The GatewayBrowser object browses for devolo Home Control Central Units in your LAN. All handlers using the same
+    Zeroconf instance share one browser. Every service is resolved only once and its addresses are handed only to the
+    handlers looking for the gateway announcing it. Handlers registering later on get the gateways already known replayed.
+
+    :param zeroconf: Zeroconf instance to browse with
+    """
+
+    _browsers: ClassVar[dict[Zeroconf, GatewayBrowser]] = {}
+    _lock = RLock()
+
+    def __init__(self, zeroconf: Zeroconf) -> None:
+        """Initialize browsing."""
+        self._handlers: list[tuple[str, AddressHandler]] = []
+        self._services: dict[tuple[str, str], ServiceInfo] = {}
+        self._browser = ServiceBrowser(zeroconf, "_dvl-deviceapi._tcp.local.", handlers=[self._on_service_state_change])
+
+    @classmethod
+    def register(cls, zeroconf: Zeroconf, gateway_id: str, handler: AddressHandler) -> None:
+        """
+        Register a handler for the addresses of a gateway. If there is no browser for the Zeroconf instance, yet, it is
+        started.
+
+        :param zeroconf: Zeroconf instance to browse with
+        :param gateway_id: Gateway ID (aka serial number) to look for
+        :param handler: Handler to call with the addresses of the gateway
+        """
+        with cls._lock:
+            if zeroconf not in cls._browsers:
+                cls._browsers[zeroconf] = cls(zeroconf)
+            services = cls._browsers[zeroconf].add_handler(gateway_id, handler)
+        for service_info in services:
+            handler(service_info.addresses)
+
+    @classmethod
+    def unregister(cls, zeroconf: Zeroconf, handler: AddressHandler) -> None:
+        """
+        Unregister a handler. If it was the last one, the browser is cancelled.
+
+        :param zeroconf: Zeroconf instance browsed with
+        :param handler: Handler registered before
+        """
+        with cls._lock:
+            browser = cls._browsers[zeroconf]
+            if browser.remove_handler(handler):
+                return
+            del cls._browsers[zeroconf]
+        Thread(target=browser.cancel, name=f"{cls.__name__}.browser_cancel").start()
+
+    def add_handler(self, gateway_id: str, handler: AddressHandler) -> list[ServiceInfo]:
+        """
+        Add a handler to this browser.
+
+        :param gateway_id: Gateway ID (aka serial number) to look for
+        :param handler: Handler to call with the addresses of the gateway
+        :return: Services already known, that might be announced by the gateway
+        """
+        with self._lock:
+            self._handlers.append((gateway_id, handler))
+            return [service_info for service_info in self._services.values() if self._announces(service_info, gateway_id)]
+
+    def cancel(self) -> None:
+        """Stop browsing."""
+        self._browser.cancel()
+
+    def remove_handler(self, handler: AddressHandler) -> int:
+        """
+        Remove a handler from this browser.
+
+        :param handler: Handler registered before
+        :return: Number of handlers left
+        """
+        with self._lock:
+            self._handlers = [(gateway_id, known) for gateway_id, known in self._handlers if known != handler]
+            return len(self._handlers)
+
+    @staticmethod
+    def _announces(service_info: ServiceInfo, gateway_id: str) -> bool:
+        """Check, if a service might be announced by a gateway. Services not telling a serial number might be any gateway."""
+        serial_number = service_info.properties.get(b"SN")
+        return serial_number is None or serial_number.decode() == gateway_id
+
+    def _on_service_state_change(
+        self, zeroconf: Zeroconf, service_type: str, name: str, state_change: ServiceStateChange
+    ) -> None:
+        """Resolve added services once and hand their addresses to the handlers looking for the gateway announcing them."""
+        if state_change is ServiceStateChange.Removed:
+            with self._lock:
+                self._services.pop((service_type, name), None)
+            return
+        if state_change is not ServiceStateChange.Added:
+            return
+
+        service_info = zeroconf.get_service_info(service_type, name)
+        if not service_info or not service_info.server or not service_info.server.startswith("devolo-homecontrol"):
+            return
+        with self._lock:
+            self._services[(service_type, name)] = service_info
+            handlers = [handler for gateway_id, handler in self._handlers if self._announces(service_info, gateway_id)]
+        # Trying the addresses takes a while, so the browser must not wait for it.
+        for handler in handlers:
+            Thread(target=handler, args=(service_info.addresses,), name=f"{self.__class__.__name__}.handler").start()
+
 
 class Mprm(MprmWebsocket, ABC):
     """
@@ -27,12 +136,11 @@ class Mprm(MprmWebsocket, ABC):
 
     def __init__(self) -> None:
         """Initialize communication."""
+        self._discovery_cache: DiscoveryCache | None
         self._zeroconf: Zeroconf | None
 
         super().__init__()
-
-        self.detect_gateway_in_lan()
-        self.create_connection()
+        self._gateway_found = Event()
 
     def create_connection(self) -> None:
         """
@@ -51,22 +159,32 @@ class Mprm(MprmWebsocket, ABC):
     def detect_gateway_in_lan(self) -> str:
         """
         Detect a gateway in local network via mDNS and check if it is the desired one. Unfortunately, the only way to tell is
-        to try a connection with the known credentials. If the gateway is not found within 3 seconds, it is assumed that a
-        remote connection is needed.
+        to try a connection with the known credentials. The search ends as soon as the gateway answered. If the gateway is
+        not found within 3 seconds, it is assumed that a remote connection is needed. If a discovery cache is used, the last
+        known local IP is tried first and the search is skipped, if it still belongs to the gateway.
 
         :return: Local IP of the gateway, if found
         """
-        zeroconf = self._zeroconf or Zeroconf()
-        browser = ServiceBrowser(zeroconf, "_dvl-deviceapi._tcp.local.", handlers=[self._on_service_state_change])
-        self._logger.info("Searching for gateway in LAN.")
-        start_time = time.time()
-        while not time.time() > start_time + 3 and not self._local_ip:
-            time.sleep(0.05)
+        # The gateway might have got a new IP address since it was detected last time.
+        self._gateway_found.clear()
+        self._local_ip = ""
+        cached_ip = self._discovery_cache.get(self.gateway.id) if self._discovery_cache else ""
+        if cached_ip:
+            self._logger.info("Trying cached local IP %s.", cached_ip)
+            self._try_local_address(cached_ip)
+
+        if not self._gateway_found.is_set():
+            zeroconf = self._zeroconf or Zeroconf()
+            self._logger.info("Searching for gateway in LAN.")
+            GatewayBrowser.register(zeroconf, self.gateway.id, self._on_gateway_announced)
+            self._gateway_found.wait(timeout=3)
 
-        Thread(target=browser.cancel, name=f"{self.__class__.__name__}.browser_cancel").start()
-        if not self._zeroconf:
-            Thread(target=zeroconf.close, name=f"{self.__class__.__name__}.zeroconf_close").start()
+            GatewayBrowser.unregister(zeroconf, self._on_gateway_announced)
+            if not self._zeroconf:
+                Thread(target=zeroconf.close, name=f"{self.__class__.__name__}.zeroconf_close").start()
 
+        if self._discovery_cache:
+            self._discovery_cache.update(self.gateway.id, self._local_ip)
         return self._local_ip
 
     def get_local_session(self) -> bool:
@@ -115,27 +233,32 @@ class Mprm(MprmWebsocket, ABC):
             raise GatewayOfflineError from None
         return True
 
-    def _on_service_state_change(
-        self, zeroconf: Zeroconf, service_type: str, name: str, state_change: ServiceStateChange
-    ) -> None:
-        """Service handler for Zeroconf state changes."""
-        if state_change is ServiceStateChange.Added:
-            service_info = zeroconf.get_service_info(service_type, name)
-            if service_info and service_info.server and service_info.server.startswith("devolo-homecontrol"):
-                with contextlib.suppress(requests.exceptions.ReadTimeout), contextlib.suppress(
-                    requests.exceptions.ConnectTimeout
-                ):
-                    self._try_local_connection(service_info.addresses)
+    def _on_gateway_announced(self, addresses: list[bytes]) -> None:
+        """Try the addresses of a gateway announced via mDNS, unless the gateway was found already."""
+        if not self._gateway_found.is_set():
+            self._try_local_connection(addresses)
 
     def _try_local_connection(self, addresses: list[bytes]) -> None:
-        """Try to connect to an mDNS hostname. If connection was successful, save local IP address."""
-        for address in addresses:
-            ip = socket.inet_ntoa(address)
+        """Try to connect to the addresses of an mDNS hostname in parallel. If a connection was successful, save its IP."""
+        if not addresses:
+            return
+        with ThreadPoolExecutor(
+            max_workers=len(addresses), thread_name_prefix=f"{self.__class__.__name__}.try_local_connection"
+        ) as executor:
+            executor.map(self._try_local_address, map(socket.inet_ntoa, addresses))
+
+    def _try_local_address(self, ip: str) -> None:
+        """Try to connect to an IP address. If connection was successful, save it as local IP address."""
+        with contextlib.suppress(
+            requests.exceptions.ConnectTimeout, requests.exceptions.ConnectionError, requests.exceptions.ReadTimeout
+        ):
             if (
                 requests.get(
                     f"http://{ip}/dhlp/port/full", auth=(self.gateway.local_user, self.gateway.local_passkey), timeout=0.5
                 ).status_code
                 == HTTPStatus.OK
+                and not self._gateway_found.is_set()
             ):
                 self._logger.debug("Got successful answer from ip %s. Setting this as local gateway", ip)
                 self._local_ip = ip
+                self._gateway_found.set()
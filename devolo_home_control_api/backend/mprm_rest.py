@@ -1,20 +1,25 @@
 """mPRM communication via REST."""
 from __future__ import annotations
 
-import json
 import logging
 import sys
 from abc import ABC
+from collections.abc import Iterator
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
 from enum import IntEnum
-from typing import Any
+from typing import Any, Callable
 
 from requests import Session
-from requests.exceptions import ConnectionError, ReadTimeout  # noqa: A004
+from requests.exceptions import ChunkedEncodingError, ConnectionError, ReadTimeout  # noqa: A004
 
 from devolo_home_control_api.devices import Gateway
 from devolo_home_control_api.exceptions import GatewayOfflineError
+from devolo_home_control_api.helper import json_dumps, json_loads
 from devolo_home_control_api.mydevolo import Mydevolo
 
+from .items_parser import ItemsParser
+
 
 class MprmRest(ABC):
     """
@@ -28,6 +33,8 @@ class MprmRest(ABC):
         logging.captureWarnings(capture=True)
 
         self._logger = logging.getLogger(self.__class__.__name__)
+        self._chunk_size = 250
+        self._chunks_in_flight = 4
         self._data_id = 0
         self._local_ip = ""
         self._url = ""
@@ -36,6 +43,24 @@ class MprmRest(ABC):
         self._session: Session
         self.gateway: Gateway
 
+    @contextmanager
+    def batch(self) -> Iterator[RestBatch]:
+        """
+        Collect calls and send them to the gateway in one request, when leaving the context. Each call returns a future, that
+        is resolved with the same value the direct call would have returned. Properties are updated as soon as the gateway
+        reports the changes.
+
+        :return: Batch to collect calls in
+        """
+        batch = RestBatch(self._evaluate_response)
+        try:
+            yield batch
+        except BaseException:
+            batch.cancel()
+            raise
+        if batch:
+            self._post_batch(batch)
+
     def get_all_devices(self) -> list[str]:
         """
         Get all devices.
@@ -73,6 +98,40 @@ class MprmRest(ABC):
         self._logger.debug("Response of 'get_data_from_uid_list':\n%s", response)
         return response["result"]["items"]
 
+    def iter_data_from_uid_list(self, uids: list[str]) -> Iterator[list[dict[str, Any]]]:
+        """
+        Return data from an element UID list using multiple RPC calls in parallel. Each call asks for a chunk of the element
+        UIDs. The data is yielded as soon as a call is answered, so the order may differ from the element UIDs.
+
+        :param uids: Element UIDs, something like [devolo.MultiLevelSensor:hdm:ZWave:CBC56091/24#2,
+                     devolo.MultiLevelSensor:hdm:ZWave:CBC56091/24#1]
+        :return: Data connected to a chunk of element UIDs
+        """
+        chunks = [uids[i : i + self._chunk_size] for i in range(0, len(uids), self._chunk_size)]
+        if len(chunks) <= 1:
+            yield from (self.get_data_from_uid_list(chunk) for chunk in chunks)
+            return
+
+        with ThreadPoolExecutor(
+            max_workers=min(self._chunks_in_flight, len(chunks)), thread_name_prefix=f"{self.__class__.__name__}.chunk"
+        ) as executor:
+            futures = [executor.submit(self.get_data_from_uid_list, chunk) for chunk in chunks]
+            for future in as_completed(futures):
+                yield future.result()
+
+    def stream_data_from_uid_list(self, uids: list[str]) -> Iterator[dict[str, Any]]:
+        """
+        Return data from an element UID list item by item, while the response is still arriving. Like with
+        iter_data_from_uid_list, element UIDs are requested in chunks, but one chunk after another.
+
+        :param uids: Element UIDs, something like [devolo.MultiLevelSensor:hdm:ZWave:CBC56091/24#2,
+                     devolo.MultiLevelSensor:hdm:ZWave:CBC56091/24#1]
+        :return: Data connected to an element UID
+        """
+        for i in range(0, len(uids), self._chunk_size):
+            data = {"method": "FIM/getFunctionalItems", "params": [uids[i : i + self._chunk_size], 0]}
+            yield from self._post_streamed(data)
+
     def refresh_session(self) -> None:
         """Refresh currently running session. Without this call from time to time especially websockets will terminate."""
         self._logger.debug("Refreshing session.")
@@ -152,22 +211,205 @@ class MprmRest(ABC):
         self._data_id += 1
         data["jsonrpc"] = "2.0"
         data["id"] = self._data_id
-        try:
-            response = self._session.post(
-                f"{self._url}/remote/json-rpc", data=json.dumps(data), headers={"content-type": "application/json"}, timeout=30
-            ).json()
-
-        except (ConnectionError, ReadTimeout):
-            self._logger.error("Gateway is offline.")
-            self._logger.debug(sys.exc_info())
-            self.gateway.update_state(online=False)
-            raise GatewayOfflineError from None
+        response = self._send(data)
         if response["id"] != data["id"]:
             self._logger.error("Got an unexpected response after posting data.")
             self._logger.debug("Message had ID %s, response had ID %s.", data["id"], response["id"])
             raise ValueError("Got an unexpected response after posting data.")  # noqa: TRY003
         return response
 
+    def _post_batch(self, batch: RestBatch) -> None:
+        """
+        Communicate with the RPC interface using a JSON-RPC 2.0 batch request. Responses are matched to the calls by their ID.
+
+        :param batch: Batch of calls to be send
+        """
+        self._data_id = batch.prepare(self._data_id)
+        try:
+            response = self._send(batch.requests)
+        except GatewayOfflineError as exception:
+            batch.fail(exception)
+            raise
+        batch.resolve(response)
+
+    def _post_streamed(self, data: dict[str, Any]) -> Iterator[dict[str, Any]]:
+        """
+        Communicate with the RPC interface and parse the response incrementally. If the call times out, it is assumed that
+        the gateway is offline and the state is changed accordingly.
+
+        :param data: Data to be send
+        :return: Items of the response as soon as they arrived
+        """
+        self._data_id += 1
+        data["jsonrpc"] = "2.0"
+        data["id"] = self._data_id
+        parser = ItemsParser()
+        try:
+            with self._session.post(
+                f"{self._url}/remote/json-rpc",
+                data=json_dumps(data),
+                headers={"content-type": "application/json"},
+                timeout=30,
+                stream=True,
+            ) as response:
+                for chunk in response.iter_content(chunk_size=65536):
+                    yield from parser.feed(chunk)
+        except (ChunkedEncodingError, ConnectionError, ReadTimeout):
+            self._set_offline()
+            raise GatewayOfflineError from None
+        response_data = parser.close()
+        if response_data["id"] != data["id"]:
+            self._logger.error("Got an unexpected response after posting data.")
+            self._logger.debug("Message had ID %s, response had ID %s.", data["id"], response_data["id"])
+            raise ValueError("Got an unexpected response after posting data.")  # noqa: TRY003
+        if "result" not in response_data:
+            self._logger.error("Got an error response after posting data.")
+            self._logger.debug("Response had error %s.", response_data.get("error"))
+            raise ValueError("Got an error response after posting data.")  # noqa: TRY003
+
+    def _send(self, data: dict[str, Any] | list[dict[str, Any]]) -> Any:
+        """Send data to the RPC interface. If the call times out, the gateway's state is changed to offline."""
+        try:
+            response = self._session.post(
+                f"{self._url}/remote/json-rpc", data=json_dumps(data), headers={"content-type": "application/json"}, timeout=30
+            )
+        except (ConnectionError, ReadTimeout):
+            self._set_offline()
+            raise GatewayOfflineError from None
+        return json_loads(response.content)
+
+    def _set_offline(self) -> None:
+        """Change the gateway's state to offline."""
+        self._logger.error("Gateway is offline.")
+        self._logger.debug(sys.exc_info())
+        self.gateway.update_state(online=False)
+
+
+class RestBatch:
+    """
+    The RestBatch object collects calls to the mPRM, that shall be sent in one JSON-RPC 2.0 batch request. It offers the
+    calls of MprmRest, that can be combined, but returns futures instead of values.
+
+    :param evaluate_response: Function evaluating the response of setting a device to a value
+    """
+
+    def __init__(self, evaluate_response: Callable[..., bool]) -> None:
+        """Initialize the batch."""
+        self._evaluate_response = evaluate_response
+        self._calls: list[tuple[Callable[[dict[str, Any]], Any], Future[Any]]] = []
+        self.requests: list[dict[str, Any]] = []
+
+    def __len__(self) -> int:
+        """Get the number of calls collected."""
+        return len(self.requests)
+
+    def get_data_from_uid_list(self, uids: list[str]) -> Future[list[dict[str, Any]]]:
+        """
+        Return data from an element UID list.
+
+        :param uids: Element UIDs, something like [devolo.MultiLevelSensor:hdm:ZWave:CBC56091/24#2,
+                     devolo.MultiLevelSensor:hdm:ZWave:CBC56091/24#1]
+        :return: Future of the data connected to the element UIDs
+        """
+        data = {"method": "FIM/getFunctionalItems", "params": [uids, 0]}
+        return self._add(data, lambda response: response["result"]["items"])
+
+    def set_binary_switch(self, uid: str, state: bool) -> Future[bool]:
+        """
+        Set a binary switch state of a device.
+
+        :param uid: Element UID, something like devolo.BinarySwitch:hdm:ZWave:CBC56091/24
+        :param state: True if switching on, False if switching off
+        :return: Future being True if successfully switched, false otherwise
+        """
+        data: dict[str, str | list] = {"method": "FIM/invokeOperation", "params": [uid, "turnOn" if state else "turnOff", []]}
+        return self._add(data, lambda response: self._evaluate_response(uid=uid, value=state, response=response))
+
+    def set_multi_level_switch(self, uid: str, value: float) -> Future[bool]:
+        """
+        Set a multi level switch value of a device.
+
+        :param uid: Element UID, something like devolo.Dimmer:hdm:ZWave:CBC56091/24
+        :param value: Value the multi level switch shall have
+        :return: Future being True if successfully switched, false otherwise
+        """
+        data = {"method": "FIM/invokeOperation", "params": [uid, "sendValue", [value]]}
+        return self._add(data, lambda response: self._evaluate_response(uid=uid, value=value, response=response))
+
+    def set_remote_control(self, uid: str, key_pressed: int) -> Future[bool]:
+        """
+        Press the button of a remote control virtually.
+
+        :param uid: Element UID, something like devolo.RemoteControl:hdm:ZWave:CBC56091/24
+        :param key_pressed: Number of the button pressed
+        :return: Future being True if successfully switched, false otherwise
+        """
+        data = {"method": "FIM/invokeOperation", "params": [uid, "pressKey", [key_pressed]]}
+        return self._add(data, lambda response: self._evaluate_response(uid=uid, value=key_pressed, response=response))
+
+    def set_setting(self, uid: str, setting: list[Any]) -> Future[bool]:
+        """
+        Set a setting of a device.
+
+        :param uid: Element UID, something like acs.hdm:ZWave:CBC56091/24
+        :param setting: Settings to set
+        :return: Future being True if successfully switched, false otherwise
+        """
+        data = {"method": "FIM/invokeOperation", "params": [uid, "save", setting]}
+        return self._add(data, lambda response: self._evaluate_response(uid=uid, value=setting, response=response))
+
+    def cancel(self) -> None:
+        """Cancel all calls, e.g. because the batch will not be sent."""
+        for _, future in self._calls:
+            future.cancel()
+
+    def fail(self, exception: BaseException) -> None:
+        """
+        Let all calls fail, e.g. because the gateway is offline.
+
+        :param exception: Exception to be raised by the futures
+        """
+        for _, future in self._calls:
+            future.set_exception(exception)
+
+    def prepare(self, last_id: int) -> int:
+        """
+        Assign consecutive IDs to the calls.
+
+        :param last_id: ID of the last call sent before
+        :return: ID of the last call in this batch
+        """
+        for data_id, data in enumerate(self.requests, start=last_id + 1):
+            data["jsonrpc"] = "2.0"
+            data["id"] = data_id
+        return last_id + len(self.requests)
+
+    def resolve(self, responses: list[dict[str, Any]] | dict[str, Any]) -> None:
+        """
+        Resolve the futures of all calls with the matching responses. Calls without response fail with a ValueError.
+
+        :param responses: Responses to the batch request
+        """
+        if isinstance(responses, dict):
+            responses = [responses]
+        responses_by_id = {response.get("id"): response for response in responses}
+        for data, (convert, future) in zip(self.requests, self._calls):
+            response = responses_by_id.get(data["id"])
+            if response is None or "result" not in response:
+                future.set_exception(ValueError(f"Got no valid response to call {data['id']}."))
+                continue
+            try:
+                future.set_result(convert(response))
+            except (KeyError, TypeError) as exception:
+                future.set_exception(exception)
+
+    def _add(self, data: dict[str, Any], convert: Callable[[dict[str, Any]], Any]) -> Future[Any]:
+        """Add a call to the batch."""
+        future: Future[Any] = Future()
+        self.requests.append(data)
+        self._calls.append((convert, future))
+        return future
+
 
 class RestResponseStatus(IntEnum):
     """Status codes for mPRM responses."""
@@ -1,19 +1,23 @@
 """mPRM communication via websocket."""
 from __future__ import annotations
 
-import json
+import random
+import sys
 import threading
 from abc import ABC, abstractmethod
-from time import sleep, time
+from enum import Enum
+from time import monotonic, sleep, time
 from types import TracebackType
-from typing import Any
+from typing import Any, Callable
 
 import requests
 import websocket
 from urllib3.connection import ConnectTimeoutError
 
 from devolo_home_control_api.exceptions import GatewayOfflineError
+from devolo_home_control_api.helper import Overflow, QueueMetrics, WorkerQueue, json_loads
 
+from .event import PropertyChangedEvent
 from .mprm_rest import MprmRest
 
 try:
@@ -21,6 +25,24 @@ try:
 except ImportError:
     from typing_extensions import Self
 
+_RECONNECT_INTERVAL = 16.0
+_RECONNECT_MAX_INTERVAL = 3600.0
+_RESYNC_DELAY = 1.0
+_RESYNC_INTERVAL = 60.0
+
+
+class ConnectionState(Enum):
+    """State of the websocket connection."""
+
+    CONNECTING = "connecting"
+    """The websocket is being established."""
+    CONNECTED = "connected"
+    """The websocket is established."""
+    RECONNECTING = "reconnecting"
+    """The websocket broke down. Reconnecting is tried with prolonging intervals."""
+    DISCONNECTED = "disconnected"
+    """The websocket was closed on purpose."""
+
 
 class MprmWebsocket(MprmRest, ABC):
     """
@@ -30,7 +52,13 @@ class MprmWebsocket(MprmRest, ABC):
     either local or remote. Last but not least, the derived class needs to implement a method that is called on new messages.
 
     The websocket connection itself runs in a thread, that might not terminate as expected. Using a with-statement is
-    recommended.
+    recommended. If a derived class sets a websocket queue size, messages are only queued while receiving them and handled in
+    a worker thread, so slow handling neither stalls the websocket nor delays answering pings. If messages were missed, e.g.
+    because of a gap in the sequence numbers or while reconnecting, the derived class is asked to resync in the background.
+
+    If the websocket breaks down, reconnecting is scheduled in a separate thread with jittered, exponentially growing
+    intervals, so many clients do not reconnect in lockstep. A derived class can set a callback to be told about changes of
+    the connection state.
     """
 
     def __init__(self) -> None:
@@ -40,6 +68,18 @@ class MprmWebsocket(MprmRest, ABC):
         self._connected = False  # This attribute saves, if the websocket is fully established
         self._reachable = True  # This attribute saves, if the a new session can be established
         self._event_sequence = 0
+        self._websocket_queue_size = 0
+        self._frames: WorkerQueue | None = None
+        self._resync_lock = threading.Lock()
+        self._resync_timer: threading.Timer | None = None
+        self._last_resync = float("-inf")
+        self._update_lock = threading.RLock()  # Serializes updates by websocket messages and resyncs
+        self._reconnected = False
+        self._state = ConnectionState.DISCONNECTED
+        self._state_lock = threading.Lock()
+        self._state_callback: Callable[[ConnectionState], None] | None = None
+        self._wake = threading.Event()  # Set by network hints to reconnect right away
+        self._stop = threading.Event()  # Set by closing the websocket on purpose
 
     def __enter__(self) -> Self:
         """Connect to the websocket."""
@@ -54,6 +94,11 @@ class MprmWebsocket(MprmRest, ABC):
         """Disconnect from the websocket."""
         self.websocket_disconnect()
 
+    @property
+    def connection_state(self) -> ConnectionState:
+        """Get the current state of the websocket connection."""
+        return self._state
+
     @abstractmethod
     def detect_gateway_in_lan(self) -> str:
         """Detect a gateway in the local network."""
@@ -67,9 +112,23 @@ class MprmWebsocket(MprmRest, ABC):
         """Connect to the gateway remotely."""
 
     @abstractmethod
-    def on_update(self, message: dict[str, Any]) -> None:
+    def on_update(self, message: PropertyChangedEvent) -> None:
         """Initialize steps needed to update properties on a new message."""
 
+    @abstractmethod
+    def resync(self) -> None:
+        """
+        Bring devices and properties up to date, e.g. after websocket messages were missed. Changes are applied while holding
+        the update lock, so messages wait meanwhile.
+        """
+
+    def network_up(self) -> None:
+        """
+        Hint, that the network is available again, e.g. after resuming from sleep. If reconnecting is pending, it is tried
+        right away and the intervals start over.
+        """
+        self._wake.set()
+
     def wait_for_websocket_establishment(self) -> None:
         """
         In some cases it is needed to wait for the websocket to be fully established. This method can be used to block your
@@ -82,12 +141,49 @@ class MprmWebsocket(MprmRest, ABC):
             self._logger.debug("Websocket could not be established")
             raise GatewayOfflineError
 
+    def websocket_queue_metrics(self) -> QueueMetrics | None:
+        """
+        Get the health of the queue of websocket messages.
+
+        :return: Queue metrics, if messages are queued
+        """
+        frames = self._frames
+        return frames.metrics if frames else None
+
     def websocket_connect(self) -> None:
         """
         Set up the websocket connection. The protocol type of the known session URL is exchanged depending on whether TLS is
         used or not. After establishing the websocket, a ping is sent every 30 seconds to keep the connection alive. If there
         is no response within 5 seconds, the connection is terminated with error state.
         """
+        self._stop.clear()
+        self._wake.clear()
+        self._set_state(ConnectionState.CONNECTING)
+        self._connect()
+
+    def websocket_disconnect(self, event: str = "") -> None:
+        """Close the websocket connection. Pending reconnects and resyncs are cancelled."""
+        self._stop.set()
+        self._set_state(ConnectionState.DISCONNECTED)
+        self._wake.set()  # Do not let a pending reconnect wait any longer.
+        with self._resync_lock:
+            if self._resync_timer:
+                self._resync_timer.cancel()
+                self._resync_timer = None
+        if not self._ws:
+            self._logger.info("Not connected to the web socket.")
+            return
+
+        self._logger.info("Closing web socket connection.")
+        if event:
+            self._logger.info("Reason: %s", event)
+        self._ws.close()
+        frames, self._frames = self._frames, None
+        if frames:
+            frames.close()
+
+    def _connect(self) -> None:
+        """Connect to the websocket and keep the connection running until it is closed."""
         ws_url = self._url.replace("https://", "wss://").replace("http://", "ws://")
         cookie = "; ".join(f"{name}={value}" for name, value in self._session.cookies.items())
 
@@ -97,6 +193,11 @@ class MprmWebsocket(MprmRest, ABC):
             f"&filter=(|(GW_ID={self.gateway.id})(!(GW_ID=*)))"
         )
         self._logger.debug("Connecting to %s", ws_url)
+        if self._websocket_queue_size and not self._frames:
+            # Dropped messages are noticed by their sequence numbers like messages missed on the way.
+            self._frames = WorkerQueue(
+                f"{self.__class__.__name__}.websocket_worker", self._websocket_queue_size, Overflow.DROP_OLDEST
+            )
         self._ws = websocket.WebSocketApp(
             ws_url,
             cookie=cookie,
@@ -108,44 +209,33 @@ class MprmWebsocket(MprmRest, ABC):
         )
         self._ws.run_forever(ping_interval=30, ping_timeout=5)
 
-    def websocket_disconnect(self, event: str = "") -> None:
-        """Close the websocket connection."""
-        if not self._ws:
-            self._logger.info("Not connected to the web socket.")
-            return
-
-        self._logger.info("Closing web socket connection.")
-        if event:
-            self._logger.info("Reason: %s", event)
-        self._ws.close()
-
     def _on_close(self, *_: Any) -> None:
         """React on closing the websocket."""
         self._logger.info("Closed websocket connection.")
 
     def _on_error(self, ws: websocket.WebSocketApp, error: Exception) -> None:
-        """React on errors. We will try reconnecting with prolonging intervals."""
+        """React on errors. Reconnecting is scheduled in a separate thread, so this one can end."""
         self._logger.error(error)
-        self._connected = False
-        self._reachable = False
         ws.close()
-        self._event_sequence = 0
-
-        sleep_interval = 16
-        while not self._reachable:
-            self._try_reconnect(sleep_interval)
-            sleep_interval = min(sleep_interval * 2, 3600)
-
-        self.websocket_connect()
+        self._schedule_reconnect()
 
     def _on_message(self, _: websocket.WebSocketApp, message: str) -> None:
-        """React on a message."""
-        msg = json.loads(message)
+        """React on a message. If messages are queued, they are handled later on in the worker thread."""
+        frames = self._frames  # The queue is dropped, if the websocket is closed meanwhile.
+        if frames:
+            frames.put(self._process_frame, (message,))
+        else:
+            self._process_frame((message,))
+
+    def _process_frame(self, frame: tuple[str]) -> None:
+        """Decode a message, check its sequence number and update properties."""
+        msg = json_loads(frame[0])
         self._logger.debug("Got message from websocket:\n%s", msg)
-        event_sequence = msg["properties"]["com.prosyst.mbs.services.remote.event.sequence.number"]
+        event = PropertyChangedEvent.from_message(msg)
+        event_sequence = event.sequence_number
         if event_sequence == self._event_sequence:
             self._event_sequence += 1
-        else:
+        elif event_sequence is not None:
             self._logger.warning(
                 "We missed a websocket message. Internal event_sequence is at %s. Event sequence by websocket is at %s",
                 self._event_sequence,
@@ -153,8 +243,10 @@ class MprmWebsocket(MprmRest, ABC):
             )
             self._event_sequence = event_sequence + 1
             self._logger.debug("self._event_sequence is set to %s", self._event_sequence)
+            self._schedule_resync()
 
-        self.on_update(msg)
+        with self._update_lock:
+            self.on_update(event)
 
     def _on_open(self, ws: websocket.WebSocketApp) -> None:
         """Keep the websocket open."""
@@ -166,20 +258,109 @@ class MprmWebsocket(MprmRest, ABC):
 
         threading.Thread(target=run, name=f"{self.__class__.__name__}.websocket_run").start()
         self._connected = True
+        self._set_state(ConnectionState.CONNECTED, expected=(ConnectionState.CONNECTING,))
+        if self._reconnected:
+            # All messages sent while we were offline are lost.
+            self._reconnected = False
+            self._schedule_resync()
 
     def _on_pong(self, *_: Any) -> None:
         """Keep the session valid."""
         self.refresh_session()
 
-    def _try_reconnect(self, sleep_interval: int) -> None:
-        """Try to reconnect to the websocket."""
+    def _reconnect(self) -> None:
+        """
+        Try reconnecting with jittered, exponentially growing intervals until it succeeds or the websocket is closed on
+        purpose. Once the gateway is reachable, this thread keeps the new connection running.
+        """
+        interval = _RECONNECT_INTERVAL
+        while True:
+            delay = random.uniform(0, interval)  # noqa: S311
+            self._logger.info("Trying to reconnect to the websocket in %.1f seconds.", delay)
+            if self._wake.wait(delay) and not self._stop.is_set():
+                self._logger.debug("Network is up again.")
+                self._wake.clear()
+                interval = _RECONNECT_INTERVAL
+            if self._stop.is_set():
+                return
+            self._reachable = self._try_reconnect()
+            if self._reachable:
+                break
+            interval = min(interval * 2, _RECONNECT_MAX_INTERVAL)
+
+        if self._set_state(ConnectionState.CONNECTING, expected=(ConnectionState.RECONNECTING,)):
+            self._connect()
+
+    def _resync(self) -> None:
+        """Resync and remember when it happened."""
+        with self._resync_lock:
+            self._resync_timer = None
+            self._last_resync = monotonic()
+        try:
+            self.resync()
+        except (ConnectionError, GatewayOfflineError, requests.exceptions.RequestException):
+            self._logger.error("Could not resync with the gateway.")
+            self._logger.debug(sys.exc_info())
+        except Exception:
+            self._logger.exception("Failed to resync with the gateway.")
+
+    def _schedule_resync(self) -> None:
+        """
+        Resync in the background. As messages are often missed in bursts, the resync waits a moment and covers all of them.
+        It does not take place more often than once per resync interval, so a flaky connection does not flood the gateway.
+        """
+        with self._resync_lock:
+            if self._resync_timer:
+                return
+            delay = max(_RESYNC_DELAY, self._last_resync + _RESYNC_INTERVAL - monotonic())
+            self._logger.debug("Resyncing with the gateway in %s seconds.", delay)
+            self._resync_timer = threading.Timer(delay, self._resync)
+            self._resync_timer.name = f"{self.__class__.__name__}.resync"
+            self._resync_timer.daemon = True
+            self._resync_timer.start()
+
+    def _schedule_reconnect(self) -> None:
+        """
+        Reconnect in a separate thread. Nothing is scheduled, if the websocket was closed on purpose or reconnecting is
+        pending already.
+        """
+        self._connected = False
+        self._reachable = False
+        self._event_sequence = 0
+        self._reconnected = True
+        if self._set_state(ConnectionState.RECONNECTING, expected=(ConnectionState.CONNECTING, ConnectionState.CONNECTED)):
+            self._wake.clear()
+            threading.Thread(target=self._reconnect, name=f"{self.__class__.__name__}.reconnect", daemon=True).start()
+
+    def _set_state(self, state: ConnectionState, *, expected: tuple[ConnectionState, ...] = ()) -> bool:
+        """
+        Change the connection state and tell the derived class about it.
+
+        :param state: New connection state
+        :param expected: If given, change the state only coming from one of these states
+        :return: True, if the state was changed
+        """
+        with self._state_lock:
+            if (expected and self._state not in expected) or self._state is state:
+                return False
+            self._state = state
+        self._logger.debug("Websocket is %s.", state.value)
+        if self._state_callback:
+            self._state_callback(state)
+        return True
+
+    def _try_reconnect(self) -> bool:
+        """
+        Try to get a new session.
+
+        :return: True, if the gateway is reachable again
+        """
         try:
             self._logger.info("Trying to reconnect to the websocket.")
-            self._reachable = self.get_local_session() if self._local_ip else self.get_remote_session()
+            return self.get_local_session() if self._local_ip else self.get_remote_session()
         except (ConnectTimeoutError, GatewayOfflineError):
-            self._logger.info("Sleeping for %s seconds.", sleep_interval)
-            sleep(sleep_interval)
+            return False
         except (requests.exceptions.ConnectTimeout, requests.exceptions.ConnectionError, requests.exceptions.ReadTimeout):
-            self._logger.info("Sleeping for %s seconds.", sleep_interval)
-            sleep(sleep_interval - 3)  # mDNS browsing will take up tp 3 seconds by itself
+            # The gateway might have got a new IP address.
             self.detect_gateway_in_lan()
+            return False
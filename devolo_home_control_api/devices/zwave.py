@@ -2,7 +2,12 @@
 from __future__ import annotations
 
 import logging
-from typing import TYPE_CHECKING, Any
+import sys
+from threading import Lock
+from time import monotonic
+from typing import TYPE_CHECKING, Any, Callable
+
+import requests
 
 from devolo_home_control_api.helper import camel_case_to_snake_case, get_device_uid_from_element_uid
 from devolo_home_control_api.mydevolo import Mydevolo
@@ -20,6 +25,22 @@ if TYPE_CHECKING:
     )
     from devolo_home_control_api.properties.property import Property
 
+# Additional Z-Wave information. Will be filled by Zwave.get_zwave_info, if available.
+Z_WAVE_INFO_LIST = (
+    "href",
+    "manufacturer_id",
+    "product_type_id",
+    "product_id",
+    "name",
+    "brand",
+    "identifier",
+    "is_zwave_plus",
+    "device_type",
+    "zwave_version",
+    "specific_device_class",
+    "generic_device_class",
+)
+
 
 class Zwave:
     """
@@ -28,6 +49,10 @@ class Zwave:
     reading them. Nevertheless, a few unwanted attributes are filtered.
 
     :param mydevolo_instance: Mydevolo instance for talking to the devolo Cloud
+    :param lazy_zwave_info: Get additional Z-Wave information not before one of them is read for the first time. If getting
+                            them fails, they are read as None and not asked for again, until information about Z-Wave
+                            products expires.
+    :param on_zwave_info: Callback called with the information about the Z-Wave product, if they were got lazily
     :key batteryLevel: Battery Level of the device in percent, -1 if mains powered
     :type batteryLevel: int
     :key elementUIDs: All element UIDs the device has
@@ -64,10 +89,20 @@ class Zwave:
     product_type_id: str
     zwave_version: str
 
-    def __init__(self, mydevolo_instance: Mydevolo, **kwargs: Any) -> None:
+    def __init__(
+        self,
+        mydevolo_instance: Mydevolo,
+        *,
+        lazy_zwave_info: bool = False,
+        on_zwave_info: Callable[[dict[str, Any]], None] | None = None,
+        **kwargs: Any,
+    ) -> None:
         """Initialize a Z-Wave device."""
         self._logger = logging.getLogger(self.__class__.__name__)
         self._mydevolo = mydevolo_instance
+        self._zwave_info_lock: Lock | None = Lock() if lazy_zwave_info else None
+        self._zwave_info_callback = on_zwave_info
+        self._zwave_info_retry = 0.0
 
         # Get important values
         self.battery_level = kwargs.pop("batteryLevel", -1)
@@ -94,29 +129,36 @@ class Zwave:
             setattr(self, camel_case_to_snake_case(key), value)
         self.uid = get_device_uid_from_element_uid(self.element_uids[0])
 
-        # Initialize additional Z-Wave information. Will be filled by Zwave.get_zwave_info, if available.
-        z_wave_info_list = [
-            "href",
-            "manufacturer_id",
-            "product_type_id",
-            "product_id",
-            "name",
-            "brand",
-            "identifier",
-            "is_zwave_plus",
-            "device_type",
-            "zwave_version",
-            "specific_device_class",
-            "generic_device_class",
-        ]
-        for key in z_wave_info_list:
-            setattr(self, key, None)
+        # Initialize additional Z-Wave information. If requested lazily, they are missing until read for the first time.
+        if not lazy_zwave_info:
+            for key in Z_WAVE_INFO_LIST:
+                setattr(self, key, None)
 
         # Remove battery properties, if device is mains powered.
         if self.battery_level == -1:
             delattr(self, "battery_level")
             delattr(self, "battery_low")
 
+    def __getattr__(self, name: str) -> Any:
+        """Get additional Z-Wave information from my devolo, if they are read for the first time in lazy mode."""
+        lock = self.__dict__.get("_zwave_info_lock")
+        if name not in Z_WAVE_INFO_LIST or lock is None:
+            raise AttributeError(f"'{self.__class__.__name__}' object has no attribute '{name}'")  # noqa: TRY003
+        with lock:
+            if name not in self.__dict__:
+                if monotonic() < self._zwave_info_retry:
+                    return None
+                try:
+                    zwave_product = self.get_zwave_info()
+                except requests.exceptions.RequestException:
+                    self._logger.error("Could not get Z-Wave information for %s.", self.uid)
+                    self._logger.debug(sys.exc_info())
+                    self._zwave_info_retry = monotonic() + self._mydevolo.zwave_products_ttl
+                    return None
+                if self._zwave_info_callback:
+                    self._zwave_info_callback(zwave_product)
+        return self.__dict__[name]
+
     def get_property(self, name: str) -> list[Property]:
         """
         Get element UIDs to a specified property.
@@ -127,15 +169,19 @@ class Zwave:
         """
         return [*getattr(self, f"{name}_property").values()]
 
-    def get_zwave_info(self) -> None:
+    def get_zwave_info(self, zwave_product: dict[str, Any] | None = None) -> dict[str, Any]:
         """
         Get publicly available information like manufacturer or model from my devolo. For a complete list, please look at
-        Zwave.__init__.
+        Z_WAVE_INFO_LIST.
+
+        :param zwave_product: Information already known, e.g. from a snapshot. If given, my devolo is not asked.
+        :return: Information about the Z-Wave product
         """
-        self._logger.debug("Getting Z-Wave information for %s", self.uid)
-        zwave_product = self._mydevolo.get_zwave_products(
-            manufacturer=self.man_id, product_type=self.prod_type_id, product=self.prod_id
-        )
+        if zwave_product is None:
+            self._logger.debug("Getting Z-Wave information for %s", self.uid)
+            zwave_product = self._mydevolo.get_zwave_products(
+                manufacturer=self.man_id, product_type=self.prod_type_id, product=self.prod_id
+            )
         for key, value in zwave_product.items():
             setattr(self, camel_case_to_snake_case(key), value)
 
@@ -150,6 +196,9 @@ class Zwave:
         for attribute in clean_up_list:
             if hasattr(self, attribute):
                 delattr(self, attribute)
+        for key in Z_WAVE_INFO_LIST:
+            self.__dict__.setdefault(key, None)
+        return zwave_product
 
     def is_online(self) -> bool:
         """
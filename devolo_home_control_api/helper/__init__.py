@@ -1,18 +1,31 @@
 """Helper functions used in the package."""
+from .json_codec import JSON_LIBRARY, json_dumps, json_loads
 from .names import camel_case_to_snake_case
 from .uid import (
+    ParsedUid,
     get_device_type_from_element_uid,
     get_device_uid_from_element_uid,
     get_device_uid_from_setting_uid,
     get_home_id_from_device_uid,
     get_sub_device_uid_from_element_uid,
+    parse_uid,
 )
+from .worker_queue import Overflow, QueueMetrics, WorkerQueue, get_message_key
 
 __all__ = [
+    "JSON_LIBRARY",
+    "Overflow",
+    "ParsedUid",
+    "QueueMetrics",
+    "WorkerQueue",
     "camel_case_to_snake_case",
     "get_device_type_from_element_uid",
     "get_device_uid_from_element_uid",
     "get_device_uid_from_setting_uid",
     "get_home_id_from_device_uid",
+    "get_message_key",
     "get_sub_device_uid_from_element_uid",
+    "json_dumps",
+    "json_loads",
+    "parse_uid",
 ]
@@ -0,0 +1,79 @@
+"""Helper functions to encode and decode JSON using the fastest library available."""
+from __future__ import annotations
+
+import json
+from typing import Any
+
+try:
+    import orjson
+
+    JSON_LIBRARY = "orjson"
+
+    def json_dumps(obj: Any, *, pretty: bool = False) -> str:
+        """
+        Encode an object as JSON.
+
+        :param obj: Object to encode
+        :param pretty: Indent the output for better readability
+        :return: JSON string
+        """
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else 0).decode()
+
+    def json_loads(data: bytes | str) -> Any:
+        """
+        Decode JSON.
+
+        :param data: JSON string or bytes
+        :return: Decoded object
+        """
+        return orjson.loads(data)
+
+except ImportError:
+    try:
+        import msgspec
+
+        JSON_LIBRARY = "msgspec"
+        _decoder = msgspec.json.Decoder()
+        _encoder = msgspec.json.Encoder()
+
+        def json_dumps(obj: Any, *, pretty: bool = False) -> str:
+            """
+            Encode an object as JSON.
+
+            :param obj: Object to encode
+            :param pretty: Indent the output for better readability
+            :return: JSON string
+            """
+            encoded = _encoder.encode(obj)
+            return (msgspec.json.format(encoded, indent=2) if pretty else encoded).decode()
+
+        def json_loads(data: bytes | str) -> Any:
+            """
+            Decode JSON.
+
+            :param data: JSON string or bytes
+            :return: Decoded object
+            """
+            return _decoder.decode(data)
+
+    except ImportError:
+        JSON_LIBRARY = "json"
+
+        def json_dumps(obj: Any, *, pretty: bool = False) -> str:
+            """
+            Encode an object as JSON.
+
+            :param obj: Object to encode
+            :param pretty: Indent the output for better readability
+            :return: JSON string
+            """
+            return json.dumps(obj, indent=2 if pretty else None)
+
+        def json_loads(data: bytes | str) -> Any:
+            """
+            Decode JSON.
+
+            :param data: JSON string or bytes
+            :return: Decoded object
+            """
+            return json.loads(data)
@@ -7,6 +7,43 @@ you often need to split them. This helper functions will do that for you.
 from __future__ import annotations
 
 import re
+from functools import lru_cache
+from typing import NamedTuple
+
+# Something like devolo.MultiLevelSensor:hdm:ZWave:CBC56091/24#2, lis.hdm:ZWave:CBC56091/24 or hdm:ZWave:CBC56091/24
+_UID = re.compile(
+    r"(?:[^:]+:|(?P<setting_prefix>[a-z]+)\.)?(?P<device_uid>[^:#]+:[^:#]+:[^:#/]+/\d{1,3})(?:#(?P<sub_device>.*))?"
+)
+
+
+class ParsedUid(NamedTuple):
+    """
+    Parts of an element UID, a setting UID or a device UID.
+
+    :param type: Type, something like devolo.MultiLevelSensor or lis.hdm
+    :param device_uid: Device UID, something like hdm:ZWave:CBC56091/24
+    :param sub_device: Sub device, something like 2 or MultilevelSensor(1), if any
+    :param setting_prefix: Prefix of a setting UID, something like lis, if any
+    """
+
+    type: str
+    device_uid: str
+    sub_device: str | None
+    setting_prefix: str | None
+
+
+@lru_cache(maxsize=4096)
+def parse_uid(uid: str) -> ParsedUid:
+    """
+    Split a UID into its parts in one pass. As the same UIDs show up again and again, results are cached.
+
+    :param uid: Element UID, setting UID or device UID, something like devolo.MultiLevelSensor:hdm:ZWave:CBC56091/24#2
+    :return: Parts of the UID
+    """
+    parts = _UID.match(uid)
+    if parts:
+        return ParsedUid(uid.split(":", maxsplit=1)[0], parts["device_uid"], parts["sub_device"], parts["setting_prefix"])
+    raise ValueError("UID has a wrong format.")  # noqa: TRY003
 
 
 def get_device_uid_from_element_uid(element_uid: str) -> str:
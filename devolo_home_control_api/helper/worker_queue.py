@@ -0,0 +1,160 @@
+"""Queued delivery of messages to a worker thread."""
+from __future__ import annotations
+
+import logging
+import threading
+from collections import OrderedDict
+from enum import Enum
+from itertools import count
+from time import monotonic
+from typing import Any, Callable, NamedTuple
+
+
+class Overflow(Enum):
+    """What to do, if a message arrives while a queue is full."""
+
+    BLOCK = "block"
+    """Wait until the worker caught up. This slows down whoever puts messages into the queue."""
+    COALESCE = "coalesce"
+    """Replace a pending message of the same event, element and value type. If there is none, drop the oldest message."""
+    DROP_OLDEST = "drop_oldest"
+    """Drop the oldest pending message."""
+
+
+class QueueMetrics(NamedTuple):
+    """
+    Health of a queue.
+
+    :param depth: Number of messages waiting to be handled
+    :param max_depth: Highest number of messages waiting so far
+    :param delivered: Number of messages handled by the worker
+    :param dropped: Number of messages dropped because the queue was full
+    :param coalesced: Number of messages replaced by a newer one
+    :param lag: Seconds the last message handled by the worker waited in the queue
+    :param max_lag: Longest time in seconds a message waited in the queue so far
+    """
+
+    depth: int
+    max_depth: int
+    delivered: int
+    dropped: int
+    coalesced: int
+    lag: float
+    max_lag: float
+
+
+def get_message_key(message: tuple[Any, ...], event: Any = None) -> tuple[Any, Any, str | None]:
+    """
+    Get what tells messages apart, if only the latest one matters: the event they were dispatched for, the element UID and,
+    if given, the name of the value. The event tells apart device level messages like pending operations, that carry the
+    same first item for every device. Messages carrying more than one value without a name, like the zone and value of a
+    humidity bar, are told apart by their element UID only.
+
+    :param message: Message as dispatched by the publisher
+    :param event: Event the message was dispatched for, usually a device UID
+    :return: Event, element UID and name of the value
+    """
+    name = message[2] if len(message) > 2 and isinstance(message[2], str) else None  # noqa: PLR2004
+    return (event, message[0] if message else None, name)
+
+
+class WorkerQueue:
+    """
+    The WorkerQueue object hands messages to callbacks in its own worker thread, so a slow callback, e.g. of a subscriber, does
+    not delay whoever puts messages into the queue. Every message is stamped with the time it was queued. The queue is
+    bounded. What happens if it is full, depends on the overflow policy.
+
+    :param name: Name of the worker thread
+    :param maxsize: Maximum number of messages waiting to be handled
+    :param overflow: Overflow policy
+    """
+
+    def __init__(self, name: str, maxsize: int, overflow: Overflow = Overflow.DROP_OLDEST) -> None:
+        """Initialize the queue and start its worker."""
+        self._logger = logging.getLogger(self.__class__.__name__)
+        self._maxsize = maxsize
+        self._overflow = overflow
+        self._condition = threading.Condition()
+        self._counter = count()
+        self._pending: OrderedDict[Any, tuple[Callable[[tuple[Any, ...]], None], tuple[Any, ...], float]] = OrderedDict()
+        self._closed = False
+        self._max_depth = 0
+        self._delivered = 0
+        self._dropped = 0
+        self._coalesced = 0
+        self._lag = 0.0
+        self._max_lag = 0.0
+
+        # The worker waits for messages until the queue is closed, so it must not keep the interpreter alive.
+        threading.Thread(target=self._run, name=name, daemon=True).start()
+
+    @property
+    def metrics(self) -> QueueMetrics:
+        """Get the current health of the queue."""
+        with self._condition:
+            return QueueMetrics(
+                len(self._pending),
+                self._max_depth,
+                self._delivered,
+                self._dropped,
+                self._coalesced,
+                self._lag,
+                self._max_lag,
+            )
+
+    def close(self) -> None:
+        """Stop the worker as soon as all pending messages are handled."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def put(self, callback: Callable[[tuple[Any, ...]], None], message: tuple[Any, ...], event: Any = None) -> None:
+        """
+        Queue a message for a callback.
+
+        :param callback: Callback to call with the message
+        :param message: Message to deliver
+        :param event: Event the message was dispatched for. Only messages of the same event are coalesced.
+        """
+        with self._condition:
+            if self._closed:
+                return
+            if self._overflow is Overflow.COALESCE:
+                key: Any = (callback, get_message_key(message, event))
+                if key in self._pending:
+                    # Keep the time the replaced message was queued, so the lag shows how long the element waited.
+                    self._pending[key] = (callback, message, self._pending[key][2])
+                    self._coalesced += 1
+                    return
+            else:
+                key = next(self._counter)
+            while len(self._pending) >= self._maxsize:
+                if self._overflow is not Overflow.BLOCK:
+                    self._pending.popitem(last=False)
+                    self._dropped += 1
+                    continue
+                self._condition.wait()
+                if self._closed:
+                    return
+            self._pending[key] = (callback, message, monotonic())
+            self._max_depth = max(self._max_depth, len(self._pending))
+            self._condition.notify_all()
+
+    def _run(self) -> None:
+        """Hand messages to their callbacks one after another."""
+        while True:
+            with self._condition:
+                while not self._pending and not self._closed:
+                    self._condition.wait()
+                if not self._pending:
+                    return
+                _, (callback, message, queued) = self._pending.popitem(last=False)
+                self._lag = monotonic() - queued
+                self._max_lag = max(self._max_lag, self._lag)
+                self._condition.notify_all()
+            try:
+                callback(message)
+            except Exception:
+                self._logger.exception("Failed to handle %s", message)
+            with self._condition:
+                self._delivered += 1
@@ -1,8 +1,16 @@
 """devolo Home Control."""
 from __future__ import annotations
 
+import logging
+import sys
 import threading
-from typing import Any
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Iterable
+from concurrent.futures import Future, ThreadPoolExecutor
+from copy import deepcopy
+from functools import partial
+from typing import Any, Callable
 
 import requests
 from requests.adapters import HTTPAdapter
@@ -10,14 +18,17 @@ from urllib3 import Retry
 from zeroconf import Zeroconf
 
 from . import __version__
-from .backend import MESSAGE_TYPES, Mprm
+from .backend import DEVICE_STATES, MESSAGE_TYPES, ConnectionState, Mprm, PropertyChangedEvent
+from .backend.discovery_cache import DiscoveryCache
 from .devices import Gateway, Zwave
+from .exceptions import GatewayOfflineError
 from .helper import (
     camel_case_to_snake_case,
     get_device_type_from_element_uid,
     get_device_uid_from_element_uid,
     get_device_uid_from_setting_uid,
     get_home_id_from_device_uid,
+    parse_uid,
 )
 from .mydevolo import Mydevolo
 from .properties import (
@@ -30,53 +41,67 @@ from .properties import (
     RemoteControlProperty,
     SettingsProperty,
 )
+from .properties.property import Property
 from .publisher import Publisher, Updater
 
+try:
+    from typing import Self  # type: ignore[attr-defined,misc]
+except ImportError:
+    from typing_extensions import Self
 
-class HomeControl(Mprm):
-    """
-    Representing object for your Home Control setup. This is more or less the glue between your devolo Home Control Central
-    Unit, your devices and their properties.
 
-    :param gateway_id: Gateway ID (aka serial number), typically found on the label of the device
-    :param mydevolo_instance: Mydevolo instance for talking to the devolo Cloud
-    :param zeroconf_instance: Zeroconf instance to be potentially reused
-    """
+_RECONCILED_ATTRIBUTES = {
+    # Property of a functional item: Attributes of the property object it is stored in
+    "calibrationStatus": ("calibration_status",),
+    "currentValue": ("current",),
+    "feedback": ("led_setting",),
+    "guiEnabled": ("enabled",),
+    "keyPressed": ("key_pressed",),
+    "led": ("led_setting",),
+    "localSwitch": ("local_switching",),
+    "paramChanged": ("param_changed",),
+    "remoteSwitch": ("remote_switching",),
+    "settings": ("events_enabled", "icon", "name", "zone_id"),
+    "sinceTime": ("total_since",),
+    "state": ("state",),
+    "switchType": ("value",),
+    "tempReport": ("temp_report",),
+    "totalValue": ("total",),
+    "value": ("value", "inverted", "motion_sensitivity", "shutter_duration", "tone"),
+}
 
-    def __init__(self, gateway_id: str, mydevolo_instance: Mydevolo, zeroconf_instance: Zeroconf | None = None) -> None:
-        """Initialize communication with your Home Control setup."""
-        retry = Retry(total=5, backoff_factor=0.1, allowed_methods=("GET", "POST"))
-        adapter = HTTPAdapter(max_retries=retry)
-
-        self._mydevolo = mydevolo_instance
-        self._session = requests.Session()
-        self._session.headers.update({"User-Agent": f"devolo_home_control_api/{__version__}"})
-        self._session.mount("http://", adapter)
-        self._zeroconf = zeroconf_instance
-        self.gateway = Gateway(gateway_id, mydevolo_instance)
 
-        super().__init__()
-        self._grouping()
-
-        # Create the initial device dict
-        self.devices: dict[str, Zwave] = {}
-        self._inspect_devices(self.get_all_devices())
+class BaseHomeControl(ABC):
+    """
+    The abstract BaseHomeControl object builds up devices and their properties from the functional items reported by your
+    devolo Home Control Central Unit. It does not care about how the functional items are fetched, so you have to create a
+    derived class, that talks to the gateway and provides a Gateway object and a Mydevolo object.
+    """
 
-        self.device_names = {
-            f"{device.settings_property['general_device_settings'].name}\\"
-            f"{device.settings_property['general_device_settings'].zone}": device.uid
-            for device in self.devices.values()
-        }
+    devices: dict[str, Zwave]
+    device_names: dict[str, str]
+    enrichment: Future[float]
+    gateway: Gateway
+    publisher: Publisher
+    updater: Updater
 
-        self.gateway.home_id = get_home_id_from_device_uid(next(iter(self.device_names.values())))
+    set_binary_switch: Callable[[str, bool], bool]
+    set_multi_level_switch: Callable[[str, float], bool]
+    set_remote_control: Callable[[str, int], bool]
+    set_setting: Callable[[str, list[Any]], bool]
 
-        self.publisher = Publisher(self.devices.keys())
-
-        self.updater = Updater(devices=self.devices, gateway=self.gateway, publisher=self.publisher)
-        self.updater.on_device_change = self.device_change
-
-        threading.Thread(target=self.websocket_connect, name=f"{self.__class__.__name__}.websocket_connect").start()
-        self.wait_for_websocket_establishment()
+    _enrichment_callback: Callable[[float], None] | None
+    _enrichment_executor: ThreadPoolExecutor
+    _enrichment_lock: threading.Lock
+    _enrichment_pending: set[Future[None]]
+    _enrichment_start: float
+    _items: dict[str, dict[str, Any]]
+    _keep_items: bool = True
+    _lazy_zwave_info: bool
+    _streaming: bool
+    _logger: logging.Logger
+    _mydevolo: Mydevolo
+    _zwave_products: dict[str, dict[str, Any]]
 
     @property
     def binary_sensor_devices(self) -> list[Zwave]:
@@ -117,34 +142,283 @@ class HomeControl(Mprm):
         """Get all remote control devices."""
         return [uid for uid in self.devices.values() if hasattr(uid, "remote_control_property")]
 
+    @abstractmethod
     def device_change(self, device_uids: list[str]) -> tuple[str, str]:
+        """React on new devices or removed devices."""
+
+    def on_update(self, message: dict[str, Any] | PropertyChangedEvent) -> None:
         """
-        React on new devices or removed devices. As the Z-Wave controller can only be in inclusion or exclusion mode, we
-        assume, that you cannot add and remove devices at the same time. So if the number of devices increases, there is
-        a new one and if the number decreases, a device was removed.
+        Initialize steps needed to update properties on a new message.
 
-        :param device_uids: List of UIDs known by the backend
+        :param message: Message or its decoded event because of which we need to update properties
         """
-        if len(device_uids) > len(self.devices):
-            devices = [device for device in device_uids if device not in self.devices]
-            mode = "add"
-            self._inspect_devices([devices[0]])
-            self._logger.debug("Device %s added.", devices[0])
-        else:
-            devices = [device for device in self.devices if device not in device_uids]
-            mode = "del"
-            self.devices.pop(devices[0])
-            self._logger.debug("Device %s removed.", devices[0])
-        self.updater.devices = self.devices
-        return (devices[0], mode)
+        self.updater.update(message)
 
-    def on_update(self, message: dict[str, Any]) -> None:
+    def prefetch_zwave_info(self) -> Future[float]:
         """
-        Initialize steps needed to update properties on a new message.
+        Get Z-Wave product information of all devices in the background. This is useful in lazy mode, if you know, that you
+        will need them soon.
 
-        :param message: Message because of which we need to update properties
+        :return: Enrichment future, resolved with the time taken in seconds
         """
-        self.updater.update(message)
+        self._enrich_devices([self._items[device_uid] for device_uid in self.devices])
+        return self.enrichment
+
+    def snapshot(self) -> dict[str, Any]:
+        """
+        Take a snapshot of devices, their properties, zones and Z-Wave product information, that can be serialized to JSON.
+        Values of properties are those of the last inspection of the devices. Restoring the snapshot via
+        HomeControl.from_snapshot brings them up to date. In streaming mode, this needs functional items to be kept.
+
+        :return: Snapshot of your Home Control setup
+        """
+        if not self._keep_items:
+            raise RuntimeError("Snapshots in streaming mode need keep_items to be set.")  # noqa: TRY003
+        devices = [self._items[device_uid] for device_uid in [*self.devices] if device_uid in self._items]
+        properties = [
+            item
+            for uid, item in [*self._items.items()]
+            if uid not in self.devices and self._get_device_uid(uid) in self.devices
+        ]
+        zwave_products = {
+            key: self._zwave_products[key]
+            for key in (self._get_zwave_product_key(device) for device in devices)
+            if key in self._zwave_products
+        }
+        return deepcopy(
+            {
+                "gateway_id": self.gateway.id,
+                "zones": self.gateway.zones,
+                "devices": devices,
+                "properties": properties,
+                "zwave_products": zwave_products,
+            }
+        )
+
+    def _add_devices(self, devices_properties: list[dict[str, Any]]) -> list[str]:
+        """
+        Create devices from their functional items.
+
+        :param devices_properties: Functional items of the devices
+        :return: Setting UIDs and element UIDs of all created devices
+        """
+        for device_properties in devices_properties:
+            properties = device_properties["properties"]
+            self._items[device_properties["UID"]] = device_properties
+            self.devices[device_properties["UID"]] = Zwave(
+                mydevolo_instance=self._mydevolo,
+                lazy_zwave_info=self._lazy_zwave_info,
+                on_zwave_info=partial(self._set_zwave_product, self._get_zwave_product_key(device_properties)),
+                **properties,
+            )
+            self.devices[device_properties["UID"]].settings_property = {}
+
+        # List comprehension gets the list of uids from every device
+        nested_uids_lists = [
+            (uid["properties"].get("settingUIDs") + uid["properties"]["elementUIDs"]) for uid in devices_properties
+        ]
+
+        # List comprehension gets all uids into one list to make one big call against the mPRM
+        return [uid for sublist in nested_uids_lists for uid in sublist]
+
+    def _add_properties(
+        self, device_properties_list: Iterable[dict[str, Any]], last_activities: list[dict[str, Any]] | None = None
+    ) -> None:
+        """
+        Add properties to already known devices. Functional items are handled one after another, so they can be passed while
+        still arriving.
+
+        :param device_properties_list: Functional items of the properties
+        :param last_activities: List to collect last activity functional items in. If given, they are not handled, because
+                                they refer to properties, that might arrive later.
+        """
+        pending_last_activities = [] if last_activities is None else last_activities
+        for uid_info in device_properties_list:
+            if self._keep_items:
+                self._items[uid_info["UID"]] = uid_info
+            if uid_info["UID"].startswith("devolo.LastActivity"):
+                pending_last_activities.append(uid_info)
+            else:
+                message_type = MESSAGE_TYPES.get(get_device_type_from_element_uid(uid_info["UID"]), "_unknown")
+                getattr(self, message_type)(uid_info)
+            uid = self.devices[self._get_device_uid(uid_info["UID"])]
+            uid.pending_operations = uid.pending_operations or bool(uid_info["properties"].get("pendingOperations"))
+
+        # Last activity messages sometimes arrive before a device was initialized and therefore need to be handled afterwards.
+        if last_activities is None:
+            for uid_info in pending_last_activities:
+                self._last_activity(uid_info)
+
+    def _enrich_devices(self, devices_properties: list[dict[str, Any]]) -> None:
+        """
+        Get Z-Wave product information of devices in the background. As soon as information of all devices is known, the
+        enrichment future is resolved and the enrichment callback is called with the time taken in seconds.
+
+        :param devices_properties: Functional items of the devices
+        """
+        with self._enrichment_lock:
+            if self.enrichment.done():
+                self.enrichment = Future()
+            if not self._enrichment_pending:
+                self._enrichment_start = time.monotonic()
+            try:
+                futures = {
+                    self._enrichment_executor.submit(self._get_zwave_info, device_properties)
+                    for device_properties in devices_properties
+                }
+            except RuntimeError:
+                # The executor is shut down on disconnecting, e.g. while reconciling devices was still in progress.
+                self._logger.debug("Not getting Z-Wave product information after disconnecting.")
+                self.enrichment.cancel()
+                return
+            self._enrichment_pending.update(futures)
+        for future in futures:
+            future.add_done_callback(self._on_enrichment_done)
+        if not futures:
+            self._complete_enrichment()
+
+    def _on_enrichment_done(self, future: Future[None]) -> None:
+        """Keep track of the Z-Wave product information still missing."""
+        if future.cancelled():
+            self.enrichment.cancel()
+        elif future.exception():
+            self._logger.error("Could not get Z-Wave product information.")
+            self._logger.debug(future.exception())
+        with self._enrichment_lock:
+            self._enrichment_pending.discard(future)
+        self._complete_enrichment()
+
+    def _complete_enrichment(self) -> None:
+        """Resolve the enrichment future, if no Z-Wave product information is missing anymore."""
+        with self._enrichment_lock:
+            if self._enrichment_pending or self.enrichment.done():
+                return
+            duration = time.monotonic() - self._enrichment_start
+            self.enrichment.set_result(duration)
+        self._logger.debug("Getting Z-Wave product information took %.3f seconds.", duration)
+        self._mydevolo.save_zwave_products()
+        if self._enrichment_callback:
+            self._enrichment_callback(duration)
+
+    def _get_device_uid(self, uid: str) -> str:
+        """Get the UID of the device an element UID or a setting UID belongs to."""
+        return parse_uid(uid).device_uid
+
+    def _get_zwave_info(self, device_properties: dict[str, Any]) -> None:
+        """Get Z-Wave product information of a device. Information already known is not requested again."""
+        key = self._get_zwave_product_key(device_properties)
+        zwave_product = self._zwave_products.get(key)
+        if zwave_product is None:
+            properties = device_properties["properties"]
+            zwave_product = self._mydevolo.get_zwave_products(
+                manufacturer=properties["manID"], product_type=properties["prodTypeID"], product=properties["prodID"]
+            )
+        self._zwave_products[key] = self.devices[device_properties["UID"]].get_zwave_info(zwave_product)
+
+    def _set_zwave_product(self, key: str, zwave_product: dict[str, Any]) -> None:
+        """Remember Z-Wave product information a device got lazily, so snapshots contain them."""
+        self._zwave_products[key] = zwave_product
+
+    @staticmethod
+    def _get_zwave_product_key(device_properties: dict[str, Any]) -> str:
+        """Get the key Z-Wave product information are stored with."""
+        properties = device_properties["properties"]
+        return f"{properties['manID']}/{properties['prodTypeID']}/{properties['prodID']}"
+
+    def _reconcile_devices(
+        self, devices_properties: list[dict[str, Any]], device_properties_list: list[dict[str, Any]]
+    ) -> None:
+        """
+        Bring known devices and their properties up to date with their functional items. Changed elements are handed to the
+        updater like changes reported by the gateway, so references held by others stay valid and the same messages are
+        published.
+
+        :param devices_properties: Functional items of the devices
+        :param device_properties_list: Functional items of the properties
+        """
+        current = _ComparisonModel(self.gateway, self._mydevolo, devices_properties, device_properties_list)
+        items = {uid_info["UID"]: uid_info["properties"] for uid_info in device_properties_list}
+        self._items.update((device_properties["UID"], device_properties) for device_properties in devices_properties)
+        if self._keep_items:
+            self._items.update((uid_info["UID"], uid_info) for uid_info in device_properties_list)
+
+        for device_uid, device in current.devices.items():
+            known_device = self.devices[device_uid]
+            changed_states = {
+                name: getattr(device, attribute)
+                for name, attribute in DEVICE_STATES.items()
+                if getattr(device, attribute, None) is not None
+                and getattr(known_device, attribute, None) != getattr(device, attribute)
+            }
+            if changed_states:
+                self._logger.debug("Reconciling %s of %s", ", ".join(changed_states), device_uid)
+                self.updater.reconcile(device_uid, changed_states)
+
+            for attribute, device_property in vars(device).items():
+                if not attribute.endswith("_property"):
+                    continue
+                for key, element in device_property.items():
+                    known_element = getattr(known_device, attribute, {}).get(key)
+                    if known_element is None:
+                        self._logger.debug("Property %s appeared on %s, it is available after restarting.", key, device_uid)
+                        continue
+                    self._reconcile_element(known_element, element, items)
+
+    def _reconcile_element(self, known_element: Property, element: Property, items: dict[str, dict[str, Any]]) -> None:
+        """Hand the properties of functional items, that changed the values of an element, to the updater."""
+        element_uids = [element.element_uid]
+        if element.element_uid.startswith("devolo.HumidityBar:"):
+            # A humidity bar is made of two functional items.
+            uid = element.element_uid.split(":", 1)[1]
+            element_uids = [f"devolo.HumidityBarZone:{uid}", f"devolo.HumidityBarValue:{uid}"]
+        for element_uid in element_uids:
+            changed = {
+                key: value
+                for key, value in items.get(element_uid, {}).items()
+                if any(
+                    getattr(known_element, attribute, None) != getattr(element, attribute, None)
+                    for attribute in (
+                        ("zone",) if element_uid.startswith("devolo.HumidityBarZone") else _RECONCILED_ATTRIBUTES.get(key, ())
+                    )
+                )
+            }
+            if changed:
+                self._logger.debug("Reconciling %s of %s", ", ".join(changed), element_uid)
+                self.updater.reconcile(element_uid, {**changed, "itemId": items[element_uid].get("itemId")})
+
+    def _restore(self, snapshot: dict[str, Any]) -> None:
+        """
+        Create devices and their properties from a snapshot without talking to the gateway.
+
+        :param snapshot: Snapshot taken with BaseHomeControl.snapshot
+        """
+        self.gateway.zones = dict(snapshot["zones"])
+        self._zwave_products.update(snapshot["zwave_products"])
+        self._add_devices(snapshot["devices"])
+        unknown_products = []
+        for device_properties in snapshot["devices"]:
+            if self._get_zwave_product_key(device_properties) in self._zwave_products:
+                self._get_zwave_info(device_properties)
+            else:
+                unknown_products.append(device_properties)
+        if not self._lazy_zwave_info:
+            self._enrich_devices(unknown_products)
+        self._add_properties(snapshot["properties"])
+
+    def _setup_publisher(self) -> None:
+        """Set up device names, the publisher and the updater as soon as all devices are known."""
+        self.device_names = {
+            f"{device.settings_property['general_device_settings'].name}\\"
+            f"{device.settings_property['general_device_settings'].zone}": device.uid
+            for device in self.devices.values()
+        }
+
+        self.gateway.home_id = get_home_id_from_device_uid(next(iter(self.device_names.values())))
+
+        self.publisher = Publisher(self.devices.keys())
+
+        self.updater = Updater(devices=self.devices, gateway=self.gateway, publisher=self.publisher)
+        self.updater.on_device_change = self.device_change
 
     def _binary_sensor(self, uid_info: dict[str, Any]) -> None:
         """Process BinarySensor properties."""
@@ -189,10 +463,6 @@ class HomeControl(Mprm):
             zones=self.gateway.zones,
         )
 
-    def _grouping(self) -> None:
-        """Get all zones (also called rooms)."""
-        self.gateway.zones = self.get_all_zones()
-
     def _humidity_bar(self, uid_info: dict[str, Any]) -> None:
         """
         Process HumidityBarZone and HumidityBarValue properties.
@@ -217,42 +487,6 @@ class HomeControl(Mprm):
             self._logger.debug("Adding humidity bar position property to %s.", device_uid)
             self.devices[device_uid].humidity_bar_property[fake_element_uid].value = uid_info["properties"]["value"]
 
-    def _inspect_devices(self, devices: list[str]) -> None:
-        """Inspect device properties of given list of devices."""
-        devices_properties = self.get_data_from_uid_list(devices)
-        for device_properties in devices_properties:
-            properties = device_properties["properties"]
-            self.devices[device_properties["UID"]] = Zwave(mydevolo_instance=self._mydevolo, **properties)
-            self.devices[device_properties["UID"]].settings_property = {}
-            threading.Thread(
-                target=self.devices[device_properties["UID"]].get_zwave_info,
-                name=f"{self.__class__.__name__}.{self.devices[device_properties['UID']].uid}",
-            ).start()
-
-        # List comprehension gets the list of uids from every device
-        nested_uids_lists = [
-            (uid["properties"].get("settingUIDs") + uid["properties"]["elementUIDs"]) for uid in devices_properties
-        ]
-
-        # List comprehension gets all uids into one list to make one big call against the mPRM
-        uid_list = [uid for sublist in nested_uids_lists for uid in sublist]
-
-        device_properties_list = self.get_data_from_uid_list(uid_list)
-
-        for uid_info in device_properties_list:
-            message_type = MESSAGE_TYPES.get(get_device_type_from_element_uid(uid_info["UID"]), "_unknown")
-            getattr(self, message_type)(uid_info)
-            try:
-                uid = self.devices[get_device_uid_from_element_uid(uid_info["UID"])]
-            except KeyError:
-                uid = self.devices[get_device_uid_from_setting_uid(uid_info["UID"])]
-            uid.pending_operations = uid.pending_operations or bool(uid_info["properties"].get("pendingOperations"))
-
-        # Last activity messages sometimes arrive before a device was initialized and therefore need to be handled afterwards.
-        for uid_info in device_properties_list:
-            if uid_info["UID"].startswith("devolo.LastActivity"):
-                self._last_activity(uid_info)
-
     def _automatic_calibration(self, uid_info: dict[str, Any]) -> None:
         """Process automatic calibration (acs) properties."""
         device_uid = get_device_uid_from_setting_uid(uid_info["UID"])
@@ -496,3 +730,318 @@ class HomeControl(Mprm):
         ignore = ("devolo.SirenBinarySensor", "devolo.SirenMultiLevelSensor", "ss", "mcs")
         if not uid_info["UID"].startswith(ignore):
             self._logger.debug("Found an unexpected element uid: %s", uid_info["UID"])
+
+
+class _ComparisonModel(BaseHomeControl):
+    """
+    Devices and properties built from functional items only to compare them with the known ones while reconciling. Apart
+    from the gateway and the my devolo object, that devices and properties refer to, nothing is shared with a home control
+    object, so building it neither publishes anything nor talks to the gateway or my devolo.
+
+    :param gateway: Gateway the functional items belong to
+    :param mydevolo_instance: Mydevolo instance for talking to the devolo Cloud
+    :param devices_properties: Functional items of the devices
+    :param device_properties_list: Functional items of the properties
+    """
+
+    def __init__(
+        self,
+        gateway: Gateway,
+        mydevolo_instance: Mydevolo,
+        devices_properties: list[dict[str, Any]],
+        device_properties_list: list[dict[str, Any]],
+    ) -> None:
+        """Build devices and properties from their functional items."""
+        self._logger = logging.getLogger(self.__class__.__name__)
+        self._mydevolo = mydevolo_instance
+        self._items = {}
+        self._keep_items = False
+        self._lazy_zwave_info = True
+        self._zwave_products = {}
+        self.devices = {}
+        self.gateway = gateway
+        self._add_devices(devices_properties)
+        self._add_properties(device_properties_list)
+
+    def device_change(self, device_uids: list[str]) -> tuple[str, str]:
+        """Devices are not added or removed while comparing."""
+        raise NotImplementedError
+
+    def set_binary_switch(self, *_: Any) -> bool:
+        """Elements are not changed while comparing."""
+        raise NotImplementedError
+
+    def set_multi_level_switch(self, *_: Any) -> bool:
+        """Elements are not changed while comparing."""
+        raise NotImplementedError
+
+    def set_remote_control(self, *_: Any) -> bool:
+        """Elements are not changed while comparing."""
+        raise NotImplementedError
+
+    def set_setting(self, *_: Any) -> bool:
+        """Elements are not changed while comparing."""
+        raise NotImplementedError
+
+
+class HomeControl(BaseHomeControl, Mprm):
+    """
+    Representing object for your Home Control setup. This is more or less the glue between your devolo Home Control Central
+    Unit, your devices and their properties.
+
+    :param gateway_id: Gateway ID (aka serial number), typically found on the label of the device
+    :param mydevolo_instance: Mydevolo instance for talking to the devolo Cloud
+    :param zeroconf_instance: Zeroconf instance to be potentially reused
+    :param discovery_cache: DiscoveryCache instance to remember the gateway's local IP
+    :param snapshot: Snapshot taken with HomeControl.snapshot to restore devices and properties from. If given, connecting
+                     to the gateway takes place in the background.
+    :param enrichment_workers: Maximum number of devices to get Z-Wave product information for at the same time
+    :param on_enrichment_complete: Callback called with the time taken in seconds, as soon as Z-Wave product information of
+                                   all devices is known. It is called from a worker thread.
+    :param lazy_zwave_info: Get Z-Wave product information of a device not before it is read for the first time or
+                            HomeControl.prefetch_zwave_info is called
+    :param chunk_size: Maximum number of functional items to ask the gateway for in one call. Up to four calls are made in
+                       parallel.
+    :param streaming: Handle functional items one after another, while the gateway's answer is still arriving. Calls are
+                      made one after another in this mode.
+    :param keep_items: Keep functional items of properties in streaming mode, so HomeControl.snapshot can be taken. Without
+                       streaming, they are always kept.
+    :param websocket_queue_size: If set, websocket messages are queued and handled in a worker thread, so slow subscribers do
+                                 not stall the websocket. If more messages are waiting, the oldest ones are dropped.
+    :param on_connection_state_change: Callback called with the new state, whenever the websocket connects, breaks down or
+                                        is closed. It is called from the websocket thread or the reconnecting thread.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        gateway_id: str,
+        mydevolo_instance: Mydevolo,
+        zeroconf_instance: Zeroconf | None = None,
+        discovery_cache: DiscoveryCache | None = None,
+        snapshot: dict[str, Any] | None = None,
+        *,
+        enrichment_workers: int = 4,
+        on_enrichment_complete: Callable[[float], None] | None = None,
+        lazy_zwave_info: bool = False,
+        chunk_size: int = 250,
+        streaming: bool = False,
+        keep_items: bool = False,
+        websocket_queue_size: int = 0,
+        on_connection_state_change: Callable[[ConnectionState], None] | None = None,
+    ) -> None:
+        """Initialize communication with your Home Control setup."""
+        retry = Retry(total=5, backoff_factor=0.1, allowed_methods=("GET", "POST"))
+        adapter = HTTPAdapter(max_retries=retry)
+
+        self._mydevolo = mydevolo_instance
+        self._session = requests.Session()
+        self._session.headers.update({"User-Agent": f"devolo_home_control_api/{__version__}"})
+        self._session.mount("http://", adapter)
+        self._zeroconf = zeroconf_instance
+        self._discovery_cache = discovery_cache
+        self.gateway = Gateway(gateway_id, mydevolo_instance)
+
+        super().__init__()
+        self._chunk_size = chunk_size
+        self._streaming = streaming
+        self._keep_items = keep_items or not streaming
+        self._websocket_queue_size = websocket_queue_size
+        self._state_callback = on_connection_state_change
+        self._items = {}
+        self._zwave_products = {}
+        self._enrichment_callback = on_enrichment_complete
+        self._enrichment_workers = enrichment_workers
+        self._enrichment_executor = ThreadPoolExecutor(
+            max_workers=enrichment_workers, thread_name_prefix=f"{self.__class__.__name__}.enrichment"
+        )
+        self._enrichment_lock = threading.Lock()
+        self._enrichment_pending = set()
+        self._enrichment_start = time.monotonic()
+        self._lazy_zwave_info = lazy_zwave_info
+        self.devices: dict[str, Zwave] = {}
+        self.enrichment = Future()
+
+        if snapshot:
+            self._restore(snapshot)
+            self._setup_publisher()
+            threading.Thread(target=self._reconcile_with_gateway, name=f"{self.__class__.__name__}.reconcile").start()
+            return
+
+        self.detect_gateway_in_lan()
+        self.create_connection()
+        self._grouping()
+
+        # Create the initial device dict
+        self._inspect_devices(self.get_all_devices())
+        self._setup_publisher()
+
+        threading.Thread(target=self.websocket_connect, name=f"{self.__class__.__name__}.websocket_connect").start()
+        self.wait_for_websocket_establishment()
+
+    @classmethod
+    def from_snapshot(  # noqa: PLR0913
+        cls,
+        snapshot: dict[str, Any],
+        mydevolo_instance: Mydevolo,
+        zeroconf_instance: Zeroconf | None = None,
+        discovery_cache: DiscoveryCache | None = None,
+        *,
+        enrichment_workers: int = 4,
+        on_enrichment_complete: Callable[[float], None] | None = None,
+        lazy_zwave_info: bool = False,
+        chunk_size: int = 250,
+        websocket_queue_size: int = 0,
+        on_connection_state_change: Callable[[ConnectionState], None] | None = None,
+    ) -> Self:
+        """
+        Restore your Home Control setup from a snapshot. Devices and properties are available right away. Connecting to the
+        gateway and reconciling devices and properties with it take place in the background. Changes found on the way are
+        published like changes reported by the gateway.
+
+        :param snapshot: Snapshot taken with HomeControl.snapshot
+        :param mydevolo_instance: Mydevolo instance for talking to the devolo Cloud
+        :param zeroconf_instance: Zeroconf instance to be potentially reused
+        :param discovery_cache: DiscoveryCache instance to remember the gateway's local IP
+        :param enrichment_workers: Maximum number of devices to get Z-Wave product information for at the same time
+        :param on_enrichment_complete: Callback called with the time taken in seconds, as soon as Z-Wave product information
+                                       of all devices is known
+        :param lazy_zwave_info: Get Z-Wave product information of a device not before it is read for the first time or
+                                HomeControl.prefetch_zwave_info is called
+        :param chunk_size: Maximum number of functional items to ask the gateway for in one call
+        :param websocket_queue_size: If set, websocket messages are queued and handled in a worker thread
+        :param on_connection_state_change: Callback called with the new state, whenever the websocket connects, breaks down
+                                            or is closed
+        """
+        return cls(
+            snapshot["gateway_id"],
+            mydevolo_instance,
+            zeroconf_instance,
+            discovery_cache,
+            snapshot,
+            enrichment_workers=enrichment_workers,
+            on_enrichment_complete=on_enrichment_complete,
+            lazy_zwave_info=lazy_zwave_info,
+            chunk_size=chunk_size,
+            websocket_queue_size=websocket_queue_size,
+            on_connection_state_change=on_connection_state_change,
+        )
+
+    def device_change(self, device_uids: list[str]) -> tuple[str, str]:
+        """
+        React on new devices or removed devices. As the Z-Wave controller can only be in inclusion or exclusion mode, we
+        assume, that you cannot add and remove devices at the same time. So if the number of devices increases, there is
+        a new one and if the number decreases, a device was removed.
+
+        :param device_uids: List of UIDs known by the backend
+        """
+        if len(device_uids) > len(self.devices):
+            devices = [device for device in device_uids if device not in self.devices]
+            mode = "add"
+            self._inspect_devices([devices[0]])
+            self._logger.debug("Device %s added.", devices[0])
+        else:
+            devices = [device for device in self.devices if device not in device_uids]
+            mode = "del"
+            self.devices.pop(devices[0])
+            self._logger.debug("Device %s removed.", devices[0])
+        self.updater.devices = self.devices
+        self.updater.clear_routes()
+        return (devices[0], mode)
+
+    def resync(self) -> None:
+        """
+        Bring devices and properties up to date with the gateway, e.g. after websocket messages were missed. Changed values
+        are copied into the known properties and published like changes reported by the gateway. Devices added or removed in
+        the meantime are published as well. All functional items are fetched first, so websocket messages only wait while
+        the changes are applied.
+        """
+        device_uids = self.get_all_devices()
+        devices_properties = self.get_data_from_uid_list(device_uids) if device_uids else []
+        uid_list = [
+            uid
+            for device in devices_properties
+            for uid in device["properties"]["settingUIDs"] + device["properties"]["elementUIDs"]
+        ]
+        device_properties_list = [uid_info for chunk in self.iter_data_from_uid_list(uid_list) for uid_info in chunk]
+
+        with self._update_lock:
+            removed_devices = [device for device in self.devices if device not in device_uids]
+            for device_uid in removed_devices:
+                self.devices.pop(device_uid)
+                self._logger.debug("Device %s removed.", device_uid)
+                self.publisher.dispatch(device_uid, (device_uid, "del"))
+                self.publisher.delete_event(event=device_uid)
+
+            known_devices = [device for device in devices_properties if device["UID"] in self.devices]
+            new_devices = [device for device in devices_properties if device["UID"] not in self.devices]
+            new_uids = set(self._add_devices(new_devices))
+            self._reconcile_devices(
+                known_devices, [uid_info for uid_info in device_properties_list if uid_info["UID"] not in new_uids]
+            )
+            if new_devices:
+                if not self._lazy_zwave_info:
+                    self._enrich_devices(new_devices)
+                self._add_properties(uid_info for uid_info in device_properties_list if uid_info["UID"] in new_uids)
+            for device in new_devices:
+                self._logger.debug("Device %s added.", device["UID"])
+                self.publisher.add_event(event=device["UID"])
+                self.publisher.dispatch(device["UID"], (device["UID"], "add"))
+            if removed_devices or new_devices:
+                self.updater.clear_routes()
+
+    def websocket_connect(self) -> None:
+        """
+        Set up the websocket connection. If it was closed before, getting Z-Wave product information, that was shut down on
+        disconnecting, is possible again.
+        """
+        with self._enrichment_lock:
+            if self._stop.is_set():
+                self._enrichment_executor = ThreadPoolExecutor(
+                    max_workers=self._enrichment_workers, thread_name_prefix=f"{self.__class__.__name__}.enrichment"
+                )
+        super().websocket_connect()
+
+    def websocket_disconnect(self, event: str = "") -> None:
+        """
+        Close the websocket connection. Getting Z-Wave product information still pending is cancelled.
+
+        :param event: Event that led to disconnecting
+        """
+        super().websocket_disconnect(event)
+        self._enrichment_executor.shutdown(wait=False, cancel_futures=True)
+
+    def _grouping(self) -> None:
+        """Get all zones (also called rooms)."""
+        self.gateway.zones = self.get_all_zones()
+
+    def _reconcile_with_gateway(self) -> None:
+        """
+        Connect to the gateway and bring devices restored from a snapshot up to date. Afterwards, listen to changes. If the
+        gateway cannot be reached, reconnecting is scheduled like after a websocket breakdown and devices are brought up to
+        date once connected.
+        """
+        self._set_state(ConnectionState.CONNECTING)
+        try:
+            self.detect_gateway_in_lan()
+            self.create_connection()
+            self._grouping()
+            self.resync()
+        except (ConnectionError, GatewayOfflineError, requests.exceptions.RequestException):
+            self._logger.error("Could not reconcile devices with the gateway. Trying again later.")
+            self._logger.debug(sys.exc_info())
+            self._schedule_reconnect()
+            return
+
+        if self.connection_state is not ConnectionState.DISCONNECTED:
+            self.websocket_connect()
+
+    def _inspect_devices(self, devices: list[str]) -> None:
+        """Inspect device properties of given list of devices."""
+        devices_properties = self.get_data_from_uid_list(devices)
+        uid_list = self._add_devices(devices_properties)
+        if not self._lazy_zwave_info:
+            self._enrich_devices(devices_properties)
+        if self._streaming:
+            self._add_properties(self.stream_data_from_uid_list(uid_list))
+        else:
+            self._add_properties(uid_info for chunk in self.iter_data_from_uid_list(uid_list) for uid_info in chunk)
@@ -0,0 +1,80 @@
+"""Multiple devolo Home Control Central Units."""
+from __future__ import annotations
+
+import logging
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from threading import Thread
+
+import requests
+from zeroconf import Zeroconf
+
+from .backend.discovery_cache import DiscoveryCache
+from .exceptions import GatewayOfflineError
+from .homecontrol import HomeControl
+from .mydevolo import Mydevolo
+
+
+class HomeControlPool:
+    """
+    Representing object for all your Home Control setups attached to one my devolo account. The gateways are set up at the
+    same time sharing one Mydevolo instance and one Zeroconf instance. As HomeControl objects sharing a Zeroconf instance
+    also share the mDNS browser, searching for all gateways in your LAN takes as long as searching for one gateway. Gateways
+    failing to set up are logged and left out.
+
+    :param mydevolo_instance: Mydevolo instance for talking to the devolo Cloud
+    :param zeroconf_instance: Zeroconf instance to be potentially reused
+    :param gateway_ids: Gateway IDs to set up. If not set, all gateways attached to the my devolo account are set up.
+    :param discovery_cache: DiscoveryCache instance to remember the gateways' local IPs
+    """
+
+    def __init__(
+        self,
+        mydevolo_instance: Mydevolo,
+        zeroconf_instance: Zeroconf | None = None,
+        gateway_ids: list[str] | None = None,
+        discovery_cache: DiscoveryCache | None = None,
+    ) -> None:
+        """Initialize communication with your Home Control setups."""
+        self._logger = logging.getLogger(self.__class__.__name__)
+        self._mydevolo = mydevolo_instance
+        self._zeroconf = zeroconf_instance
+        self._discovery_cache = discovery_cache
+
+        gateway_ids = gateway_ids if gateway_ids is not None else self._mydevolo.get_gateway_ids()
+        self.homecontrols: dict[str, HomeControl] = {}
+        if not gateway_ids:
+            return
+
+        zeroconf = self._zeroconf or Zeroconf()
+        with ThreadPoolExecutor(max_workers=len(gateway_ids), thread_name_prefix=self.__class__.__name__) as executor:
+            homecontrols = executor.map(lambda gateway_id: self._setup(gateway_id, zeroconf), gateway_ids)
+            self.homecontrols = {homecontrol.gateway.id: homecontrol for homecontrol in homecontrols if homecontrol}
+        if not self._zeroconf:
+            Thread(target=zeroconf.close, name=f"{self.__class__.__name__}.zeroconf_close").start()
+
+    def __getitem__(self, gateway_id: str) -> HomeControl:
+        """Get the HomeControl object of a gateway."""
+        return self.homecontrols[gateway_id]
+
+    def __len__(self) -> int:
+        """Get the number of gateways set up."""
+        return len(self.homecontrols)
+
+    def websocket_disconnect(self, event: str = "") -> None:
+        """
+        Close the websocket connections of all gateways.
+
+        :param event: Event that led to disconnecting
+        """
+        for homecontrol in self.homecontrols.values():
+            homecontrol.websocket_disconnect(event)
+
+    def _setup(self, gateway_id: str, zeroconf: Zeroconf) -> HomeControl | None:
+        """Set up a gateway. If that fails, log the reason."""
+        try:
+            return HomeControl(gateway_id, self._mydevolo, zeroconf, self._discovery_cache)
+        except (ConnectionError, GatewayOfflineError, requests.exceptions.RequestException):
+            self._logger.error("Could not set up gateway %s.", gateway_id)
+            self._logger.debug(sys.exc_info())
+            return None
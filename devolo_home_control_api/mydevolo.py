@@ -1,29 +1,68 @@
 """my devolo."""
 from __future__ import annotations
 
+import json
 import logging
+import os
+import time
+from concurrent.futures import Future
 from functools import lru_cache
 from http import HTTPStatus
+from pathlib import Path
+from threading import Lock, Timer
 from typing import Any
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3 import Retry
 
 from . import __version__
 from .exceptions.gateway import GatewayOfflineError
 from .exceptions.general import WrongCredentialsError, WrongUrlError
 
+_SAVE_DELAY = 1.0
+
 
 class Mydevolo:
     """
     The Mydevolo object handles calls to the my devolo API v1. It does not cover all API calls, just those requested up to now.
     All calls are done in a user context, so you need to provide credentials of that user.
+
+    Connections to my devolo are kept alive and reused by all users of this object. Information about Z-Wave products
+    rarely changes, so it is cached for all users of this object. Concurrent requests for the same product lead to only one
+    call. Writing the persisted information is delayed a bit, so products fetched in a row are written at once.
+
+    :param zwave_products_cache: Path of a JSON file to persist information about Z-Wave products in
+    :param zwave_products_ttl: Seconds information about Z-Wave products are valid
+    :param pool_size: Maximum number of connections to my devolo kept alive
     """
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        zwave_products_cache: str | os.PathLike[str] | None = None,
+        zwave_products_ttl: float = 7 * 24 * 60 * 60,
+        pool_size: int = 10,
+    ) -> None:
         """Initialize my devolo communication."""
+        retry = Retry(total=5, backoff_factor=0.1, allowed_methods=("GET",))
+        adapter = HTTPAdapter(pool_maxsize=pool_size, max_retries=retry)
+
         self._logger = logging.getLogger(self.__class__.__name__)
         self._user = ""
         self._password = ""
+        self._session = requests.Session()
+        self._session.headers.update(
+            {"content-type": "application/json", "User-Agent": f"devolo_home_control_api/{__version__}"}
+        )
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+        self._zwave_products_cache = Path(zwave_products_cache) if zwave_products_cache else None
+        self._zwave_products_lock = Lock()
+        self._zwave_products_requests: dict[str, Future[dict[str, Any]]] = {}
+        self._zwave_products_save: Timer | None = None
+        self._zwave_products_save_lock = Lock()
+        self._zwave_products_ttl = zwave_products_ttl
+        self._zwave_products: dict[str, dict[str, Any]] = self._load_zwave_products()
 
         self.url = "https://www.mydevolo.com"
 
@@ -49,6 +88,11 @@ class Mydevolo:
         self._password = password
         self.uuid.cache_clear()
 
+    @property
+    def zwave_products_ttl(self) -> float:
+        """Seconds information about Z-Wave products are valid."""
+        return self._zwave_products_ttl
+
     def credentials_valid(self) -> bool:
         """
         Check if current credentials are valid. This is done by trying to get the UUID. If that fails, credentials must be
@@ -107,13 +151,44 @@ class Mydevolo:
 
     def get_zwave_products(self, manufacturer: str, product_type: str, product: str) -> dict[str, Any]:
         """
-        Get information about a Z-Wave device.
+        Get information about a Z-Wave device. Information is cached, so asking for the same product again is cheap.
 
         :param manufacturer: The manufacturer ID in hex.
         :param product_type: The product type ID in hex.
         :param product: The product ID in hex.
         :return: All known product information.
         """
+        key = f"{manufacturer}/{product_type}/{product}"
+        with self._zwave_products_lock:
+            cached = self._zwave_products.get(key)
+            if cached and cached["expires"] > time.time():
+                return dict(cached["product"])
+            request = self._zwave_products_requests.get(key)
+            requesting = request is None
+            if request is None:
+                request = self._zwave_products_requests[key] = Future()
+
+        if not requesting:
+            self._logger.debug("Waiting for information about %s", key)
+            return dict(request.result())
+
+        try:
+            device_info = self._get_zwave_products(manufacturer, product_type, product)
+        except Exception as exception:
+            request.set_exception(exception)
+            raise
+        else:
+            request.set_result(device_info)
+            with self._zwave_products_lock:
+                self._zwave_products[key] = {"expires": time.time() + self._zwave_products_ttl, "product": device_info}
+                self._schedule_save_zwave_products()
+        finally:
+            with self._zwave_products_lock:
+                del self._zwave_products_requests[key]
+        return dict(device_info)
+
+    def _get_zwave_products(self, manufacturer: str, product_type: str, product: str) -> dict[str, Any]:
+        """Get information about a Z-Wave device from my devolo."""
         self._logger.debug("Getting information for %s/%s/%s", manufacturer, product_type, product)
         try:
             device_info = self._call(f"{self.url}/v1/zwave/products/{manufacturer}/{product_type}/{product}")
@@ -150,10 +225,48 @@ class Mydevolo:
         self._logger.debug("Getting UUID")
         return self._call(f"{self.url.rstrip('/')}/v1/users/uuid")["uuid"]
 
+    def _load_zwave_products(self) -> dict[str, dict[str, Any]]:
+        """Load persisted information about Z-Wave products. A missing or broken file is treated like an empty cache."""
+        if not self._zwave_products_cache:
+            return {}
+        try:
+            return json.loads(self._zwave_products_cache.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError):
+            self._logger.warning("Could not read Z-Wave products from %s.", self._zwave_products_cache)
+            return {}
+
+    def save_zwave_products(self) -> None:
+        """
+        Persist information about Z-Wave products now instead of waiting for the pending write. Failures are logged, but do
+        not disturb the caller.
+        """
+        with self._zwave_products_lock:
+            if self._zwave_products_save:
+                self._zwave_products_save.cancel()
+                self._zwave_products_save = None
+            zwave_products = dict(self._zwave_products)
+        if not self._zwave_products_cache:
+            return
+        temp_path = self._zwave_products_cache.with_name(f"{self._zwave_products_cache.name}.tmp")
+        with self._zwave_products_save_lock:
+            try:
+                temp_path.write_text(json.dumps(zwave_products), encoding="utf-8")
+                temp_path.replace(self._zwave_products_cache)
+            except OSError:
+                self._logger.warning("Could not write Z-Wave products to %s.", self._zwave_products_cache)
+
+    def _schedule_save_zwave_products(self) -> None:
+        """Persist information about Z-Wave products a bit later, so products fetched in a row are written at once."""
+        if not self._zwave_products_cache or self._zwave_products_save:
+            return
+        self._zwave_products_save = Timer(_SAVE_DELAY, self.save_zwave_products)
+        self._zwave_products_save.start()
+
     def _call(self, url: str) -> dict[str, Any]:
         """Make a call to any entry point with the user's context."""
-        headers = {"content-type": "application/json", "User-Agent": f"devolo_home_control_api/{__version__}"}
-        responds = requests.get(url, auth=(self._user, self._password), headers=headers, timeout=60)
+        responds = self._session.get(url, auth=(self._user, self._password), timeout=60)
 
         if responds.status_code == HTTPStatus.FORBIDDEN:
             self._logger.error("Could not get full URL. Wrong username or password?")
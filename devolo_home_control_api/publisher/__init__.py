@@ -1,5 +1,7 @@
 """Pubish websocket messages."""
+from devolo_home_control_api.helper import Overflow, QueueMetrics
+
 from .publisher import Publisher
 from .updater import Updater
 
-__all__ = ["Publisher", "Updater"]
+__all__ = ["Overflow", "Publisher", "QueueMetrics", "Updater"]
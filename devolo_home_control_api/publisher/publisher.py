@@ -1,49 +1,330 @@
 """The Publisher."""
 from __future__ import annotations
 
+import inspect
 import logging
+import threading
+import weakref
 from collections.abc import KeysView
+from functools import partial
 from typing import Any, Callable
 
+from devolo_home_control_api.helper import Overflow, QueueMetrics, WorkerQueue, get_device_type_from_element_uid
+
+from .throttle import Throttle
+
+
+class _WeakCallback:
+    """Callback of a subscriber, that does not keep the subscriber alive."""
+
+    __slots__ = ("_function", "_method", "_subscriber")
+
+    def __init__(self, callback: Callable, subscriber: weakref.ref) -> None:
+        """Initialize the callback."""
+        self._subscriber = subscriber
+        self._method: weakref.WeakMethod | None = None
+        self._function: Callable | None = None
+        if inspect.ismethod(callback) and callback.__self__ is subscriber():
+            self._method = weakref.WeakMethod(callback)
+        else:
+            self._function = callback
+
+    def __call__(self, message: tuple[Any, ...]) -> None:
+        """Call the subscriber, if it is still alive."""
+        callback = self._method() if self._method else self._function
+        if callback is not None and self._subscriber() is not None:
+            callback(message)
+
 
 class Publisher:
-    """The Publisher send messages to attached subscribers."""
+    """
+    The Publisher send messages to attached subscribers. Messages can be dispatched from several threads, while subscribers
+    come and go. Subscribers are called outside of the publisher's lock with those registered when the message was
+    dispatched.
+    """
 
     def __init__(self, events: list[Any] | KeysView) -> None:
         """Initialize the publisher."""
         self._logger = logging.getLogger(self.__class__.__name__)
         self._events: dict[Any, Any] = {event: {} for event in events}
+        self._queues: dict[Any, WorkerQueue] = {}
+        self._types: dict[str, dict[Any, Any]] = {}
+        self._prefixes: dict[str, dict[Any, Any]] = {}
+        self._prefix_lengths: list[int] = []
+        self._wildcard: dict[Any, Any] = {}
+        self._dead: list[weakref.ref] = []
+        self._lock = threading.RLock()
 
     def add_event(self, event: str) -> None:
         """Add a new event to listen to."""
-        self._events[event] = {}
+        with self._lock:
+            self._events[event] = {}
+
+    def close(self) -> None:
+        """Stop the workers of all queued subscribers as soon as they handled their pending messages."""
+        with self._lock:
+            for subscribers in self._registries():
+                for callback in subscribers.values():
+                    self._cancel(callback)
+            for queue in self._queues.values():
+                queue.close()
+            self._queues.clear()
 
     def delete_event(self, event: str) -> None:
         """Delete a not longer needed event."""
-        self._events.pop(event)
+        with self._lock:
+            self._prune()
+            for who, callback in self._events.pop(event).items():
+                self._cancel(callback)
+                self._release_queue(who)
 
     def dispatch(self, event: str, message: tuple[Any, ...]) -> None:
         """Dispatch the message to the subscribers."""
-        for callback in self._get_subscribers_for_specific_event(event).values():
-            callback(message)
+        with self._lock:
+            if self._dead:
+                self._prune()
+            callbacks = list(self._get_subscribers_for_specific_event(event).values())
+            if self._wildcard or self._types or self._prefixes:
+                callbacks.extend(self._get_subscribers_for_message(message))
+        for callback in callbacks:
+            callback(message, event)
+
+    def queue_metrics(self) -> dict[Any, QueueMetrics]:
+        """
+        Get the health of the queues of all queued subscribers.
+
+        :return: Queue metrics per subscriber
+        """
+        with self._lock:
+            self._prune()
+            queues = list(self._queues.items())
+        return {self._subscriber(who): queue.metrics for who, queue in queues}
 
-    def register(self, event: str, who: Any, callback: Callable | None = None) -> None:
+    def register(  # noqa: PLR0913
+        self,
+        event: str,
+        who: Any,
+        callback: Callable | None = None,
+        *,
+        queue_size: int = 0,
+        overflow: Overflow = Overflow.DROP_OLDEST,
+        min_interval: float = 0.0,
+        min_change: float | None = None,
+        weak: bool = False,
+    ) -> None:
         """
         As a new subscriber for an event, add a callback function to call on new message.
         If no callback is given, it registers update().
 
+        :param event: Event to listen to, usually a device UID
+        :param who: Subscriber
+        :param callback: Function to call with each message
+        :param queue_size: If set, messages are queued for the subscriber and handled in its own worker thread, so a slow
+                           subscriber does not delay handling websocket messages. The queue is shared by all events the
+                           subscriber registers for and keeps the size and overflow policy of the first queued registration.
+        :param overflow: What to do, if the queue of the subscriber is full
+        :param min_interval: Minimum number of seconds between two messages about the same element. The latest message
+                             arriving in between is delivered as soon as the interval elapsed.
+        :param min_change: Deliver numeric values only, if they changed by more than this compared to the last value
+                           delivered. Other values are delivered, if they changed at all.
+        :param weak: Do not keep the subscriber alive. Once it is garbage collected, it is unregistered automatically. If
+                     the callback is a method of the subscriber, it is not kept alive either.
         :raises AttributeError: The supposed callback is not callable.
         """
-        if callback is None:
-            callback = who.update
-        self._get_subscribers_for_specific_event(event)[who] = callback
+        with self._lock:
+            key, callback = self._subscribe(
+                who,
+                callback,
+                queue_size=queue_size,
+                overflow=overflow,
+                min_interval=min_interval,
+                min_change=min_change,
+                weak=weak,
+            )
+            self._get_subscribers_for_specific_event(event)[key] = callback
         self._logger.debug("Subscriber registered for event %s", event)
 
+    def register_all(self, who: Any, callback: Callable | None = None, **options: Any) -> None:
+        """
+        As a new subscriber for all events, add a callback function to call on every message.
+        If no callback is given, it registers update().
+
+        :param who: Subscriber
+        :param callback: Function to call with each message
+        :param options: Options as for register(), e.g. to queue or sample messages
+        """
+        with self._lock:
+            key, callback = self._subscribe(who, callback, **options)
+            self._wildcard[key] = callback
+        self._logger.debug("Subscriber registered for all events")
+
+    def register_prefix(self, prefix: str, who: Any, callback: Callable | None = None, **options: Any) -> None:
+        """
+        As a new subscriber for all elements with an UID starting with a prefix, add a callback function to call on new
+        message. If no callback is given, it registers update().
+
+        :param prefix: Start of the element UIDs to listen to, e.g. "devolo.Meter:hdm:ZWave:CBC56091/" for all meters of a
+                       gateway
+        :param who: Subscriber
+        :param callback: Function to call with each message
+        :param options: Options as for register(), e.g. to queue or sample messages
+        """
+        with self._lock:
+            key, callback = self._subscribe(who, callback, **options)
+            self._prefixes.setdefault(prefix, {})[key] = callback
+            self._prefix_lengths = sorted({len(prefix) for prefix in self._prefixes})
+        self._logger.debug("Subscriber registered for prefix %s", prefix)
+
+    def register_type(self, property_type: str, who: Any, callback: Callable | None = None, **options: Any) -> None:
+        """
+        As a new subscriber for all elements of a type, add a callback function to call on new message.
+        If no callback is given, it registers update().
+
+        :param property_type: Type of the elements to listen to as found in front of their UIDs, e.g. "devolo.Meter" for
+                              all consumption updates
+        :param who: Subscriber
+        :param callback: Function to call with each message
+        :param options: Options as for register(), e.g. to queue or sample messages
+        """
+        with self._lock:
+            key, callback = self._subscribe(who, callback, **options)
+            self._types.setdefault(property_type, {})[key] = callback
+        self._logger.debug("Subscriber registered for type %s", property_type)
+
+    def subscriber_counts(self) -> dict[Any, int]:
+        """
+        Get the number of subscribers still registered for each event. Subscribers registered for all events, element types
+        or prefixes are not counted.
+
+        :return: Number of subscribers per event
+        """
+        with self._lock:
+            self._prune()
+            return {event: len(subscribers) for event, subscribers in self._events.items()}
+
     def unregister(self, event: str, who: Any) -> None:
         """Remove a subscriber for a specific event."""
-        del self._get_subscribers_for_specific_event(event)[who]
+        with self._lock:
+            self._unsubscribe(self._get_subscribers_for_specific_event(event), who)
         self._logger.debug("Subscriber deleted for event %s", event)
 
+    def unregister_all(self, who: Any) -> None:
+        """Remove a subscriber for all events."""
+        with self._lock:
+            self._unsubscribe(self._wildcard, who)
+        self._logger.debug("Subscriber deleted for all events")
+
+    def unregister_prefix(self, prefix: str, who: Any) -> None:
+        """Remove a subscriber for an element UID prefix."""
+        with self._lock:
+            self._unsubscribe(self._prefixes[prefix], who)
+            if not self._prefixes[prefix]:
+                del self._prefixes[prefix]
+                self._prefix_lengths = sorted({len(prefix) for prefix in self._prefixes})
+        self._logger.debug("Subscriber deleted for prefix %s", prefix)
+
+    def unregister_type(self, property_type: str, who: Any) -> None:
+        """Remove a subscriber for an element type."""
+        with self._lock:
+            self._unsubscribe(self._types[property_type], who)
+            if not self._types[property_type]:
+                del self._types[property_type]
+        self._logger.debug("Subscriber deleted for type %s", property_type)
+
+    @staticmethod
+    def _call(callback: Callable, message: tuple[Any, ...], event: Any) -> None:  # noqa: ARG004
+        """Call a subscriber with a message. The event is only needed to tell messages apart while queueing or throttling."""
+        callback(message)
+
+    @staticmethod
+    def _cancel(callback: Callable) -> None:
+        """Drop messages delayed for a callback."""
+        if isinstance(callback, Throttle):
+            callback.cancel()
+
+    def _get_subscribers_for_message(self, message: tuple[Any, ...]) -> list[Callable]:
+        """
+        All callbacks of subscribers listening to every message or to the element the message is about. Instead of
+        checking each subscription, only the element type and the prefixes of the element UID having the length of a
+        registered prefix are looked up.
+        """
+        callbacks = list(self._wildcard.values())
+        if message and isinstance(message[0], str):
+            element_uid = message[0]
+            if self._types:
+                callbacks.extend(self._types.get(get_device_type_from_element_uid(element_uid), {}).values())
+            for length in self._prefix_lengths:
+                callbacks.extend(self._prefixes.get(element_uid[:length], {}).values())
+        return callbacks
+
     def _get_subscribers_for_specific_event(self, event: str) -> dict[Any, Any]:
         """All subscribers listening to an event."""
         return self._events.get(event, {})
+
+    def _prune(self) -> None:
+        """Unregister garbage collected subscribers. The publisher's lock must be held."""
+        while self._dead:
+            key = self._dead.pop()
+            for subscribers in self._registries():
+                if key in subscribers:
+                    self._cancel(subscribers.pop(key))
+            if key in self._queues:
+                self._queues.pop(key).close()
+            self._logger.debug("Garbage collected subscriber deleted")
+
+    def _registries(self) -> list[dict[Any, Any]]:
+        """All subscribers grouped by what they are listening to."""
+        return [*self._events.values(), *self._types.values(), *self._prefixes.values(), self._wildcard]
+
+    def _release_queue(self, who: Any) -> None:
+        """Stop the worker of a queued subscriber, if it is not registered for anything anymore."""
+        if who in self._queues and not any(who in subscribers for subscribers in self._registries()):
+            self._queues.pop(who).close()
+
+    def _subscribe(  # noqa: PLR0913
+        self,
+        who: Any,
+        callback: Callable | None = None,
+        *,
+        queue_size: int = 0,
+        overflow: Overflow = Overflow.DROP_OLDEST,
+        min_interval: float = 0.0,
+        min_change: float | None = None,
+        weak: bool = False,
+    ) -> tuple[Any, Callable]:
+        """
+        Wrap the callback of a subscriber according to its options. Weak subscribers are registered by a weak reference, that
+        marks them for pruning as soon as they are garbage collected. The wrapped callback is called with the message and the
+        event it was dispatched for.
+
+        :return: Key to register the subscriber with and its wrapped callback
+        """
+        self._prune()
+        if callback is None:
+            callback = who.update
+        key = who
+        if weak:
+            key = weakref.ref(who, self._dead.append)
+            callback = _WeakCallback(callback, key)
+        deliver: Callable[[tuple[Any, ...], Any], None]
+        if queue_size:
+            if key not in self._queues:
+                self._queues[key] = WorkerQueue(f"{self.__class__.__name__}.subscriber", queue_size, overflow)
+            deliver = partial(self._queues[key].put, callback)
+        else:
+            deliver = partial(self._call, callback)
+        if min_interval or min_change is not None:
+            deliver = Throttle(deliver, min_interval=min_interval, min_change=min_change)
+        return key, deliver
+
+    @staticmethod
+    def _subscriber(key: Any) -> Any:
+        """Get the subscriber registered with a key."""
+        return key() if isinstance(key, weakref.ref) else key
+
+    def _unsubscribe(self, subscribers: dict[Any, Any], who: Any) -> None:
+        """Remove a subscriber, no matter if it was registered weakly."""
+        self._prune()
+        key = next((key for key in subscribers if self._subscriber(key) is who), who)
+        self._cancel(subscribers.pop(key))
+        self._release_queue(key)
@@ -0,0 +1,135 @@
+"""Sampling of messages for subscribers not needing every single one."""
+from __future__ import annotations
+
+import heapq
+import logging
+import threading
+from itertools import count
+from numbers import Number
+from time import monotonic
+from typing import Any, Callable
+
+from devolo_home_control_api.helper import get_message_key
+
+
+class _Scheduler:
+    """Call functions at given times. One thread serves all throttles, no matter how many messages are delayed."""
+
+    def __init__(self) -> None:
+        """Initialize the scheduler. Its thread is started as soon as something is scheduled."""
+        self._logger = logging.getLogger(self.__class__.__name__)
+        self._condition = threading.Condition()
+        self._counter = count()
+        self._heap: list[tuple[float, int, Callable[..., None], tuple[Any, ...]]] = []
+        self._thread: threading.Thread | None = None
+
+    def call_at(self, when: float, function: Callable[..., None], *args: Any) -> None:
+        """
+        Call a function as soon as the monotonic clock reaches a point of time.
+
+        :param when: Point of time on the monotonic clock
+        :param function: Function to call
+        :param args: Arguments to call the function with
+        """
+        with self._condition:
+            heapq.heappush(self._heap, (when, next(self._counter), function, args))
+            if self._thread is None:
+                # The thread waits for work forever, so it must not keep the interpreter alive.
+                self._thread = threading.Thread(target=self._run, name="Throttle", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def _run(self) -> None:
+        """Call the functions as soon as they are due."""
+        while True:
+            with self._condition:
+                while not self._heap or self._heap[0][0] > monotonic():
+                    self._condition.wait(self._heap[0][0] - monotonic() if self._heap else None)
+                _, _, function, args = heapq.heappop(self._heap)
+            try:
+                function(*args)
+            except Exception:
+                self._logger.exception("Failed to pass on a delayed message.")
+
+
+_scheduler = _Scheduler()
+
+
+class Throttle:
+    """
+    The Throttle object passes messages to a callback only if they are worth it. Messages are told apart by the event they
+    were dispatched for, by element UID and, if given, by the name of the value, so e.g. current and total consumption of a
+    meter or the names of two devices are throttled independently.
+
+    :param callback: Callback to pass the messages and their events to
+    :param min_interval: Minimum number of seconds between two messages of the same element. The latest message arriving in
+                         between is passed on as soon as the interval elapsed.
+    :param min_change: Minimum change of a numeric value compared to the last value passed on. Other values are passed on
+                       whenever they change.
+    """
+
+    def __init__(
+        self, callback: Callable[[tuple[Any, ...], Any], None], *, min_interval: float = 0.0, min_change: float | None = None
+    ) -> None:
+        """Initialize the throttle."""
+        self._callback = callback
+        self._min_interval = min_interval
+        self._min_change = min_change
+        self._lock = threading.Lock()
+        self._last: dict[tuple[Any, ...], tuple[float, Any]] = {}
+        self._pending: dict[tuple[Any, ...], tuple[Any, ...]] = {}
+        self._scheduled: dict[tuple[Any, ...], int] = {}
+        self._generation = count()
+
+    def __call__(self, message: tuple[Any, ...], event: Any = None) -> None:
+        """Pass a message on, delay it or drop it."""
+        key = get_message_key(message, event)
+        value = self._get_value(message)
+        with self._lock:
+            last = self._last.get(key)
+            if last is not None and not self._changed(last[1], value):
+                # The latest value is close to the one passed on last, so a delayed one is outdated.
+                self._pending.pop(key, None)
+                return
+            now = monotonic()
+            if last is not None and now - last[0] < self._min_interval:
+                self._pending[key] = message
+                if key not in self._scheduled:
+                    generation = self._scheduled[key] = next(self._generation)
+                    _scheduler.call_at(last[0] + self._min_interval, self._flush, key, generation)
+                return
+            self._last[key] = (now, value)
+        self._callback(message, event)
+
+    def cancel(self) -> None:
+        """Drop delayed messages."""
+        with self._lock:
+            self._scheduled.clear()
+            self._pending.clear()
+
+    def _changed(self, old: Any, new: Any) -> bool:
+        """Check, if a value changed enough to pass it on."""
+        if self._min_change is None:
+            return True
+        if isinstance(old, Number) and isinstance(new, Number) and not isinstance(new, bool):
+            return abs(new - old) > self._min_change  # type: ignore[operator]
+        return new != old
+
+    def _flush(self, key: tuple[Any, ...], generation: int) -> None:
+        """Pass on the latest message delayed. Flushes scheduled before cancelling the throttle are ignored."""
+        with self._lock:
+            if self._scheduled.get(key) != generation:
+                return
+            del self._scheduled[key]
+            message = self._pending.pop(key, None)
+            if message is None:
+                return
+            self._last[key] = (monotonic(), self._get_value(message))
+        self._callback(message, key[0])
+
+    @staticmethod
+    def _get_value(message: tuple[Any, ...]) -> Any:
+        """Get the value of a message. Messages carrying more than one value without a name are compared as a whole."""
+        if get_message_key(message)[2] is None and len(message) > 2:  # noqa: PLR2004
+            return message[1:]
+        return message[1] if len(message) > 1 else None
@@ -1,22 +1,85 @@
 """The Updater."""
 from __future__ import annotations
 
-import json
 import logging
 from contextlib import suppress
 from typing import Any, Callable
 
-from devolo_home_control_api.backend import MESSAGE_TYPES
+from devolo_home_control_api.backend import DEVICE_STATES, MESSAGE_TYPES, PropertyChangedEvent
 from devolo_home_control_api.devices import Gateway, Zwave
 from devolo_home_control_api.helper import (
     camel_case_to_snake_case,
     get_device_type_from_element_uid,
-    get_device_uid_from_element_uid,
-    get_device_uid_from_setting_uid,
+    json_dumps,
+    parse_uid,
 )
 
 from .publisher import Publisher
 
+_UNWANTED_PROPERTIES = frozenset({".unregistering", "assistantsConnected", "operationStatus"})
+_USELESS_PENDING_OPERATIONS = (
+    "devolo.HttpRequest",
+    "devolo.PairDevice",
+    "devolo.RemoveDevice",
+    "devolo.mprm.gw.GatewayManager",
+)
+_IGNORED_UNKNOWN_UIDS = (
+    "devolo.DeviceEvents",
+    "devolo.PairDevice",
+    "devolo.SirenBinarySensor",
+    "devolo.SirenMultiLevelSensor",
+    "devolo.mprm.gw.GatewayManager",
+    "devolo.mprm.gw.PortalManager",
+    "ss",
+    "mcs",
+)
+_MULTILEVEL_SYNC_TYPES = {
+    "devolo.model.Siren": "tone",
+    "devolo.model.OldShutter": "shutter_duration",
+    "devolo.model.Shutter": "shutter_duration",
+}
+_PROPERTY_CHANGED = "com/prosyst/mbs/services/fim/FunctionalItemEvent/PROPERTY_CHANGED"
+_RECONCILED_PROPERTIES = {
+    # Handler: Names of the properties in websocket messages and in functional items
+    "_automatic_calibration": (("calibrationStatus", "calibrationStatus"),),
+    "_binary_async": (("value", "value"),),
+    "_binary_sensor": (("state", "state"),),
+    "_binary_switch": (("targetState", "state"), ("guiEnabled", "guiEnabled")),
+    "_binary_sync": (("value", "value"),),
+    "_device_state": tuple((name, name) for name in DEVICE_STATES),
+    "_general_device": (("settings", "settings"),),
+    "_humidity_bar": (("value", "value"),),
+    "_led": (("led", "led"), ("feedback", "feedback")),
+    "_meter": (("currentValue", "currentValue"), ("totalValue", "totalValue"), ("sinceTime", "sinceTime")),
+    "_multilevel_async": (("value", "value"),),
+    "_multi_level_sensor": (("value", "value"),),
+    "_multi_level_switch": (("value", "value"),),
+    "_multilevel_sync": (("value", "value"),),
+    "_parameter": (("paramChanged", "paramChanged"),),
+    "_protection": (("localSwitch", "localSwitch"), ("remoteSwitch", "remoteSwitch")),
+    "_remote_control": (("keyPressed", "keyPressed"),),
+    "_switch_type": (("switchType", "switchType"),),
+    "_temperature_report": (("tempReport", "tempReport"),),
+}
+_SWITCHING_TYPES = {
+    "targetLocalSwitch": "local_switching",
+    "localSwitch": "local_switching",
+    "targetRemoteSwitch": "remote_switching",
+    "remoteSwitch": "remote_switching",
+}
+
+
+class _Route:
+    """Way from an element UID to its handler and, once resolved, to the device UID and the property object to update."""
+
+    __slots__ = ("device_uid", "element", "handler")
+
+    def __init__(self, handler: Callable[[PropertyChangedEvent], None]) -> None:
+        """Initialize the route."""
+        self.handler = handler
+        self.device_uid: str | None = None
+        self.element: Any = None
+
 
 class Updater:
     """
@@ -37,56 +100,93 @@ class Updater:
         self.devices = devices
         self.on_device_change: Callable[[list[str]], tuple[str, str]] | None = None
 
-    def update(self, message: dict[str, Any]) -> None:
+        # Handlers are looked up once, so messages are dispatched without building strings or calling getattr.
+        self._handlers: dict[str, Callable[[PropertyChangedEvent], None]] = {
+            device_type: getattr(self, message_type) for device_type, message_type in MESSAGE_TYPES.items()
+        }
+        self._meter_handlers: dict[str, Callable[[PropertyChangedEvent], None]] = {
+            "currentValue": self._current_consumption,
+            "totalValue": self._total_consumption,
+            "sinceTime": self._since_time,
+            "guiEnabled": self._gui_enabled,
+        }
+
+        # Handler, device UID and property object per element UID, so steady-state updates need only one lookup.
+        self._routes: dict[str, _Route] = {}
+
+    def update(self, message: dict[str, Any] | PropertyChangedEvent) -> None:
         """
         Update states and values depending on the message type.
 
-        :param message: Message to process
+        :param message: Message or its decoded event to process
         """
-        unwanted_properties = [
-            ".unregistering",
-            "assistantsConnected",
-            "operationStatus",
-        ]
+        event = message if isinstance(message, PropertyChangedEvent) else PropertyChangedEvent.from_message(message)
 
         # Early return on unwanted messages
-        if (
-            "UNREGISTERED" in message["topic"]
-            or message["properties"]["property.name"] in unwanted_properties
-            or "smartGroup" in message["properties"]["uid"]
-        ):
+        if event.property_name in _UNWANTED_PROPERTIES or "UNREGISTERED" in event.topic or "smartGroup" in event.uid:
             return
 
         # Handle pending operations messages
-        if "property.name" in message["properties"] and message["properties"]["property.name"] == "pendingOperations":
-            self._pending_operations(message)
+        if event.property_name == "pendingOperations":
+            self._pending_operations(event)
             return
 
         # Handle all other messages
-        message_type = MESSAGE_TYPES.get(get_device_type_from_element_uid(message["properties"]["uid"]), "_unknown")
+        route = self._routes.get(event.uid)
+        if route is None:
+            route = self._routes[event.uid] = _Route(
+                self._handlers.get(get_device_type_from_element_uid(event.uid), self._unknown)
+            )
         with suppress(AttributeError, KeyError):  # Sometime we receive already messages although the device is not setup yet.
-            getattr(self, message_type)(message)
+            route.handler(event)
+
+    def reconcile(self, uid: str, properties: dict[str, Any]) -> None:
+        """
+        Bring an element up to date with the properties of its functional item. They are handled like websocket messages
+        reporting them, so the same setters are used and the same messages are published.
+
+        :param uid: Element UID, setting UID or device UID
+        :param properties: Properties of the functional item
+        """
+        message_type = MESSAGE_TYPES.get(get_device_type_from_element_uid(uid), "_unknown")
+        for name, key in _RECONCILED_PROPERTIES.get(message_type, ()):
+            if key not in properties:
+                continue
+            event = PropertyChangedEvent(
+                _PROPERTY_CHANGED,
+                {"uid": uid, "property.name": name, "property.value.new": properties[key], "itemId": properties.get("itemId")},
+            )
+            if name == "guiEnabled":
+                # Websocket messages report the protection of binary switches via their meters.
+                with suppress(AttributeError, KeyError):
+                    self._gui_enabled(event)
+            else:
+                self.update(event)
 
-    def _automatic_calibration(self, message: dict[str, Any]) -> None:
+    def clear_routes(self) -> None:
+        """Forget handlers and property objects remembered for element UIDs. Call this, if devices were added or removed."""
+        self._routes.clear()
+
+    def _automatic_calibration(self, event: PropertyChangedEvent) -> None:
         """Update a automatic calibration message."""
         try:
-            calibration_status = message["properties"]["property.value.new"]["status"]
+            calibration_status = event.value["status"]
             self._update_automatic_calibration(
-                element_uid=message["properties"]["uid"], calibration_status=calibration_status != 2  # noqa: PLR2004
+                element_uid=event.uid, calibration_status=calibration_status != 2  # noqa: PLR2004
             )
         except (KeyError, TypeError):
-            if type(message["properties"]["property.value.new"]) not in [dict, list]:
+            if type(event.value) not in [dict, list]:
                 self._update_automatic_calibration(
-                    element_uid=message["properties"]["uid"],
-                    calibration_status=bool(message["properties"]["property.value.new"]),
+                    element_uid=event.uid,
+                    calibration_status=bool(event.value),
                 )
 
-    def _binary_async(self, message: dict[str, Any]) -> None:
+    def _binary_async(self, event: PropertyChangedEvent) -> None:
         """Update a binary async setting."""
-        if type(message["properties"]["property.value.new"]) not in [dict, list]:
-            element_uid: str = message["properties"]["uid"]
-            value = bool(message["properties"]["property.value.new"])
-            device_uid = get_device_uid_from_setting_uid(element_uid)
+        if type(event.value) not in [dict, list]:
+            element_uid: str = event.uid
+            value = bool(event.value)
+            device_uid = parse_uid(element_uid).device_uid
             try:
                 self.devices[device_uid].settings_property[camel_case_to_snake_case(element_uid).split("#")[-1]].value = value
             except KeyError:
@@ -95,123 +195,109 @@ class Updater:
             self._logger.debug("Updating state of %s to %s", element_uid, value)
             self._publisher.dispatch(device_uid, (element_uid, value))
 
-    def _binary_sync(self, message: dict[str, Any]) -> None:
+    def _binary_sync(self, event: PropertyChangedEvent) -> None:
         """Update a binary sync setting."""
-        element_uid: str = message["properties"]["uid"]
-        value = bool(message["properties"]["property.value.new"])
-        device_uid = get_device_uid_from_setting_uid(element_uid)
+        element_uid: str = event.uid
+        value = bool(event.value)
+        device_uid = parse_uid(element_uid).device_uid
         self.devices[device_uid].settings_property["movement_direction"].inverted = value
         self._logger.debug("Updating state of %s to %s", element_uid, value)
         self._publisher.dispatch(device_uid, (element_uid, value))
 
-    def _binary_sensor(self, message: dict[str, Any]) -> None:
+    def _binary_sensor(self, event: PropertyChangedEvent) -> None:
         """Update a binary sensor's state."""
-        if message["properties"]["property.value.new"] is not None:
-            element_uid: str = message["properties"]["uid"]
-            value = bool(message["properties"]["property.value.new"])
-            device_uid = get_device_uid_from_element_uid(element_uid)
-            self.devices[device_uid].binary_sensor_property[element_uid].state = value
+        if event.value is not None:
+            element_uid: str = event.uid
+            value = bool(event.value)
+            device_uid, binary_sensor = self._resolve(element_uid, "binary_sensor_property")
+            binary_sensor.state = value
             self._logger.debug("Updating state of %s to %s", element_uid, value)
             self._publisher.dispatch(device_uid, (element_uid, value))
 
-    def _binary_switch(self, message: dict[str, Any]) -> None:
+    def _binary_switch(self, event: PropertyChangedEvent) -> None:
         """Update a binary switch's state."""
-        if message["properties"]["property.name"] == "targetState" and message["properties"]["property.value.new"] is not None:
-            element_uid: str = message["properties"]["uid"]
-            value = bool(message["properties"]["property.value.new"])
-            device_uid = get_device_uid_from_element_uid(element_uid)
-            self.devices[device_uid].binary_switch_property[element_uid].state = value
+        if event.property_name == "targetState" and event.value is not None:
+            element_uid: str = event.uid
+            value = bool(event.value)
+            device_uid, binary_switch = self._resolve(element_uid, "binary_switch_property")
+            binary_switch.state = value
             self._logger.debug("Updating state of %s to %s", element_uid, value)
             self._publisher.dispatch(device_uid, (element_uid, value))
 
-    def _pending_operations(self, message: dict[str, Any]) -> None:
+    def _pending_operations(self, event: PropertyChangedEvent) -> None:
         """Update pending operation state."""
-        element_uid: str = message["properties"]["uid"]
+        element_uid: str = event.uid
 
         # Early return on useless messages
-        if [
-            uid
-            for uid in ["devolo.HttpRequest", "devolo.PairDevice", "devolo.RemoveDevice", "devolo.mprm.gw.GatewayManager"]
-            if (uid in element_uid)
-        ]:
+        if any(uid in element_uid for uid in _USELESS_PENDING_OPERATIONS):
             return
 
-        pending_operations = bool(message["properties"].get("property.value.new"))
-        try:
-            device_uid = get_device_uid_from_element_uid(element_uid)
-            self.devices[device_uid].pending_operations = pending_operations
-        except KeyError:
-            device_uid = get_device_uid_from_setting_uid(element_uid)
-            self.devices[device_uid].pending_operations = pending_operations
+        pending_operations = bool(event.value)
+        device_uid = parse_uid(element_uid).device_uid
+        self.devices[device_uid].pending_operations = pending_operations
         self._logger.debug("Updating pending operations of device %s to %s", device_uid, pending_operations)
         self._publisher.dispatch(device_uid, ("pending_operations", pending_operations))
 
-    def _current_consumption(self, message: dict[str, Any]) -> None:
+    def _current_consumption(self, event: PropertyChangedEvent) -> None:
         """Update current consumption."""
-        self._update_consumption(element_uid=message["uid"], consumption="current", value=message["property.value.new"])
+        self._update_consumption(element_uid=event.uid, consumption="current", value=event.value)
 
-    def _device_state(self, message: dict[str, Any]) -> None:
+    def _device_state(self, event: PropertyChangedEvent) -> None:
         """Update the device state."""
-        property_name = {
-            "batteryLevel": "battery_level",
-            "batteryLow": "battery_low",
-            "status": "status",
-        }
-
-        device_uid = message["properties"]["uid"]
-        name = message["properties"]["property.name"]
-        value = message["properties"]["property.value.new"]
+        device_uid = event.uid
+        name = event.property_name
+        value = event.value
 
         try:
-            self._logger.debug("Updating %s of %s to %s", property_name[name], device_uid, value)
-            setattr(self.devices[device_uid], property_name[name], value)
-            self._publisher.dispatch(device_uid, (device_uid, value, property_name[name]))
+            self._logger.debug("Updating %s of %s to %s", DEVICE_STATES[name], device_uid, value)
+            setattr(self.devices[device_uid], DEVICE_STATES[name], value)
+            self._publisher.dispatch(device_uid, (device_uid, value, DEVICE_STATES[name]))
         except KeyError:
-            self._unknown(message)
+            self._unknown(event)
 
-    def _gateway_accessible(self, message: dict[str, Any]) -> None:
+    def _gateway_accessible(self, event: PropertyChangedEvent) -> None:
         """Update the gateway's state."""
-        if message["properties"]["property.name"] == "gatewayAccessible":
-            accessible = message["properties"]["property.value.new"]["accessible"]
-            online_sync = message["properties"]["property.value.new"]["onlineSync"]
+        if event.property_name == "gatewayAccessible":
+            accessible = event.value["accessible"]
+            online_sync = event.value["onlineSync"]
             self._logger.debug("Updating status and state of gateway to status: %s and state: %s", accessible, online_sync)
             self._gateway.online = accessible
             self._gateway.sync = online_sync
 
-    def _general_device(self, message: dict[str, Any]) -> None:
+    def _general_device(self, event: PropertyChangedEvent) -> None:
         """Update general device settings."""
         self._update_general_device_settings(
-            element_uid=message["properties"]["uid"],
-            events_enabled=message["properties"]["property.value.new"]["eventsEnabled"],
-            icon=message["properties"]["property.value.new"]["icon"],
-            name=message["properties"]["property.value.new"]["name"],
-            zone_id=message["properties"]["property.value.new"]["zoneID"],
+            element_uid=event.uid,
+            events_enabled=event.value["eventsEnabled"],
+            icon=event.value["icon"],
+            name=event.value["name"],
+            zone_id=event.value["zoneID"],
             zones=self._gateway.zones,
         )
 
-    def _grouping(self, message: dict[str, Any]) -> None:
+    def _grouping(self, event: PropertyChangedEvent) -> None:
         """Update zone (also called room) of a device."""
-        self._gateway.zones = {key["id"]: key["name"] for key in message["properties"]["property.value.new"]}
+        self._gateway.zones = {key["id"]: key["name"] for key in event.value}
         self._logger.debug("Updating gateway zones.")
 
-    def _gui_enabled(self, message: dict[str, Any]) -> None:
+    def _gui_enabled(self, event: PropertyChangedEvent) -> None:
         """Update protection setting of binary switches."""
-        device_uid = get_device_uid_from_element_uid(message["uid"])
-        enabled = message["property.value.new"]
+        device_uid = parse_uid(event.uid).device_uid
+        enabled = event.value
         for element_uid in self.devices[device_uid].binary_switch_property:
             self.devices[device_uid].binary_switch_property[element_uid].enabled = enabled
             self._logger.debug("Updating enabled state of %s to %s", element_uid, enabled)
             self._publisher.dispatch(device_uid, (element_uid, enabled, "gui_enabled"))
 
-    def _humidity_bar(self, message: dict[str, Any]) -> None:
+    def _humidity_bar(self, event: PropertyChangedEvent) -> None:
         """Update a humidity bar."""
-        fake_element_uid = f"devolo.HumidityBar:{message['properties']['uid'].split(':', 1)[1]}"
-        value = message["properties"]["property.value.new"]
-        device_uid = get_device_uid_from_element_uid(fake_element_uid)
-        if message["properties"]["uid"].startswith("devolo.HumidityBarZone"):
+        fake_element_uid = f"devolo.HumidityBar:{event.uid.split(':', 1)[1]}"
+        value = event.value
+        device_uid = parse_uid(fake_element_uid).device_uid
+        if event.uid.startswith("devolo.HumidityBarZone"):
             self.devices[device_uid].humidity_bar_property[fake_element_uid].zone = value
             self._logger.debug("Updating humidity bar zone of %s to %s", fake_element_uid, value)
-        elif message["properties"]["uid"].startswith("devolo.HumidityBarValue"):
+        elif event.uid.startswith("devolo.HumidityBarValue"):
             self.devices[device_uid].humidity_bar_property[fake_element_uid].value = value
             self._logger.debug("Updating humidity bar value of %s to %s", fake_element_uid, value)
         self._publisher.dispatch(
@@ -223,19 +309,16 @@ class Updater:
             ),
         )
 
-    def _inspect_devices(self, message: dict[str, Any]) -> None:
+    def _inspect_devices(self, event: PropertyChangedEvent) -> None:
         """Call method if a new device appears or an old one disappears."""
         if not callable(self.on_device_change):
             self._logger.error("on_device_change is not set.")
             return
 
-        if (
-            not isinstance(message["properties"]["property.value.new"], list)
-            or message["properties"]["uid"] != "devolo.DevicesPage"
-        ):
+        if not isinstance(event.value, list) or event.uid != "devolo.DevicesPage":
             return
 
-        device_uid, mode = self.on_device_change(message["properties"]["property.value.new"])
+        device_uid, mode = self.on_device_change(event.value)
         if mode == "add":
             self._logger.info("%s added.", device_uid)
             self._publisher.add_event(event=device_uid)
@@ -244,119 +327,99 @@ class Updater:
             self._publisher.dispatch(device_uid, (device_uid, mode))
             self._publisher.delete_event(event=device_uid)
 
-    def _led(self, message: dict[str, Any]) -> None:
+    def _led(self, event: PropertyChangedEvent) -> None:
         """Update LED settings."""
-        if type(message["properties"]["property.value.new"]) not in [dict, list]:
-            element_uid: str = message["properties"]["uid"]
-            value = message["properties"]["property.value.new"]
-            device_uid = get_device_uid_from_setting_uid(element_uid)
+        if type(event.value) not in [dict, list]:
+            element_uid: str = event.uid
+            value = event.value
+            device_uid = parse_uid(element_uid).device_uid
             self._logger.debug("Updating %s to %s.", element_uid, value)
             self.devices[device_uid].settings_property["led"].led_setting = value
             self._publisher.dispatch(device_uid, (element_uid, value))
 
-    def _meter(self, message: dict[str, Any]) -> None:
+    def _meter(self, event: PropertyChangedEvent) -> None:
         """Update a meter value."""
-        property_name = {
-            "currentValue": self._current_consumption,
-            "totalValue": self._total_consumption,
-            "sinceTime": self._since_time,
-            "guiEnabled": self._gui_enabled,
-        }
+        self._meter_handlers[event.property_name](event)
 
-        property_name[message["properties"]["property.name"]](message["properties"])
-
-    def _multilevel_async(self, message: dict[str, Any]) -> None:
+    def _multilevel_async(self, event: PropertyChangedEvent) -> None:
         """Update multilevel async setting (mas) properties."""
-        device_uid = get_device_uid_from_setting_uid(message["properties"]["uid"])
-        try:
-            name = camel_case_to_snake_case(message["properties"]["itemId"])
+        device_uid = parse_uid(event.uid).device_uid
+        if event.item_id is not None:
+            name = camel_case_to_snake_case(event.item_id)
         # The Metering Plug has an multilevel async setting without an ID
-        except KeyError:
-            if self.devices[device_uid].device_model_uid == "devolo.model.Wall:Plug:Switch:and:Meter":
-                name = "flash_mode"
-            else:
-                raise
-        self.devices[device_uid].settings_property[name].value = message["properties"]["property.value.new"]
+        elif self.devices[device_uid].device_model_uid == "devolo.model.Wall:Plug:Switch:and:Meter":
+            name = "flash_mode"
+        else:
+            return
+        self.devices[device_uid].settings_property[name].value = event.value
 
-    def _multi_level_sensor(self, message: dict[str, Any]) -> None:
+    def _multi_level_sensor(self, event: PropertyChangedEvent) -> None:
         """Update a multi level sensor."""
-        element_uid: str = message["properties"]["uid"]
-        value = message["properties"]["property.value.new"]
-        device_uid = get_device_uid_from_element_uid(element_uid)
+        element_uid: str = event.uid
+        value = event.value
+        device_uid, multi_level_sensor = self._resolve(element_uid, "multi_level_sensor_property")
         self._logger.debug("Updating %s to %s.", element_uid, value)
-        self.devices[device_uid].multi_level_sensor_property[element_uid].value = value
+        multi_level_sensor.value = value
         self._publisher.dispatch(device_uid, (element_uid, value))
 
-    def _multi_level_switch(self, message: dict[str, Any]) -> None:
+    def _multi_level_switch(self, event: PropertyChangedEvent) -> None:
         """Update a multi level switch."""
-        if not isinstance(message["properties"]["property.value.new"], (list, dict, type(None))):
-            element_uid: str = message["properties"]["uid"]
-            value = message["properties"]["property.value.new"]
-            device_uid = get_device_uid_from_element_uid(element_uid)
+        if not isinstance(event.value, (list, dict, type(None))):
+            element_uid: str = event.uid
+            value = event.value
+            device_uid, multi_level_switch = self._resolve(element_uid, "multi_level_switch_property")
             self._logger.debug("Updating %s to %s.", element_uid, value)
-            self.devices[device_uid].multi_level_switch_property[element_uid].value = value
+            multi_level_switch.value = value
             self._publisher.dispatch(device_uid, (element_uid, value))
 
-    def _multilevel_sync(self, message: dict[str, Any]) -> None:
+    def _multilevel_sync(self, event: PropertyChangedEvent) -> None:
         """Update multilevel sync settings."""
-        if type(message["properties"]["property.value.new"]) not in [dict, list]:
-            element_uid: str = message["properties"]["uid"]
-            value = message["properties"]["property.value.new"]
-            device_uid = get_device_uid_from_setting_uid(element_uid)
+        if type(event.value) not in [dict, list]:
+            element_uid: str = event.uid
+            value = event.value
+            device_uid = parse_uid(element_uid).device_uid
             device_model = self.devices[device_uid].device_model_uid
             self._logger.debug("Updating %s to %s.", element_uid, value)
-            sync_type = {
-                "devolo.model.Siren": "tone",
-                "devolo.model.OldShutter": "shutter_duration",
-                "devolo.model.Shutter": "shutter_duration",
-            }
-
             try:
-                setattr(self.devices[device_uid].settings_property[sync_type[device_model]], sync_type[device_model], value)
+                sync_type = _MULTILEVEL_SYNC_TYPES[device_model]
+                setattr(self.devices[device_uid].settings_property[sync_type], sync_type, value)
             except KeyError:
                 # Other devices are up to now always motion sensors.
                 self.devices[device_uid].settings_property["motion_sensitivity"].motion_sensitivity = value
 
             self._publisher.dispatch(device_uid, (element_uid, value))
 
-    def _parameter(self, message: dict[str, Any]) -> None:
+    def _parameter(self, event: PropertyChangedEvent) -> None:
         """Update parameter settings."""
-        if type(message["properties"].get("property.value.new")) not in [dict, list]:
-            element_uid: str = message["properties"]["uid"]
-            param_changed = message["properties"]["property.value.new"]
-            device_uid = get_device_uid_from_setting_uid(element_uid)
+        if type(event.value) not in [dict, list]:
+            element_uid: str = event.uid
+            param_changed = event.value
+            device_uid = parse_uid(element_uid).device_uid
             self.devices[device_uid].settings_property["param_changed"].param_changed = param_changed
             self._logger.debug("Updating %s to %s.", element_uid, param_changed)
             self._publisher.dispatch(device_uid, (element_uid, param_changed))
 
-    def _protection(self, message: dict[str, Any]) -> None:
+    def _protection(self, event: PropertyChangedEvent) -> None:
         """Update protection settings."""
-        if type(message["properties"].get("property.value.new")) not in [dict, list]:
-            element_uid: str = message["properties"]["uid"]
-            value = message["properties"]["property.value.new"]
-            name = message["properties"]["property.name"]
-            device_uid = get_device_uid_from_setting_uid(element_uid)
-            switching_type = {
-                "targetLocalSwitch": "local_switching",
-                "localSwitch": "local_switching",
-                "targetRemoteSwitch": "remote_switching",
-                "remoteSwitch": "remote_switching",
-            }
-
-            setattr(self.devices[device_uid].settings_property["protection"], switching_type[name], value)
-            self._logger.debug("Updating %s protection of %s to %s", switching_type[name], element_uid, value)
-            self._publisher.dispatch(device_uid, (element_uid, value, switching_type[name]))
-
-    def _remote_control(self, message: dict[str, Any]) -> None:
+        if type(event.value) not in [dict, list]:
+            element_uid: str = event.uid
+            value = event.value
+            name = event.property_name
+            device_uid = parse_uid(element_uid).device_uid
+            setattr(self.devices[device_uid].settings_property["protection"], _SWITCHING_TYPES[name], value)
+            self._logger.debug("Updating %s protection of %s to %s", _SWITCHING_TYPES[name], element_uid, value)
+            self._publisher.dispatch(device_uid, (element_uid, value, _SWITCHING_TYPES[name]))
+
+    def _remote_control(self, event: PropertyChangedEvent) -> None:
         """Update a remote control."""
-        element_uid: str = message["properties"]["uid"]
-        key_pressed = message["properties"]["property.value.new"]
+        element_uid: str = event.uid
+        key_pressed = event.value
 
         # The message for the diary needs to be ignored
         if key_pressed is not None:
-            device_uid = get_device_uid_from_element_uid(element_uid)
-            old_key_pressed = self.devices[device_uid].remote_control_property[element_uid].key_pressed
-            self.devices[device_uid].remote_control_property[element_uid].key_pressed = key_pressed
+            device_uid, remote_control = self._resolve(element_uid, "remote_control_property")
+            old_key_pressed = remote_control.key_pressed
+            remote_control.key_pressed = key_pressed
             self._logger.debug(
                 "Updating remote control of %s. Key %s",
                 element_uid,
@@ -364,71 +427,78 @@ class Updater:
             )
             self._publisher.dispatch(device_uid, (element_uid, key_pressed))
 
-    def _since_time(self, message: dict[str, Any]) -> None:
+    def _since_time(self, event: PropertyChangedEvent) -> None:
         """Update point in time the total consumption was reset."""
-        element_uid = message["uid"]
-        total_since = message["property.value.new"]
-        device_uid = get_device_uid_from_element_uid(element_uid)
-        self.devices[device_uid].consumption_property[element_uid].total_since = total_since
+        element_uid = event.uid
+        total_since = event.value
+        device_uid, consumption = self._resolve(element_uid, "consumption_property")
+        consumption.total_since = total_since
         self._logger.debug("Updating total since of %s to %s", element_uid, total_since)
         self._publisher.dispatch(device_uid, (element_uid, total_since, "total_since"))
 
-    def _switch_type(self, message: dict[str, Any]) -> None:
+    def _switch_type(self, event: PropertyChangedEvent) -> None:
         """Update switch type setting (sts)."""
-        element_uid: str = message["properties"]["uid"]
-        value = message["properties"]["property.value.new"] * 2  # FWR, value.new is 1 for 2 buttons and 2 for 4 buttons.
-        device_uid = get_device_uid_from_setting_uid(element_uid)
+        element_uid: str = event.uid
+        value = event.value * 2  # FWR, value.new is 1 for 2 buttons and 2 for 4 buttons.
+        device_uid = parse_uid(element_uid).device_uid
         self.devices[device_uid].settings_property["switch_type"].value = value
         self.devices[device_uid].remote_control_property[f"devolo.RemoteControl:{device_uid}"].key_count = value
         self._logger.debug("Updating switch type of %s to %s", device_uid, value)
         self._publisher.dispatch(device_uid, (element_uid, value))
 
-    def _temperature_report(self, message: dict[str, Any]) -> None:
+    def _temperature_report(self, event: PropertyChangedEvent) -> None:
         """Update temperature report settings."""
-        if type(message["properties"].get("property.value.new")) not in [dict, list]:
-            element_uid: str = message["properties"]["uid"]
-            value = message["properties"]["property.value.new"]
-            device_uid = get_device_uid_from_setting_uid(element_uid)
+        if type(event.value) not in [dict, list]:
+            element_uid: str = event.uid
+            value = event.value
+            device_uid = parse_uid(element_uid).device_uid
             self.devices[device_uid].settings_property["temperature_report"].temp_report = value
             self._logger.debug("Updating temperature report of %s to %s", element_uid, value)
             self._publisher.dispatch(device_uid, (element_uid, value))
 
-    def _total_consumption(self, message: dict[str, Any]) -> None:
+    def _total_consumption(self, event: PropertyChangedEvent) -> None:
         """Update total consumption."""
-        self._update_consumption(element_uid=message["uid"], consumption="total", value=message["property.value.new"])
+        self._update_consumption(element_uid=event.uid, consumption="total", value=event.value)
 
-    def _unknown(self, message: dict[str, Any]) -> None:
+    def _unknown(self, event: PropertyChangedEvent) -> None:
         """Ignore unknown messages."""
-        ignore = (
-            "devolo.DeviceEvents",
-            "devolo.PairDevice",
-            "devolo.SirenBinarySensor",
-            "devolo.SirenMultiLevelSensor",
-            "devolo.mprm.gw.GatewayManager",
-            "devolo.mprm.gw.PortalManager",
-            "ss",
-            "mcs",
-        )
-        if not message["properties"]["uid"].startswith(ignore):
-            self._logger.debug(json.dumps(message, indent=4))
+        if not event.uid.startswith(_IGNORED_UNKNOWN_UIDS) and self._logger.isEnabledFor(logging.DEBUG):
+            self._logger.debug(json_dumps(event.to_message(), pretty=True))
 
     def _update_automatic_calibration(self, element_uid: str, calibration_status: bool) -> None:
         """Update automatic calibration setting of a device."""
-        device_uid = get_device_uid_from_setting_uid(element_uid)
+        device_uid = parse_uid(element_uid).device_uid
         self.devices[device_uid].settings_property["automatic_calibration"].calibration_status = calibration_status
         self._logger.debug("Updating value of %s to %s", element_uid, calibration_status)
         self._publisher.dispatch(device_uid, (element_uid, calibration_status))
 
     def _update_consumption(self, element_uid: str, consumption: str, value: float) -> None:
         """Update the consumption of a device."""
-        device_uid = get_device_uid_from_element_uid(element_uid)
-        setattr(self.devices[device_uid].consumption_property[element_uid], consumption, value)
+        device_uid, consumption_property = self._resolve(element_uid, "consumption_property")
+        setattr(consumption_property, consumption, value)
         self._logger.debug("Updating %s consumption of %s to %s", consumption, element_uid, value)
         self._publisher.dispatch(device_uid, (element_uid, value, consumption))
 
+    def _resolve(self, element_uid: str, properties: str) -> tuple[str, Any]:
+        """
+        Get the device UID and the property object an element UID belongs to. Both are remembered for the next message.
+
+        :param element_uid: Element UID of the property
+        :param properties: Name of the device attribute holding the property, e.g. binary_switch_property
+        :return: Device UID and property object
+        """
+        route = self._routes.get(element_uid)
+        if route is not None and route.device_uid is not None:
+            return route.device_uid, route.element
+        device_uid = parse_uid(element_uid).device_uid
+        element = getattr(self.devices[device_uid], properties)[element_uid]
+        if route is not None:
+            route.device_uid, route.element = device_uid, element
+        return device_uid, element
+
     def _update_general_device_settings(self, element_uid: str, **kwargs: Any) -> None:
         """Update general device settings."""
-        device_uid = get_device_uid_from_setting_uid(element_uid)
+        device_uid = parse_uid(element_uid).device_uid
         for key, value in kwargs.items():
             setattr(self.devices[device_uid].settings_property["general_device_settings"], key, value)
             self._logger.debug("Updating attribute: %s of %s to %s", key, element_uid, value)
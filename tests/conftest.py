@@ -1,13 +1,16 @@
 """Configure tests."""
-from collections.abc import Generator
+from collections.abc import AsyncGenerator, Generator
 from socket import inet_aton
 from unittest.mock import patch
 
 import pytest
+import pytest_asyncio
+from aiohttp.test_utils import TestServer
 from requests_mock import Mocker
 from syrupy.assertion import SnapshotAssertion
 from zeroconf import ServiceInfo
 
+from devolo_home_control_api.async_homecontrol import AsyncHomeControl
 from devolo_home_control_api.homecontrol import HomeControl
 from devolo_home_control_api.mydevolo import Mydevolo
 
@@ -24,7 +27,25 @@ from . import (
     DifferentDirectoryExtension,
     load_fixture,
 )
-from .mocks import MockServiceBrowser, MockWebSocketApp
+from .mocks import MockGateway, MockServiceBrowser, MockWebSocketApp
+
+
+@pytest_asyncio.fixture
+async def async_local_gateway(
+    mydevolo: Mydevolo, gateway_id: str, mock_gateway: MockGateway
+) -> AsyncGenerator[AsyncHomeControl, None]:
+    """Emulate a local gateway connection using asyncio."""
+    server = TestServer(mock_gateway.app)
+    await server.start_server()
+
+    async def detect_gateway_in_lan(homecontrol: AsyncHomeControl) -> str:
+        homecontrol._local_ip = f"{server.host}:{server.port}"  # noqa: SLF001
+        return homecontrol._local_ip  # noqa: SLF001
+
+    with patch.object(AsyncHomeControl, "async_detect_gateway_in_lan", detect_gateway_in_lan):
+        async with AsyncHomeControl(gateway_id, mydevolo) as homecontrol:
+            yield homecontrol
+    await server.close()
 
 
 @pytest.fixture(autouse=True)
@@ -66,9 +87,17 @@ def gateway_ip() -> str:
 
 @pytest.fixture
 def local_gateway(
-    mydevolo: Mydevolo, gateway_id: str, gateway_ip: str, requests_mock: Mocker
+    mydevolo: Mydevolo, gateway_id: str, local_gateway_api: None  # noqa: ARG001
 ) -> Generator[HomeControl, None, None]:
     """Emulate a local gateway connection."""
+    homecontrol = HomeControl(gateway_id, mydevolo)
+    yield homecontrol
+    homecontrol.websocket_disconnect("Test finished.")
+
+
+@pytest.fixture
+def local_gateway_api(gateway_ip: str, requests_mock: Mocker) -> None:
+    """Emulate the API of a gateway in the LAN."""
     connection = load_fixture("homecontrol_local_session")
     connection["link"] = f"http://{gateway_ip}/dhlp/portal/full/?token=54e8c82fc921ee7e&"
     requests_mock.get(f"http://{gateway_ip}/dhlp/port/full")
@@ -83,9 +112,12 @@ def local_gateway(
             {"json": load_fixture("homecontrol_device_details")},
         ],
     )
-    homecontrol = HomeControl(gateway_id, mydevolo)
-    yield homecontrol
-    homecontrol.websocket_disconnect("Test finished.")
+
+
+@pytest.fixture
+def mock_gateway() -> MockGateway:
+    """Emulate a gateway in the LAN."""
+    return MockGateway()
 
 
 @pytest.fixture
@@ -1,5 +1,6 @@
 """Mocks used while testing."""
+from .mock_gateway import MockGateway
 from .mock_websocket import WEBSOCKET, MockWebSocketApp
 from .mock_zeroconf import MockServiceBrowser
 
-__all__ = ["WEBSOCKET", "MockServiceBrowser", "MockWebSocketApp"]
+__all__ = ["WEBSOCKET", "MockGateway", "MockServiceBrowser", "MockWebSocketApp"]
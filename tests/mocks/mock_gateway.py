@@ -0,0 +1,85 @@
+"""Mock a devolo Home Control Central Unit in the LAN."""
+from __future__ import annotations
+
+import asyncio
+from copy import deepcopy
+from typing import Any
+
+from aiohttp import web
+
+from devolo_home_control_api.helper import get_device_uid_from_setting_uid
+
+from tests import load_fixture
+
+
+class MockGateway:
+    """Mock of the HTTP and websocket interface of a devolo Home Control Central Unit."""
+
+    def __init__(self) -> None:
+        """Initialize the gateway."""
+        devices = deepcopy(load_fixture("homecontrol_devices")["result"]["items"])
+        for device in devices:
+            # Some devices of the fixture refer to settings of other devices. A real gateway refers to the own settings.
+            device["properties"]["settingUIDs"] = [
+                uid.replace(get_device_uid_from_setting_uid(uid), device["UID"]) for uid in device["properties"]["settingUIDs"]
+            ]
+        self.items: dict[str, dict[str, Any]] = {
+            item["UID"]: item for item in devices + load_fixture("homecontrol_device_details")["result"]["items"]
+        }
+        self.requests: list[dict[str, Any]] = []
+        self.websockets: list[web.WebSocketResponse] = []
+        self.app = web.Application()
+        self.app.router.add_get("/dhlp/portal/full", self._portal)
+        self.app.router.add_get("/dhlp/portal/full/", self._token)
+        self.app.router.add_post("/remote/json-rpc", self._json_rpc)
+        self.app.router.add_get("/remote/events/", self._events)
+
+    async def close_websocket(self) -> None:
+        """Close the websocket from the gateway's side."""
+        await self.websockets[-1].close()
+
+    async def send(self, message: dict[str, Any]) -> None:
+        """Send a message via websocket and give the client a chance to process it."""
+        await self.websockets[-1].send_json(message)
+        await asyncio.sleep(0.1)
+
+    async def _events(self, request: web.Request) -> web.WebSocketResponse:
+        """Handle websocket connections."""
+        websocket = web.WebSocketResponse()
+        await websocket.prepare(request)
+        self.websockets.append(websocket)
+        async for _ in websocket:
+            pass
+        return websocket
+
+    async def _json_rpc(self, request: web.Request) -> web.Response:
+        """Answer JSON-RPC calls."""
+        data = await request.json()
+        self.requests.append(data)
+        if isinstance(data, list):
+            return web.json_response([self._answer(call) for call in data])
+        return web.json_response(self._answer(data))
+
+    def _answer(self, data: dict[str, Any]) -> dict[str, Any]:
+        """Answer a single JSON-RPC call."""
+        if data["method"] == "FIM/invokeOperation":
+            return {"jsonrpc": "2.0", "id": data["id"], "result": {"status": 1}}
+
+        uids = data["params"][0]
+        if uids == ["devolo.Grouping"]:
+            result = load_fixture("homecontrol_zones")["result"]
+        elif uids == ["devolo.DevicesPage"]:
+            result = load_fixture("homecontrol_device_page")["result"]
+        else:
+            result = {"items": [self.items[uid] for uid in uids if uid in self.items]}
+        return {"jsonrpc": "2.0", "id": data["id"], "result": result}
+
+    async def _portal(self, request: web.Request) -> web.Response:
+        """Hand out a token URL."""
+        return web.json_response({"link": f"http://{request.host}/dhlp/portal/full/?token=54e8c82fc921ee7e&", "code": 200})
+
+    async def _token(self, _: web.Request) -> web.Response:
+        """Accept the token."""
+        response = web.Response()
+        response.set_cookie("JSESSIONID", "8D4B8A4E0A2D4F5B")
+        return response
@@ -0,0 +1,122 @@
+"""Test the Home Control setup using asyncio."""
+import asyncio
+from typing import Any
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from aiohttp.test_utils import TestServer
+
+from devolo_home_control_api.async_homecontrol import AsyncHomeControl
+from devolo_home_control_api.backend.async_mprm import AsyncMprm
+from devolo_home_control_api.mydevolo import Mydevolo
+
+from . import Subscriber, load_fixture
+from .mocks import MockGateway
+
+ELEMENT_ID = "hdm:ZWave:CBC56091/2"
+FIXTURE = load_fixture("homecontrol_binary_switch")
+
+
+@pytest.mark.asyncio
+async def test_setup_local(async_local_gateway: AsyncHomeControl) -> None:
+    """Test setting up locally."""
+    assert async_local_gateway.gateway.local_connection
+    assert async_local_gateway.gateway.home_id == "CBC56091"
+    assert len(async_local_gateway.devices) == len(load_fixture("homecontrol_devices")["result"]["items"])
+    assert async_local_gateway.binary_switch_devices
+
+
+@pytest.mark.asyncio
+async def test_detect_gateway_gone(async_local_gateway: AsyncHomeControl) -> None:
+    """Test not keeping the last local IP, if the gateway is not found in the LAN anymore."""
+    with patch("devolo_home_control_api.backend.async_mprm.AsyncZeroconf", return_value=AsyncMock()), patch(
+        "devolo_home_control_api.backend.async_mprm.AsyncServiceBrowser", return_value=AsyncMock()
+    ):
+        assert await AsyncMprm.async_detect_gateway_in_lan(async_local_gateway) == ""
+
+
+@pytest.mark.asyncio
+async def test_enrichment(async_local_gateway: AsyncHomeControl) -> None:
+    """Test waiting for Z-Wave product information."""
+    await asyncio.wait_for(asyncio.wrap_future(async_local_gateway.enrichment), timeout=5)
+    assert all(hasattr(device, "brand") for device in async_local_gateway.devices.values())
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("options", [{"chunk_size": 10}, {"chunk_size": 10, "streaming": True}])
+async def test_setup_chunked(mydevolo: Mydevolo, gateway_id: str, mock_gateway: MockGateway, options: dict[str, Any]) -> None:
+    """Test asking for functional items in chunks."""
+    server = TestServer(mock_gateway.app)
+    await server.start_server()
+    homecontrol = AsyncHomeControl(gateway_id, mydevolo, **options)
+    with patch.object(homecontrol, "async_detect_gateway_in_lan", AsyncMock(return_value=f"{server.host}:{server.port}")):
+        homecontrol._local_ip = f"{server.host}:{server.port}"  # noqa: SLF001
+        async with homecontrol:
+            assert all(len(request["params"][0]) <= 10 for request in mock_gateway.requests if "params" in request)
+            assert homecontrol.binary_switch_devices
+            assert all("general_device_settings" in device.settings_property for device in homecontrol.devices.values())
+    await server.close()
+
+
+@pytest.mark.asyncio
+async def test_state_change(async_local_gateway: AsyncHomeControl, mock_gateway: MockGateway) -> None:
+    """Test state change of a binary switch."""
+    subscriber = Subscriber(ELEMENT_ID)
+    async_local_gateway.publisher.register(ELEMENT_ID, subscriber)
+    binary_switch = async_local_gateway.devices[ELEMENT_ID].binary_switch_property[f"devolo.BinarySwitch:{ELEMENT_ID}"]
+    binary_switch.state = True
+    await mock_gateway.send(FIXTURE["switch_event"])
+    assert not binary_switch.state
+    subscriber.update.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_switching(async_local_gateway: AsyncHomeControl) -> None:
+    """Test switching a binary switch."""
+    binary_switch = async_local_gateway.devices[ELEMENT_ID].binary_switch_property[f"devolo.BinarySwitch:{ELEMENT_ID}"]
+    assert await async_local_gateway.async_set_binary_switch(binary_switch.element_uid, state=True)
+
+    state = binary_switch.state
+    assert await asyncio.get_running_loop().run_in_executor(None, binary_switch.set, not state)
+    assert state != binary_switch.state
+
+    with pytest.raises(RuntimeError):
+        binary_switch.set(state=state)
+
+
+@pytest.mark.asyncio
+async def test_batch(async_local_gateway: AsyncHomeControl, mock_gateway: MockGateway) -> None:
+    """Test sending multiple calls in one request."""
+    uids = [uid for device in async_local_gateway.binary_switch_devices for uid in device.binary_switch_property]
+    async with async_local_gateway.async_batch() as batch:
+        futures = [batch.set_binary_switch(uid, state=True) for uid in uids]
+    assert len(mock_gateway.requests[-1]) == len(uids)
+    assert all(future.result() for future in futures)
+
+
+@pytest.mark.asyncio
+async def test_device_added(async_local_gateway: AsyncHomeControl, mock_gateway: MockGateway) -> None:
+    """Test handling an added device."""
+    fixture = load_fixture("homecontrol_device_new")
+    device_uid = fixture["properties"]["property.value.new"][-1]
+    with patch.object(AsyncHomeControl, "_async_inspect_devices", new_callable=AsyncMock) as inspect_devices:
+        await mock_gateway.send(fixture)
+        inspect_devices.assert_called_once_with([device_uid])
+    assert not async_local_gateway._added_device  # noqa: SLF001
+
+
+@pytest.mark.asyncio
+async def test_device_deleted(async_local_gateway: AsyncHomeControl, mock_gateway: MockGateway) -> None:
+    """Test handling an deleted device."""
+    fixture = load_fixture("homecontrol_device_del")
+    await mock_gateway.send(fixture)
+    assert len(async_local_gateway.devices) == len(fixture["properties"]["property.value.new"])
+
+
+@pytest.mark.asyncio
+async def test_websocket_breakdown(async_local_gateway: AsyncHomeControl, mock_gateway: MockGateway) -> None:
+    """Test reconnect behavior on websocket breakdown."""
+    await mock_gateway.close_websocket()
+    await asyncio.sleep(0.1)
+    assert len(mock_gateway.websockets) == 2
+    assert async_local_gateway._connected  # noqa: SLF001
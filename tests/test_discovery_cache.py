@@ -0,0 +1,62 @@
+"""Test remembering local IP addresses of gateways."""
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+import requests
+from requests_mock import Mocker
+
+from devolo_home_control_api.backend.discovery_cache import DiscoveryCache
+from devolo_home_control_api.backend.mprm import GatewayBrowser
+from devolo_home_control_api.homecontrol import HomeControl
+from devolo_home_control_api.mydevolo import Mydevolo
+
+
+def test_update(tmp_path: Path, gateway_id: str, gateway_ip: str) -> None:
+    """Test remembering and forgetting a local IP address."""
+    discovery_cache = DiscoveryCache(tmp_path / "discovery.json")
+    assert discovery_cache.get(gateway_id) == ""
+
+    discovery_cache.update(gateway_id, gateway_ip)
+    assert DiscoveryCache(tmp_path / "discovery.json").get(gateway_id) == gateway_ip
+
+    discovery_cache.update(gateway_id, "")
+    assert discovery_cache.get(gateway_id) == ""
+
+
+def test_broken_file(tmp_path: Path, gateway_id: str, gateway_ip: str) -> None:
+    """Test ignoring a broken cache file."""
+    path = tmp_path / "discovery.json"
+    path.write_text("{", encoding="utf-8")
+    discovery_cache = DiscoveryCache(path)
+    assert discovery_cache.get(gateway_id) == ""
+
+    discovery_cache.update(gateway_id, gateway_ip)
+    assert discovery_cache.get(gateway_id) == gateway_ip
+
+
+@pytest.mark.usefixtures("local_gateway_api")
+def test_setup_with_cached_ip(mydevolo: Mydevolo, gateway_id: str, gateway_ip: str, tmp_path: Path) -> None:
+    """Test skipping mDNS, if the cached IP address still belongs to the gateway."""
+    discovery_cache = DiscoveryCache(tmp_path / "discovery.json")
+    discovery_cache.update(gateway_id, gateway_ip)
+    with patch.object(GatewayBrowser, "register") as register:
+        homecontrol = HomeControl(gateway_id, mydevolo, discovery_cache=discovery_cache)
+        register.assert_not_called()
+    assert homecontrol.gateway.local_connection
+    homecontrol.websocket_disconnect("Test finished.")
+
+
+@pytest.mark.usefixtures("local_gateway_api")
+def test_setup_with_outdated_ip(
+    mydevolo: Mydevolo, gateway_id: str, gateway_ip: str, tmp_path: Path, requests_mock: Mocker
+) -> None:
+    """Test falling back to mDNS, if the cached IP address is outdated."""
+    outdated_ip = "192.0.2.2"
+    requests_mock.get(f"http://{outdated_ip}/dhlp/port/full", exc=requests.exceptions.ConnectTimeout)
+    discovery_cache = DiscoveryCache(tmp_path / "discovery.json")
+    discovery_cache.update(gateway_id, outdated_ip)
+    homecontrol = HomeControl(gateway_id, mydevolo, discovery_cache=discovery_cache)
+    assert homecontrol.gateway.local_connection
+    assert discovery_cache.get(gateway_id) == gateway_ip
+    homecontrol.websocket_disconnect("Test finished.")
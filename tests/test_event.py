@@ -0,0 +1,44 @@
+"""Test decoding websocket messages into events."""
+from devolo_home_control_api.backend import PropertyChangedEvent
+from devolo_home_control_api.homecontrol import HomeControl
+
+from . import Subscriber, load_fixture
+
+
+def test_from_message() -> None:
+    """Test decoding a property change."""
+    message = load_fixture("homecontrol_binary_switch")["current_event"]
+    event = PropertyChangedEvent.from_message(message)
+    assert event.uid == "devolo.Meter:hdm:ZWave:CBC56091/2"
+    assert event.property_name == "currentValue"
+    assert event.value == 20
+    assert event.sequence_number == 0
+    assert event.item_id is None
+    assert event.topic == message["topic"]
+    assert event.to_message() == message
+    assert "currentValue" in repr(event)
+    assert not hasattr(event, "__dict__")
+
+
+def test_from_incomplete_message() -> None:
+    """Test decoding a message without properties."""
+    event = PropertyChangedEvent.from_message({"topic": "com/prosyst/mbs/services/fim/FunctionalItemEvent/UNREGISTERED"})
+    assert event.uid == ""
+    assert event.property_name == ""
+    assert event.value is None
+    assert event.sequence_number is None
+
+
+def test_update_with_event(local_gateway: HomeControl) -> None:
+    """Test passing decoded events and raw messages to the updater."""
+    message = load_fixture("homecontrol_binary_switch")["current_event"]
+    device_uid = "hdm:ZWave:CBC56091/2"
+    subscriber = Subscriber(device_uid)
+    local_gateway.publisher.register(device_uid, subscriber)
+
+    local_gateway.updater.update(PropertyChangedEvent.from_message(message))
+    subscriber.update.assert_called_once_with(("devolo.Meter:hdm:ZWave:CBC56091/2", 20, "current"))
+
+    subscriber.update.reset_mock()
+    local_gateway.updater.update(message)
+    subscriber.update.assert_called_once_with(("devolo.Meter:hdm:ZWave:CBC56091/2", 20, "current"))
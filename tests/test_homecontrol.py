@@ -1,15 +1,22 @@
 """Test the Home Control setup."""
 import json
 import sys
+import time
 from http import HTTPStatus
-from unittest.mock import patch
+from socket import inet_aton
+from threading import Event, Lock
+from typing import Any
+from unittest.mock import Mock, patch
 
 import pytest
 import requests
 from dateutil import tz
 from requests_mock import Mocker
 from syrupy.assertion import SnapshotAssertion
+from zeroconf import ServiceInfo
 
+from devolo_home_control_api.backend import ConnectionState
+from devolo_home_control_api.devices import Zwave
 from devolo_home_control_api.exceptions import GatewayOfflineError
 from devolo_home_control_api.homecontrol import HomeControl
 from devolo_home_control_api.mydevolo import Mydevolo
@@ -25,7 +32,7 @@ from . import (
     Subscriber,
     load_fixture,
 )
-from .mocks import WEBSOCKET
+from .mocks import WEBSOCKET, MockGateway
 
 
 @pytest.mark.skipif(sys.version_info < (3, 8), reason="Tests with snapshots need at least Python 3.8")
@@ -60,6 +67,38 @@ def test_setup_local_gateway_offline(mydevolo: Mydevolo, gateway_id: str, gatewa
         HomeControl(gateway_id, mydevolo)
 
 
+@pytest.mark.usefixtures("local_gateway_api")
+def test_setup_local_multiple_addresses(mydevolo: Mydevolo, gateway_id: str, gateway_ip: str, requests_mock: Mocker) -> None:
+    """Test finding the gateway, if it announces addresses, that are not reachable."""
+    unreachable_ip = "192.0.2.2"
+    requests_mock.get(f"http://{unreachable_ip}/dhlp/port/full", exc=requests.exceptions.ConnectTimeout)
+    service_info = ServiceInfo(
+        type_="_dvl-deviceapi._tcp.local.",
+        name="dvl-deviceapi._dvl-deviceapi._tcp.local.",
+        server="devolo-homecontrol.local.",
+        addresses=[inet_aton(unreachable_ip), inet_aton(gateway_ip)],
+    )
+    with patch("devolo_home_control_api.backend.mprm.Zeroconf.get_service_info", return_value=service_info):
+        homecontrol = HomeControl(gateway_id, mydevolo)
+    assert homecontrol.gateway.local_connection
+    assert homecontrol._local_ip == gateway_ip  # noqa: SLF001
+    homecontrol.websocket_disconnect("Test finished.")
+
+
+def test_detect_new_ip(local_gateway: HomeControl, requests_mock: Mocker) -> None:
+    """Test detecting the gateway again, after it got a new IP address."""
+    new_ip = "192.0.2.3"
+    requests_mock.get(f"http://{new_ip}/dhlp/port/full")
+    service_info = ServiceInfo(
+        type_="_dvl-deviceapi._tcp.local.",
+        name="dvl-deviceapi._dvl-deviceapi._tcp.local.",
+        server="devolo-homecontrol.local.",
+        addresses=[inet_aton(new_ip)],
+    )
+    with patch("devolo_home_control_api.backend.mprm.Zeroconf.get_service_info", return_value=service_info):
+        assert local_gateway.detect_gateway_in_lan() == new_ip
+
+
 @pytest.mark.skipif(sys.version_info < (3, 8), reason="Tests with snapshots need at least Python 3.8")
 @pytest.mark.freeze_time("2023-04-28T08:00:00")
 def test_setup_remote(remote_gateway: HomeControl, snapshot: SnapshotAssertion) -> None:
@@ -91,6 +130,270 @@ def test_setup_remote_external_access(mydevolo: Mydevolo, gateway_id: str) -> No
         HomeControl(gateway_id, mydevolo)
 
 
+def test_snapshot(local_gateway: HomeControl) -> None:
+    """Test taking a snapshot, that can be serialized."""
+    snapshot = json.loads(json.dumps(local_gateway.snapshot()))
+    assert snapshot["gateway_id"] == local_gateway.gateway.id
+    assert snapshot["zones"] == local_gateway.gateway.zones
+    assert [device["UID"] for device in snapshot["devices"]] == list(local_gateway.devices)
+
+
+def test_from_snapshot(local_gateway: HomeControl, mydevolo: Mydevolo, gateway_ip: str, requests_mock: Mocker) -> None:
+    """Test restoring from a snapshot and reconciling with the gateway in the background."""
+    device_uid = "hdm:ZWave:CBC56091/2"
+    element_uid = f"devolo.BinarySwitch:{device_uid}"
+    snapshot = local_gateway.snapshot()
+    local_gateway.websocket_disconnect("Snapshot taken.")
+    next(item for item in snapshot["properties"] if item["UID"] == element_uid)["properties"]["state"] = 1
+    requests_mock.post(
+        f"http://{gateway_ip}/remote/json-rpc",
+        [
+            {"json": load_fixture("homecontrol_zones")},
+            {"json": load_fixture("homecontrol_device_page")},
+            {"json": load_fixture("homecontrol_devices")},
+            {"json": load_fixture("homecontrol_device_details")},
+        ],
+    )
+
+    reconcile = Event()
+    detect_gateway_in_lan = HomeControl.detect_gateway_in_lan
+
+    def wait_for_reconcile(homecontrol: HomeControl) -> str:
+        reconcile.wait()
+        return detect_gateway_in_lan(homecontrol)
+
+    with patch.object(HomeControl, "detect_gateway_in_lan", wait_for_reconcile):
+        homecontrol = HomeControl.from_snapshot(snapshot, mydevolo)
+        assert list(homecontrol.devices) == list(local_gateway.devices)
+        binary_switch = homecontrol.devices[device_uid].binary_switch_property[element_uid]
+        assert binary_switch.state
+
+        subscriber = Subscriber(device_uid)
+        homecontrol.publisher.register(device_uid, subscriber)
+        reconcile.set()
+        homecontrol.wait_for_websocket_establishment()
+
+    assert not binary_switch.state
+    subscriber.update.assert_called_once_with((element_uid, False))
+    homecontrol.websocket_disconnect("Test finished.")
+
+
+def test_resync(local_gateway: HomeControl, gateway_ip: str, requests_mock: Mocker) -> None:
+    """Test bringing devices and properties up to date and publishing only changes."""
+    device_uid = "hdm:ZWave:CBC56091/2"
+    element_uid = f"devolo.BinarySwitch:{device_uid}"
+    meter_uid = f"devolo.Meter:{device_uid}"
+    binary_switch = local_gateway.devices[device_uid].binary_switch_property[element_uid]
+    binary_switch.state = True
+    consumption = local_gateway.devices[device_uid].consumption_property[meter_uid]
+    consumption.current = 0.0
+    last_activity = consumption.last_activity
+    general_device_settings = local_gateway.devices[device_uid].settings_property["general_device_settings"]
+    general_device_settings.name = "Old name"
+    local_gateway.devices[device_uid].pending_operations = True
+    requests_mock.post(
+        f"http://{gateway_ip}/remote/json-rpc",
+        [
+            {"json": {**load_fixture(fixture), "id": data_id}}
+            for data_id, fixture in enumerate(
+                ("homecontrol_device_page", "homecontrol_devices", "homecontrol_device_details"), 5
+            )
+        ],
+    )
+    subscriber = Subscriber(device_uid)
+    local_gateway.publisher.register_all(subscriber)
+    local_gateway.resync()
+    assert not binary_switch.state
+    assert consumption.current == 10
+    assert consumption.last_activity > last_activity
+    assert general_device_settings.name == "Light Bulb"
+    assert not local_gateway.devices[device_uid].pending_operations
+    assert [call.args[0] for call in subscriber.update.call_args_list] == [
+        ("pending_operations", False),
+        ("events_enabled", True),
+        ("icon", "light-bulb"),
+        ("name", "Light Bulb"),
+        ("zone_id", "hz_1"),
+        ("zones", local_gateway.gateway.zones),
+        (meter_uid, 10, "current"),
+        (element_uid, False),
+    ]
+
+
+def test_from_snapshot_gateway_offline(local_gateway: HomeControl, mydevolo: Mydevolo) -> None:
+    """Test reconnecting later on, if the gateway cannot be reached while reconciling a snapshot."""
+    snapshot = local_gateway.snapshot()
+    local_gateway.websocket_disconnect("Snapshot taken.")
+    with patch.object(HomeControl, "create_connection", side_effect=GatewayOfflineError), patch(
+        "devolo_home_control_api.backend.mprm_websocket._RECONNECT_INTERVAL", 0
+    ), patch("devolo_home_control_api.backend.mprm_websocket.MprmWebsocket._schedule_resync") as schedule_resync:
+        homecontrol = HomeControl.from_snapshot(snapshot, mydevolo)
+        homecontrol.wait_for_websocket_establishment()
+        assert homecontrol.connection_state is ConnectionState.CONNECTED
+        schedule_resync.assert_called_once()
+    homecontrol.websocket_disconnect("Test finished.")
+
+
+@pytest.mark.usefixtures("local_gateway_api")
+def test_enrichment(mydevolo: Mydevolo, gateway_id: str) -> None:
+    """Test getting Z-Wave product information with bounded concurrency."""
+    lock = Lock()
+    running = []
+    concurrency = []
+
+    def get_zwave_info(*_: Any) -> dict[str, Any]:
+        with lock:
+            running.append(None)
+            concurrency.append(len(running))
+        time.sleep(0.01)
+        with lock:
+            running.pop()
+        return {}
+
+    on_enrichment_complete = Mock()
+    with patch.object(Zwave, "get_zwave_info", side_effect=get_zwave_info) as get:
+        homecontrol = HomeControl(gateway_id, mydevolo, enrichment_workers=2, on_enrichment_complete=on_enrichment_complete)
+        duration = homecontrol.enrichment.result(timeout=5)
+        assert get.call_count == len(homecontrol.devices)
+    assert max(concurrency) <= 2
+    on_enrichment_complete.assert_called_once_with(duration)
+    homecontrol.websocket_disconnect("Test finished.")
+
+
+@pytest.mark.usefixtures("local_gateway_api")
+def test_enrichment_cancelled(mydevolo: Mydevolo, gateway_id: str) -> None:
+    """Test cancelling pending Z-Wave product information on disconnecting and getting it again after reconnecting."""
+    answer = Event()
+    with patch.object(Zwave, "get_zwave_info", side_effect=lambda *_: answer.wait(5) and {}):
+        homecontrol = HomeControl(gateway_id, mydevolo, enrichment_workers=1)
+        homecontrol.websocket_disconnect("Test finished.")
+        answer.set()
+    assert homecontrol.enrichment.cancelled()
+    assert homecontrol.prefetch_zwave_info().cancelled()
+
+    with patch.object(HomeControl, "_connect"):
+        homecontrol.websocket_connect()
+    homecontrol.prefetch_zwave_info().result(timeout=5)
+    homecontrol.websocket_disconnect("Test finished.")
+
+
+@pytest.mark.usefixtures("local_gateway_api")
+def test_lazy_zwave_info(mydevolo: Mydevolo, gateway_id: str) -> None:
+    """Test getting Z-Wave product information not before they are read."""
+    with patch.object(mydevolo, "get_zwave_products", wraps=mydevolo.get_zwave_products) as get_zwave_products:
+        homecontrol = HomeControl(gateway_id, mydevolo, lazy_zwave_info=True)
+        get_zwave_products.assert_not_called()
+        assert not homecontrol.enrichment.done()
+
+        device = next(iter(homecontrol.devices.values()))
+        assert device.brand
+        assert device.zwave_version
+        get_zwave_products.assert_called_once()
+        assert len(homecontrol.snapshot()["zwave_products"]) == 1
+
+        homecontrol.prefetch_zwave_info().result(timeout=5)
+        assert all("brand" in vars(device) for device in homecontrol.devices.values())
+    homecontrol.websocket_disconnect("Test finished.")
+
+
+@pytest.mark.usefixtures("local_gateway_api")
+def test_lazy_zwave_info_failed(mydevolo: Mydevolo, gateway_id: str) -> None:
+    """Test not asking my devolo again for Z-Wave product information, that could not be got lazily."""
+    with patch.object(mydevolo, "get_zwave_products", side_effect=requests.exceptions.ConnectionError) as get_zwave_products:
+        homecontrol = HomeControl(gateway_id, mydevolo, lazy_zwave_info=True)
+        device = next(iter(homecontrol.devices.values()))
+        assert device.brand is None
+        assert device.zwave_version is None
+        get_zwave_products.assert_called_once()
+    homecontrol.websocket_disconnect("Test finished.")
+
+
+def test_batch(local_gateway: HomeControl, gateway_ip: str, requests_mock: Mocker) -> None:
+    """Test sending multiple calls in one request."""
+
+    def answer(request: requests.PreparedRequest, _: Any) -> list[dict[str, Any]]:
+        # Leave out the answer to the first call
+        return [
+            {"jsonrpc": "2.0", "id": call["id"], "result": {"status": 1, "items": []}}
+            for call in json.loads(request.body or "")[1:]
+        ]
+
+    requests_mock.post(f"http://{gateway_ip}/remote/json-rpc", json=answer)
+    uids = [uid for device in local_gateway.binary_switch_devices for uid in device.binary_switch_property]
+    call_count = requests_mock.call_count
+    with local_gateway.batch() as batch:
+        first, *others = [batch.set_binary_switch(uid, state=True) for uid in uids]
+        data = batch.get_data_from_uid_list(uids)
+    assert requests_mock.call_count == call_count + 1
+    assert len(requests_mock.last_request.json()) == len(uids) + 1
+    with pytest.raises(ValueError):
+        first.result()
+    assert all(future.result() for future in others)
+    assert data.result() == []
+
+
+@pytest.mark.usefixtures("local_gateway_api")
+def test_setup_chunked(
+    mydevolo: Mydevolo, gateway_id: str, gateway_ip: str, requests_mock: Mocker, mock_gateway: MockGateway
+) -> None:
+    """Test asking for functional items in chunks."""
+    responses = [load_fixture("homecontrol_zones"), load_fixture("homecontrol_device_page")]
+    items = mock_gateway.items
+
+    def answer(request: requests.PreparedRequest, _: Any) -> dict[str, Any]:
+        data = json.loads(request.body or "")
+        if data["id"] <= len(responses):
+            return {**responses[data["id"] - 1], "id": data["id"]}
+        return {
+            "jsonrpc": "2.0",
+            "id": data["id"],
+            "result": {"items": [items[uid] for uid in data["params"][0] if uid in items]},
+        }
+
+    requests_mock.post(f"http://{gateway_ip}/remote/json-rpc", json=answer)
+    homecontrol = HomeControl(gateway_id, mydevolo, chunk_size=10)
+    calls = [
+        request.json()["params"][0]
+        for request in requests_mock.request_history
+        if request.url == f"http://{gateway_ip}/remote/json-rpc"
+    ]
+    assert len(calls) > len(responses) + 1
+    assert all(len(call) <= 10 for call in calls)
+    assert len(homecontrol.devices) == len(load_fixture("homecontrol_devices")["result"]["items"])
+    homecontrol.websocket_disconnect("Test finished.")
+
+
+def test_stream_error(local_gateway: HomeControl, gateway_ip: str, requests_mock: Mocker) -> None:
+    """Test failing on an error response, while streaming functional items."""
+
+    def answer(request: requests.PreparedRequest, _: Any) -> dict[str, Any]:
+        return {"jsonrpc": "2.0", "id": json.loads(request.body or "")["id"], "error": {"code": -32603, "message": "Error"}}
+
+    requests_mock.post(f"http://{gateway_ip}/remote/json-rpc", json=answer)
+    with pytest.raises(ValueError):
+        list(local_gateway.stream_data_from_uid_list(list(local_gateway.devices)))
+
+
+@pytest.mark.usefixtures("local_gateway_api")
+def test_setup_streaming(mydevolo: Mydevolo, gateway_id: str) -> None:
+    """Test handling functional items, while they are still arriving."""
+    homecontrol = HomeControl(gateway_id, mydevolo, streaming=True)
+    assert len(homecontrol.devices) == len(load_fixture("homecontrol_devices")["result"]["items"])
+    assert homecontrol.binary_switch_devices
+    assert homecontrol._items.keys() == homecontrol.devices.keys()  # noqa: SLF001
+    with pytest.raises(RuntimeError):
+        homecontrol.snapshot()
+    homecontrol.websocket_disconnect("Test finished.")
+
+
+@pytest.mark.usefixtures("local_gateway_api")
+def test_setup_streaming_keep_items(mydevolo: Mydevolo, gateway_id: str) -> None:
+    """Test taking a snapshot in streaming mode."""
+    homecontrol = HomeControl(gateway_id, mydevolo, streaming=True, keep_items=True)
+    assert homecontrol.snapshot()["properties"]
+    homecontrol.websocket_disconnect("Test finished.")
+
+
 def test_timezone_with_location(local_gateway: HomeControl) -> None:
     """Test getting the gateway's timezone, if a location is set."""
     assert local_gateway.gateway.timezone == tz.gettz("Europe/Berlin")
@@ -168,6 +471,23 @@ def test_device_deleted(local_gateway: HomeControl) -> None:
     assert len(local_gateway.devices) == len(fixture["properties"]["property.value.new"])
 
 
+def test_device_deleted_forgets_routes(local_gateway: HomeControl) -> None:
+    """Test not updating properties of a deleted device any longer."""
+    device_uid = "hdm:ZWave:CBC56091/9"
+    message = load_fixture("homecontrol_blinds")["movement_event"]
+    blinds = local_gateway.devices[device_uid].multi_level_switch_property[message["properties"]["uid"]]
+    subscriber = Subscriber(device_uid)
+    local_gateway.publisher.register(device_uid, subscriber)
+    local_gateway.updater.update(message)
+    assert blinds.value == message["properties"]["property.value.new"]
+
+    WEBSOCKET.recv_packet(json.dumps(load_fixture("homecontrol_device_del")))
+    subscriber.update.reset_mock()
+    local_gateway.updater.update({**message, "properties": {**message["properties"], "property.value.new": 0}})
+    assert blinds.value != 0
+    subscriber.update.assert_not_called()
+
+
 @pytest.mark.parametrize(
     "useless", ["devolo.HttpRequest", "devolo.PairDevice", "devolo.RemoveDevice", "devolo.mprm.gw.GatewayManager"]
 )
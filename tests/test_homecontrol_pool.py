@@ -0,0 +1,67 @@
+"""Test setting up multiple Home Control setups."""
+from socket import inet_aton
+from unittest.mock import Mock, patch
+
+import pytest
+import requests
+from requests_mock import Mocker
+from zeroconf import ServiceInfo
+
+from devolo_home_control_api.backend.mprm import GatewayBrowser
+from devolo_home_control_api.homecontrol_pool import HomeControlPool
+from devolo_home_control_api.mydevolo import Mydevolo
+
+from .mocks import MockServiceBrowser
+
+
+@pytest.mark.usefixtures("local_gateway_api")
+def test_setup(mydevolo: Mydevolo, gateway_id: str) -> None:
+    """Test setting up all gateways of an account."""
+    pool = HomeControlPool(mydevolo)
+    assert len(pool) == 1
+    assert pool[gateway_id].gateway.local_connection
+    pool.websocket_disconnect("Test finished.")
+
+
+@pytest.mark.usefixtures("local_gateway_api")
+def test_setup_gateway_offline(mydevolo: Mydevolo, gateway_id: str, gateway_ip: str, requests_mock: Mocker) -> None:
+    """Test leaving out gateways, that are offline."""
+    requests_mock.get(f"http://{gateway_ip}/dhlp/portal/full", exc=requests.exceptions.ConnectionError)
+    pool = HomeControlPool(mydevolo, gateway_ids=[gateway_id])
+    assert len(pool) == 0
+
+
+def test_setup_without_gateways(mydevolo: Mydevolo) -> None:
+    """Test setting up an account without gateways."""
+    pool = HomeControlPool(mydevolo, gateway_ids=[])
+    assert len(pool) == 0
+
+
+def test_shared_browser(gateway_id: str, gateway_ip: str) -> None:
+    """Test sharing one mDNS browser, that resolves services once and hands them to the handlers looking for the gateway."""
+    zeroconf = Mock()
+    zeroconf.get_service_info.return_value = ServiceInfo(
+        type_="_dvl-deviceapi._tcp.local.",
+        name="dvl-deviceapi._dvl-deviceapi._tcp.local.",
+        server="devolo-homecontrol.local.",
+        addresses=[inet_aton(gateway_ip)],
+        properties={b"SN": gateway_id.encode()},
+    )
+    handlers = [Mock(), Mock()]
+    other_handler = Mock()
+    MockServiceBrowser.cancel.reset_mock()
+    with patch("devolo_home_control_api.backend.mprm.ServiceBrowser", wraps=MockServiceBrowser) as browser:
+        for handler in handlers:
+            GatewayBrowser.register(zeroconf, gateway_id, handler)
+        GatewayBrowser.register(zeroconf, "1234567890123456", other_handler)
+        browser.assert_called_once()
+    zeroconf.get_service_info.assert_called_once()
+    for handler in handlers:
+        handler.assert_called_once_with([inet_aton(gateway_ip)])
+    other_handler.assert_not_called()
+
+    GatewayBrowser.unregister(zeroconf, other_handler)
+    GatewayBrowser.unregister(zeroconf, handlers[0])
+    MockServiceBrowser.cancel.assert_not_called()
+    GatewayBrowser.unregister(zeroconf, handlers[1])
+    MockServiceBrowser.cancel.assert_called_once()
@@ -0,0 +1,36 @@
+"""Test parsing functional items incrementally."""
+import json
+from pathlib import Path
+
+import pytest
+
+from devolo_home_control_api.backend.items_parser import ItemsParser
+
+
+@pytest.mark.parametrize("size", [1, 10, 65536])
+def test_feed(size: int) -> None:
+    """Test getting items, while the response is still arriving."""
+    data = (Path(__file__).parent / "fixtures" / "homecontrol_device_details.json").read_bytes()
+    parser = ItemsParser()
+    items = []
+    for i in range(0, len(data), size):
+        items.extend(parser.feed(data[i : i + size]))
+    response = parser.close()
+    assert items == json.loads(data)["result"]["items"]
+    assert response["id"] == json.loads(data)["id"]
+    assert response["result"]["items"] == []
+
+
+def test_without_items() -> None:
+    """Test parsing a response without items."""
+    parser = ItemsParser()
+    assert parser.feed(b'{"jsonrpc": "2.0", "id": 1, "result": {"status": 1}}') == []
+    assert parser.close()["result"] == {"status": 1}
+
+
+def test_incomplete() -> None:
+    """Test parsing a response, that ended within the items."""
+    parser = ItemsParser()
+    assert parser.feed(b'{"id": 1, "result": {"items": [{"UID": "a"}, {"UID":') == [{"UID": "a"}]
+    with pytest.raises(ValueError):
+        parser.close()
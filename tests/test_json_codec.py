@@ -0,0 +1,34 @@
+"""Test encoding and decoding JSON."""
+import importlib
+import sys
+from collections.abc import Generator
+from types import ModuleType
+from unittest.mock import patch
+
+import pytest
+
+from devolo_home_control_api.helper import json_codec
+
+DATA = {"properties": {"uid": "devolo.BinarySwitch:hdm:ZWave:CBC56091/24", "property.value.new": 1}}
+
+
+@pytest.fixture
+def stdlib_codec() -> Generator[ModuleType, None, None]:
+    """Reload the codec without faster JSON libraries available."""
+    with patch.dict(sys.modules, {"orjson": None, "msgspec": None}):
+        yield importlib.reload(json_codec)
+    importlib.reload(json_codec)
+
+
+def test_round_trip() -> None:
+    """Test encoding and decoding with the library picked."""
+    assert json_codec.json_loads(json_codec.json_dumps(DATA)) == DATA
+    assert json_codec.json_loads(json_codec.json_dumps(DATA).encode()) == DATA
+    assert json_codec.json_loads(json_codec.json_dumps(DATA, pretty=True)) == DATA
+
+
+def test_fallback(stdlib_codec: ModuleType) -> None:
+    """Test falling back to the standard library."""
+    assert stdlib_codec.JSON_LIBRARY == "json"
+    assert stdlib_codec.json_loads(stdlib_codec.json_dumps(DATA)) == DATA
+    assert "\n" in stdlib_codec.json_dumps(DATA, pretty=True)
@@ -1,8 +1,13 @@
 """Test mydevolo."""
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from http import HTTPStatus
+from pathlib import Path
+from threading import Event
+from unittest.mock import patch
 
 import pytest
+import requests
 from requests_mock import Mocker
 from syrupy.assertion import SnapshotAssertion
 
@@ -69,6 +74,66 @@ def test_get_zwave_products(mydevolo: Mydevolo, requests_mock: Mocker, snapshot:
     assert details == snapshot
 
 
+def test_get_zwave_products_cached(mydevolo: Mydevolo, requests_mock: Mocker) -> None:
+    """Test caching zwave product information."""
+    details = mydevolo.get_zwave_products("0x0060", "0x0001", "0x0002")
+    assert mydevolo.get_zwave_products("0x0060", "0x0001", "0x0002") == details
+    assert len([request for request in requests_mock.request_history if ZWAVE_PRODUCTS_URL.match(request.url)]) == 1
+
+    mydevolo = Mydevolo(zwave_products_ttl=0)
+    mydevolo.get_zwave_products("0x0060", "0x0001", "0x0002")
+    assert len([request for request in requests_mock.request_history if ZWAVE_PRODUCTS_URL.match(request.url)]) == 2
+
+
+@pytest.mark.usefixtures("mydevolo")
+def test_get_zwave_products_persisted(requests_mock: Mocker, tmp_path: Path) -> None:
+    """Test persisting zwave product information."""
+    mydevolo = Mydevolo(zwave_products_cache=tmp_path / "products.json")
+    details = mydevolo.get_zwave_products("0x0060", "0x0001", "0x0002")
+    mydevolo.save_zwave_products()
+
+    requests_mock.get(ZWAVE_PRODUCTS_URL, exc=requests.exceptions.ConnectionError)
+    assert (
+        Mydevolo(zwave_products_cache=tmp_path / "products.json").get_zwave_products("0x0060", "0x0001", "0x0002") == details
+    )
+
+    (tmp_path / "broken.json").write_text("{", encoding="utf-8")
+    with pytest.raises(requests.exceptions.ConnectionError):
+        Mydevolo(zwave_products_cache=tmp_path / "broken.json").get_zwave_products("0x0060", "0x0001", "0x0002")
+
+
+def test_get_zwave_products_concurrently(mydevolo: Mydevolo) -> None:
+    """Test asking for the same zwave product information concurrently."""
+    answer = Event()
+
+    def get_zwave_products(*_: str) -> dict[str, str]:
+        answer.wait()
+        return {"name": "Wall Plug"}
+
+    with patch.object(mydevolo, "_get_zwave_products", side_effect=get_zwave_products) as get:
+        with ThreadPoolExecutor() as executor:
+            futures = [executor.submit(mydevolo.get_zwave_products, "0x0175", "0x0001", "0x0011") for _ in range(3)]
+            answer.set()
+        assert [future.result() for future in futures] == [{"name": "Wall Plug"}] * 3
+        get.assert_called_once()
+
+
+def test_session(requests_mock: Mocker) -> None:
+    """Test reusing one pooled session for all calls."""
+    mydevolo = Mydevolo(pool_size=20)
+    adapter = mydevolo._session.adapters["https://"]  # noqa: SLF001
+    assert adapter._pool_maxsize == 20  # noqa: SLF001
+    assert adapter.max_retries.total == 5
+
+    requests_mock.get(MAINTENANCE_URL, json={"state": "on"})
+    mydevolo.maintenance()
+    mydevolo.maintenance()
+    assert requests_mock.call_count == 2
+    assert all(
+        request.headers["User-Agent"].startswith("devolo_home_control_api/") for request in requests_mock.request_history
+    )
+
+
 def test_maintenance(mydevolo: Mydevolo, requests_mock: Mocker) -> None:
     """Test maintenance mode state."""
     assert not mydevolo.maintenance()
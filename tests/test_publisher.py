@@ -1,5 +1,12 @@
 """Test the publisher."""
-from devolo_home_control_api.publisher import Publisher
+import gc
+import threading
+import time
+from typing import Any
+
+import pytest
+
+from devolo_home_control_api.publisher import Overflow, Publisher
 
 from . import Subscriber
 
@@ -32,3 +39,276 @@ def test_unregister() -> None:
     publisher.unregister("test_event", subscriber)
     publisher.dispatch("test_event", ())
     subscriber.update.assert_not_called()
+
+
+def test_queued() -> None:
+    """Test handing messages to a subscriber in its own worker."""
+    publisher = Publisher(events=["test_event"])
+    delivered = threading.Event()
+    subscriber = Subscriber("test_subscriber")
+    subscriber.update.side_effect = lambda _: delivered.set()
+    publisher.register("test_event", subscriber, queue_size=10)
+    publisher.dispatch("test_event", ("uid", 1))
+    assert delivered.wait(1)
+    subscriber.update.assert_called_once_with(("uid", 1))
+    metrics = publisher.queue_metrics()[subscriber]
+    assert metrics.max_depth == 1
+    assert metrics.dropped == 0
+    assert metrics.lag >= 0
+    publisher.close()
+
+
+@pytest.mark.parametrize(
+    ("overflow", "expected", "dropped", "coalesced"),
+    [
+        (Overflow.DROP_OLDEST, [("uid", 0), ("uid", 3), ("other", 4)], 2, 0),
+        (Overflow.COALESCE, [("uid", 0), ("uid", 3), ("other", 4)], 0, 2),
+        (Overflow.BLOCK, [("uid", 0), ("uid", 1), ("uid", 2), ("uid", 3), ("other", 4)], 0, 0),
+    ],
+)
+def test_overflow(overflow: Overflow, expected: list[tuple[str, int]], dropped: int, coalesced: int) -> None:
+    """Test the overflow policies with a slow subscriber."""
+    publisher = Publisher(events=["test_event"])
+    release = threading.Event()
+    subscriber = Subscriber("test_subscriber")
+    subscriber.update.side_effect = lambda _: release.wait(1)
+    publisher.register("test_event", subscriber, queue_size=2, overflow=overflow)
+    publisher.dispatch("test_event", ("uid", 0))
+    while not subscriber.update.called:
+        time.sleep(0.01)
+
+    def dispatch() -> None:
+        for value in range(1, 4):
+            publisher.dispatch("test_event", ("uid", value))
+        publisher.dispatch("test_event", ("other", 4))
+
+    dispatcher = threading.Thread(target=dispatch)
+    dispatcher.start()
+    dispatcher.join(0.2)
+    assert dispatcher.is_alive() is (overflow is Overflow.BLOCK)
+    release.set()
+    dispatcher.join(1)
+    while publisher.queue_metrics()[subscriber].delivered < len(expected):
+        time.sleep(0.01)
+    assert [call.args[0] for call in subscriber.update.call_args_list] == expected
+    metrics = publisher.queue_metrics()[subscriber]
+    assert metrics.dropped == dropped
+    assert metrics.coalesced == coalesced
+    assert metrics.depth == 0
+    assert metrics.max_lag >= metrics.lag
+
+
+def test_coalesce_unnamed_values() -> None:
+    """Test coalescing messages carrying more than one value, while keeping the time the first one was queued."""
+    publisher = Publisher(events=["test_event"])
+    release = threading.Event()
+    subscriber = Subscriber("test_subscriber")
+    subscriber.update.side_effect = lambda _: release.wait(1)
+    publisher.register("test_event", subscriber, queue_size=2, overflow=Overflow.COALESCE)
+    publisher.dispatch("test_event", ("switch", True))
+    while not subscriber.update.called:
+        time.sleep(0.01)
+    publisher.dispatch("test_event", ("bar", 0, 40.0))
+    time.sleep(0.1)
+    publisher.dispatch("test_event", ("bar", 1, 60.0))
+    publisher.dispatch("test_event", ("bar", 1, 61.0))
+    release.set()
+    while publisher.queue_metrics()[subscriber].delivered < 2:
+        time.sleep(0.01)
+    assert [call.args[0] for call in subscriber.update.call_args_list] == [("switch", True), ("bar", 1, 61.0)]
+    metrics = publisher.queue_metrics()[subscriber]
+    assert metrics.coalesced == 2
+    assert metrics.lag >= 0.1
+    publisher.close()
+
+
+def test_coalesce_devices() -> None:
+    """Test coalescing messages of several devices sharing a queue independently."""
+    publisher = Publisher(events=["kitchen", "bath"])
+    release = threading.Event()
+    subscriber = Subscriber("test_subscriber")
+    subscriber.update.side_effect = lambda _: release.wait(1)
+    publisher.register("kitchen", subscriber, queue_size=10, overflow=Overflow.COALESCE)
+    publisher.register("bath", subscriber, queue_size=10, overflow=Overflow.COALESCE)
+    publisher.dispatch("kitchen", ("x", 0))
+    while not subscriber.update.called:
+        time.sleep(0.01)
+    publisher.dispatch("kitchen", ("name", "Kitchen"))
+    publisher.dispatch("bath", ("name", "Bath"))
+    release.set()
+    while publisher.queue_metrics()[subscriber].delivered < 3:
+        time.sleep(0.01)
+    assert [call.args[0] for call in subscriber.update.call_args_list] == [("x", 0), ("name", "Kitchen"), ("name", "Bath")]
+    assert publisher.queue_metrics()[subscriber].coalesced == 0
+    publisher.close()
+
+
+def test_unregister_queued() -> None:
+    """Test stopping the worker of a queued subscriber, that is not registered anymore."""
+    publisher = Publisher(events=["test_event", "other_event"])
+    subscriber = Subscriber("test_subscriber")
+    publisher.register("test_event", subscriber, queue_size=10)
+    publisher.register("other_event", subscriber, queue_size=10)
+    publisher.unregister("test_event", subscriber)
+    assert subscriber in publisher.queue_metrics()
+    publisher.delete_event("other_event")
+    assert subscriber not in publisher.queue_metrics()
+
+
+def test_min_change() -> None:
+    """Test delivering values only, if they changed enough."""
+    publisher = Publisher(events=["test_event"])
+    subscriber = Subscriber("test_subscriber")
+    publisher.register("test_event", subscriber, min_change=1.0)
+    for message in [("uid", 20.0, "current"), ("uid", 20.5, "current"), ("uid", 22.0, "current"), ("uid", 1.0, "total")]:
+        publisher.dispatch("test_event", message)
+    publisher.dispatch("test_event", ("switch", True))
+    publisher.dispatch("test_event", ("switch", True))
+    publisher.dispatch("test_event", ("switch", False))
+    assert [call.args[0] for call in subscriber.update.call_args_list] == [
+        ("uid", 20.0, "current"),
+        ("uid", 22.0, "current"),
+        ("uid", 1.0, "total"),
+        ("switch", True),
+        ("switch", False),
+    ]
+
+
+def test_min_interval() -> None:
+    """Test delivering the latest value at most once per interval."""
+    publisher = Publisher(events=["test_event"])
+    delivered = threading.Event()
+    subscriber = Subscriber("test_subscriber")
+    subscriber.update.side_effect = lambda message: message[1] == 3 and delivered.set()
+    publisher.register("test_event", subscriber, min_interval=0.1)
+    for value in range(4):
+        publisher.dispatch("test_event", ("uid", value))
+    subscriber.update.assert_called_once_with(("uid", 0))
+    assert delivered.wait(1)
+    assert [call.args[0] for call in subscriber.update.call_args_list] == [("uid", 0), ("uid", 3)]
+
+    publisher.dispatch("test_event", ("uid", 4))
+    publisher.unregister("test_event", subscriber)
+    time.sleep(0.2)
+    assert subscriber.update.call_count == 2
+
+
+def test_min_interval_unnamed_values() -> None:
+    """Test throttling messages carrying more than one value per element."""
+    publisher = Publisher(events=["test_event"])
+    delivered = threading.Event()
+    subscriber = Subscriber("test_subscriber")
+    subscriber.update.side_effect = lambda message: message[2] == 43.0 and delivered.set()
+    publisher.register("test_event", subscriber, min_interval=0.1)
+    for value in range(4):
+        publisher.dispatch("test_event", ("bar", 0, 40.0 + value))
+    assert delivered.wait(1)
+    assert [call.args[0] for call in subscriber.update.call_args_list] == [("bar", 0, 40.0), ("bar", 0, 43.0)]
+    publisher.close()
+
+
+def test_min_interval_devices() -> None:
+    """Test throttling device level messages of several devices independently."""
+    publisher = Publisher(events=["kitchen", "bath"])
+    delivered = threading.Event()
+    subscriber = Subscriber("test_subscriber")
+    subscriber.update.side_effect = lambda message: message == ("name", "Bath 2") and delivered.set()
+    publisher.register_all(subscriber, min_interval=0.1, min_change=0)
+    publisher.dispatch("kitchen", ("pending_operations", True))
+    publisher.dispatch("bath", ("pending_operations", True))
+    publisher.dispatch("kitchen", ("name", "Kitchen"))
+    publisher.dispatch("bath", ("name", "Bath"))
+    publisher.dispatch("bath", ("name", "Bath 2"))
+    assert delivered.wait(1)
+    assert [call.args[0] for call in subscriber.update.call_args_list] == [
+        ("pending_operations", True),
+        ("pending_operations", True),
+        ("name", "Kitchen"),
+        ("name", "Bath"),
+        ("name", "Bath 2"),
+    ]
+    publisher.close()
+
+
+def test_wildcard() -> None:
+    """Test subscribing to all events, to element types and to element UID prefixes."""
+    publisher = Publisher(events=["hdm:ZWave:CBC56091/2", "hdm:ZWave:CBC56091/3"])
+    everything = Subscriber("everything")
+    meters = Subscriber("meters")
+    device = Subscriber("device")
+    publisher.register_all(everything)
+    publisher.register_type("devolo.Meter", meters)
+    publisher.register_prefix("devolo.BinarySwitch:hdm:ZWave:CBC56091/2", device)
+    publisher.dispatch("hdm:ZWave:CBC56091/2", ("devolo.Meter:hdm:ZWave:CBC56091/2", 1.0, "current"))
+    publisher.dispatch("hdm:ZWave:CBC56091/2", ("devolo.BinarySwitch:hdm:ZWave:CBC56091/2", True))
+    publisher.dispatch("hdm:ZWave:CBC56091/3", ("devolo.BinarySwitch:hdm:ZWave:CBC56091/3", True))
+    publisher.dispatch("hdm:ZWave:CBC56091/3", ("pending_operations", False))
+    assert everything.update.call_count == 4
+    meters.update.assert_called_once_with(("devolo.Meter:hdm:ZWave:CBC56091/2", 1.0, "current"))
+    device.update.assert_called_once_with(("devolo.BinarySwitch:hdm:ZWave:CBC56091/2", True))
+
+    publisher.unregister_all(everything)
+    publisher.unregister_type("devolo.Meter", meters)
+    publisher.unregister_prefix("devolo.BinarySwitch:hdm:ZWave:CBC56091/2", device)
+    publisher.dispatch("hdm:ZWave:CBC56091/2", ("devolo.Meter:hdm:ZWave:CBC56091/2", 2.0, "current"))
+    publisher.dispatch("hdm:ZWave:CBC56091/2", ("devolo.BinarySwitch:hdm:ZWave:CBC56091/2", False))
+    assert everything.update.call_count == 4
+    meters.update.assert_called_once()
+    device.update.assert_called_once()
+
+
+def test_weak() -> None:
+    """Test unregistering garbage collected subscribers automatically."""
+
+    class WeakSubscriber:
+        def __init__(self) -> None:
+            self.messages: list[tuple[Any, ...]] = []
+
+        def update(self, message: tuple[Any, ...]) -> None:
+            self.messages.append(message)
+
+    publisher = Publisher(events=["test_event", "other_event"])
+    subscriber = WeakSubscriber()
+    other_subscriber = WeakSubscriber()
+    publisher.register("test_event", subscriber, weak=True)
+    publisher.register("test_event", other_subscriber, weak=True, queue_size=10)
+    publisher.register("other_event", Subscriber("test_subscriber"))
+    publisher.dispatch("test_event", ("uid", 1))
+    assert subscriber.messages == [("uid", 1)]
+    assert publisher.subscriber_counts() == {"test_event": 2, "other_event": 1}
+    assert other_subscriber in publisher.queue_metrics()
+
+    publisher.unregister("test_event", subscriber)
+    del other_subscriber
+    gc.collect()
+    publisher.dispatch("test_event", ("uid", 2))
+    assert subscriber.messages == [("uid", 1)]
+    assert publisher.subscriber_counts() == {"test_event": 0, "other_event": 1}
+    assert publisher.queue_metrics() == {}
+
+
+def test_concurrent_dispatch() -> None:
+    """Test dispatching from several threads, while weak subscribers come and go."""
+    publisher = Publisher(events=["test_event"])
+    errors = []
+    stop = threading.Event()
+
+    def dispatch() -> None:
+        try:
+            while not stop.is_set():
+                publisher.dispatch("test_event", ("uid", 1))
+        except Exception as exception:  # noqa: BLE001
+            errors.append(exception)
+
+    dispatchers = [threading.Thread(target=dispatch) for _ in range(4)]
+    for dispatcher in dispatchers:
+        dispatcher.start()
+    for _ in range(20):
+        publisher.register("test_event", Subscriber("test_subscriber"), weak=True)
+        publisher.register_type("uid", Subscriber("test_subscriber"), weak=True)
+        gc.collect()
+    stop.set()
+    for dispatcher in dispatchers:
+        dispatcher.join()
+    assert not errors
+    assert publisher.subscriber_counts() == {"test_event": 0}
@@ -1,10 +1,13 @@
 """Helper functions for splitting UID."""
+import pytest
+
 from devolo_home_control_api.helper.uid import (
     get_device_type_from_element_uid,
     get_device_uid_from_element_uid,
     get_device_uid_from_setting_uid,
     get_home_id_from_device_uid,
     get_sub_device_uid_from_element_uid,
+    parse_uid,
 )
 
 DEVICE_UID = "hdm:ZWave:CBC56091/24"
@@ -35,3 +38,28 @@ def test_device_type_from_element_uid() -> None:
 def test_home_id_from_device_uid() -> None:
     """Test getting the home ID from a device UID."""
     assert get_home_id_from_device_uid(DEVICE_UID) == "CBC56091"
+
+
+def test_parse_uid() -> None:
+    """Test splitting element UIDs, setting UIDs and device UIDs in one pass."""
+    element_uid = parse_uid(ELEMENT_UID)
+    assert element_uid.type == "devolo.MultiLevelSensor"
+    assert element_uid.device_uid == DEVICE_UID
+    assert element_uid.sub_device == "2"
+    assert element_uid.setting_prefix is None
+
+    setting_uid = parse_uid(SETTING_UID)
+    assert setting_uid.type == "lis.hdm"
+    assert setting_uid.device_uid == DEVICE_UID
+    assert setting_uid.sub_device is None
+    assert setting_uid.setting_prefix == "lis"
+
+    assert parse_uid(DEVICE_UID).device_uid == DEVICE_UID
+    assert parse_uid(f"ss.{DEVICE_UID}:1").device_uid == DEVICE_UID
+    assert parse_uid(ELEMENT_UID) is element_uid
+
+
+def test_parse_uid_wrong_format() -> None:
+    """Test splitting UIDs not belonging to a device."""
+    with pytest.raises(ValueError, match="UID has a wrong format"):
+        parse_uid("devolo.DevicesPage")
@@ -1,16 +1,21 @@
 """Test interacting with the websocket."""
+import json
 import logging
+import threading
+import time
+from typing import Any
 from unittest.mock import patch
 
 import pytest
 import requests
 from requests_mock import Mocker
 
+from devolo_home_control_api.backend import ConnectionState
 from devolo_home_control_api.exceptions import GatewayOfflineError
 from devolo_home_control_api.homecontrol import HomeControl
 from devolo_home_control_api.mydevolo import Mydevolo
 
-from . import load_fixture
+from . import Subscriber, load_fixture
 from .mocks import WEBSOCKET
 
 
@@ -38,23 +43,67 @@ def test_setup_websocket_broken(mydevolo: Mydevolo, gateway_id: str, gateway_ip:
         HomeControl(gateway_id, mydevolo)
 
 
-def test_websocket_breakdown(local_gateway: HomeControl) -> None:
+@pytest.mark.usefixtures("local_gateway_api")
+def test_websocket_breakdown(mydevolo: Mydevolo, gateway_id: str) -> None:
     """Test reconnect behavior on websocket breakdown."""
-    with patch(
-        "devolo_home_control_api.backend.mprm_websocket.MprmWebsocket.websocket_connect",
-        wraps=local_gateway.websocket_connect,
-    ) as websocket_connect, patch(
+    states: list[ConnectionState] = []
+    reconnected = threading.Event()
+
+    def on_connection_state_change(state: ConnectionState) -> None:
+        states.append(state)
+        if len(states) == 5:
+            reconnected.set()
+
+    homecontrol = HomeControl(gateway_id, mydevolo, on_connection_state_change=on_connection_state_change)
+    with patch("devolo_home_control_api.backend.mprm_websocket._RECONNECT_INTERVAL", 0), patch(
         "devolo_home_control_api.backend.mprm.Mprm.get_local_session",
         side_effect=[GatewayOfflineError, requests.exceptions.ConnectTimeout, True],
     ) as get_local_session, patch(
         "devolo_home_control_api.backend.mprm.Mprm.detect_gateway_in_lan",
     ) as detect_gateway_in_lan, patch(
-        "devolo_home_control_api.backend.mprm_websocket.sleep",
-    ):
+        "devolo_home_control_api.backend.mprm_websocket.MprmWebsocket._schedule_resync",
+    ) as schedule_resync:
         WEBSOCKET.error()
+        assert reconnected.wait(1)
         assert get_local_session.call_count == 3
-        websocket_connect.assert_called_once()
         detect_gateway_in_lan.assert_called_once()
+        schedule_resync.assert_called_once()
+    assert states == [
+        ConnectionState.CONNECTING,
+        ConnectionState.CONNECTED,
+        ConnectionState.RECONNECTING,
+        ConnectionState.CONNECTING,
+        ConnectionState.CONNECTED,
+    ]
+    assert homecontrol.connection_state is ConnectionState.CONNECTED
+    homecontrol.websocket_disconnect("Test finished.")
+    assert homecontrol.connection_state is ConnectionState.DISCONNECTED
+
+
+def test_websocket_network_up(local_gateway: HomeControl) -> None:
+    """Test reconnecting right away, if the network is up again."""
+    with patch("devolo_home_control_api.backend.mprm_websocket._RECONNECT_INTERVAL", 60), patch(
+        "devolo_home_control_api.backend.mprm_websocket.random.uniform", return_value=60
+    ), patch("devolo_home_control_api.backend.mprm.Mprm.get_local_session", return_value=True):
+        WEBSOCKET.error()
+        assert local_gateway.connection_state is ConnectionState.RECONNECTING
+        local_gateway.network_up()
+        local_gateway.wait_for_websocket_establishment()
+        assert local_gateway.connection_state is ConnectionState.CONNECTED
+
+
+def test_websocket_disconnect_while_reconnecting(local_gateway: HomeControl) -> None:
+    """Test cancelling reconnecting right away."""
+    with patch("devolo_home_control_api.backend.mprm_websocket.random.uniform", return_value=60), patch(
+        "devolo_home_control_api.backend.mprm.Mprm.get_local_session"
+    ) as get_local_session:
+        WEBSOCKET.error()
+        reconnect = next(thread for thread in threading.enumerate() if thread.name == "HomeControl.reconnect")
+        local_gateway.websocket_disconnect("Test finished.")
+        reconnect.join(1)
+        assert not reconnect.is_alive()
+        get_local_session.assert_not_called()
+        assert local_gateway.connection_state is ConnectionState.DISCONNECTED
 
 
 @pytest.mark.usefixtures("local_gateway")
@@ -76,3 +125,99 @@ def test_websocket_session_refresh() -> None:
                 "params": ["devolo.UserPrefs.535512AB-165D-11E7-A4E2-000C29D76CCA", "resetSessionTimeout", []],
             }
         )
+
+
+@pytest.mark.usefixtures("local_gateway_api")
+def test_websocket_queue(mydevolo: Mydevolo, gateway_id: str) -> None:
+    """Test handling websocket messages in a worker thread."""
+    homecontrol = HomeControl(gateway_id, mydevolo, websocket_queue_size=10)
+    threads: list[str] = []
+    subscriber = Subscriber("test_subscriber")
+    subscriber.update.side_effect = lambda _: threads.append(threading.current_thread().name)
+    homecontrol.publisher.register_all(subscriber)
+    WEBSOCKET.recv_packet(json.dumps(load_fixture("homecontrol_binary_switch")["switch_event"]))
+    metrics = homecontrol.websocket_queue_metrics()
+    assert metrics
+    while metrics.delivered < 1:
+        time.sleep(0.01)
+        metrics = homecontrol.websocket_queue_metrics()
+        assert metrics
+    assert threads == ["HomeControl.websocket_worker"]
+    assert metrics.dropped == 0
+    homecontrol.websocket_disconnect("Test finished.")
+    assert homecontrol.websocket_queue_metrics() is None
+
+
+@pytest.mark.usefixtures("local_gateway")
+def test_websocket_gap() -> None:
+    """Test resyncing in the background after missing websocket messages, but not too often."""
+    resynced = threading.Event()
+    message = json.dumps(load_fixture("homecontrol_binary_switch")["switch_event"])
+    with patch("devolo_home_control_api.backend.mprm_websocket._RESYNC_DELAY", 0), patch.object(
+        HomeControl, "resync", side_effect=resynced.set
+    ) as resync:
+        WEBSOCKET.recv_packet(message)
+        resync.assert_not_called()
+        WEBSOCKET.recv_packet(message)
+        assert resynced.wait(1)
+        WEBSOCKET.recv_packet(message)
+        time.sleep(0.1)
+        resync.assert_called_once()
+
+
+def test_websocket_gap_serialized(local_gateway: HomeControl, caplog: pytest.LogCaptureFixture) -> None:
+    """Test handling websocket messages while fetching for a resync, but holding them back while applying it."""
+    fetching = threading.Event()
+    fetched = threading.Event()
+    reconciling = threading.Event()
+    release = threading.Event()
+    device_uids = list(local_gateway.devices)
+
+    def get_all_devices() -> list[str]:
+        fetching.set()
+        fetched.wait(1)
+        return device_uids
+
+    def reconcile(*_: Any) -> None:
+        reconciling.set()
+        release.wait(1)
+        raise KeyError
+
+    message = json.dumps(load_fixture("homecontrol_binary_switch")["switch_event"])
+    with patch("devolo_home_control_api.backend.mprm_websocket._RESYNC_DELAY", 0), patch.object(
+        HomeControl, "get_all_devices", side_effect=get_all_devices
+    ), patch.object(HomeControl, "get_data_from_uid_list", return_value=[]), patch.object(
+        HomeControl, "_reconcile_devices", side_effect=reconcile
+    ), patch.object(
+        HomeControl, "on_update"
+    ) as on_update:
+        WEBSOCKET.recv_packet(message)
+        WEBSOCKET.recv_packet(message)
+        assert fetching.wait(1)
+        WEBSOCKET.recv_packet(message)
+        assert on_update.call_count == 3
+        fetched.set()
+        assert reconciling.wait(1)
+        receiver = threading.Thread(target=WEBSOCKET.recv_packet, args=(message,))
+        receiver.start()
+        receiver.join(0.1)
+        assert on_update.call_count == 3
+        release.set()
+        receiver.join(1)
+        assert on_update.call_count == 4
+    while "Failed to resync with the gateway." not in caplog.messages:
+        time.sleep(0.01)
+
+
+def test_websocket_disconnect_while_trying(local_gateway: HomeControl) -> None:
+    """Test not trying again, if the websocket is closed while trying to reconnect."""
+    with patch("devolo_home_control_api.backend.mprm_websocket._RECONNECT_INTERVAL", 0), patch(
+        "devolo_home_control_api.backend.mprm.Mprm.get_local_session",
+        side_effect=lambda: local_gateway.websocket_disconnect("Test finished.") or False,
+    ) as get_local_session:
+        WEBSOCKET.error()
+        for thread in threading.enumerate():
+            if thread.name == "HomeControl.reconnect":
+                thread.join(1)
+        get_local_session.assert_called_once()
+        assert local_gateway.connection_state is ConnectionState.DISCONNECTED